@@ -9,17 +9,28 @@ of financial tracking and personal assistance:
 - ReminderAgent: Manages reminders and scheduling
 """
 
-from .main_agent import MainAgent
-from .transaction_agent import TransactionAgent
-from .reminder_agent import ReminderAgent
+import importlib
+
+# Imported on first access: each agent module loads agno and the LLM SDKs
+_EXPORTS = {
+    'MainAgent': '.main_agent',
+    'TransactionAgent': '.transaction_agent',
+    'ReminderAgent': '.reminder_agent'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
-__all__ = [
-    'MainAgent',
-    'TransactionAgent', 
-    'ReminderAgent'
-]
 
 # Version info
 __version__ = '1.0.0'
 __author__ = 'OkanFit Team'
-__description__ = 'Agno-powered financial assistant agents'
\ No newline at end of file
+__description__ = 'Agno-powered financial assistant agents'
@@ -1,18 +1,68 @@
 from agno.agent import Agent
 import re
-from typing import Dict, Any
-import asyncio  # <-- 1. IMPORT ASYNCIO
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Dict, Any, Optional
 from agno.models.groq import Groq
 from messages import  MESSAGES, get_message
 # Fix: Use package imports
 from tools import SupabaseClient
+from tools.metrics import run_agent
+from tools.log import DEBUG_SAMPLE_RATE, get_logger
 from agno.models.google import Gemini
 from agno.media import Audio
+
+LANGUAGE_NAMES = {'es': 'Spanish', 'pt': 'Portuguese', 'en': 'English'}
+SUMMARY_DAYS = 30
+REMINDER_SUMMARY_LIMIT = 10
+
+logger = get_logger(__name__)
+
+
+class Intent(Enum):
+    """Intent labels the classifier is instructed to answer with"""
+    TRANSACTION = "TRANSACTION"
+    REMINDER = "REMINDER"
+    TRANSACTION_SUMMARY = "TRANSACTION_SUMMARY"
+    REMINDER_SUMMARY = "REMINDER_SUMMARY"
+    HELP = "HELP"
+    GREETING = "GREETING"
+    GENERAL = "GENERAL"
+
+
+# Whole-label match: \b treats "_" as a word character, so TRANSACTION never matches
+# inside TRANSACTION_SUMMARY. Longer labels first so alternation prefers them.
+INTENT_PATTERN = re.compile(
+    r"\b(" + "|".join(sorted((i.value for i in Intent), key=len, reverse=True)) + r")\b"
+)
+
+
+def parse_intent(response: str) -> Intent:
+    """First exact intent label in the classifier response; GENERAL when there is none"""
+    match = INTENT_PATTERN.search(response.upper())
+    return Intent(match.group(1)) if match else Intent.GENERAL
+
+
+@dataclass
+class RouteContext:
+    """Validated arguments shared by every intent handler"""
+    user_id: str
+    message: str
+    user_data: Dict[str, Any]
+    lang: str
+    lang_name: str
+    user_timezone: str
+    intent_response: str = ""
+
+
 class MainAgent:
     """Main agent that handles user management and routes messages to specialized agents"""
 
-    def __init__(self, supabase_client: SupabaseClient):
+    def __init__(self, supabase_client: SupabaseClient, transaction_agent=None, reminder_agent=None):
         self.supabase_client = supabase_client
+        # Shared with the API when passed in; otherwise created on first use and reused
+        self._transaction_agent = transaction_agent
+        self._reminder_agent = reminder_agent
         
         # Initialize Agno agent for intent classification
         self.agent = Agent(
@@ -37,6 +87,17 @@ class MainAgent:
             Respond with ONLY the classification category in uppercase (e.g., "TRANSACTION", "REMINDER_SUMMARY").
             """
         )
+
+        # Intent -> handler dispatch table, built once
+        self._handlers: Dict[Intent, Callable[[RouteContext], Awaitable[str]]] = {
+            Intent.TRANSACTION: self._handle_transaction,
+            Intent.REMINDER: self._handle_reminder,
+            Intent.TRANSACTION_SUMMARY: self._handle_transaction_summary,
+            Intent.REMINDER_SUMMARY: self._handle_reminder_summary,
+            Intent.HELP: self._handle_help,
+            Intent.GREETING: self._handle_general,
+            Intent.GENERAL: self._handle_general,
+        }
         # Add Gemini agent for audio transcription
         self.audio_agent = Agent(
             name="AudioTranscriber",
@@ -55,102 +116,114 @@ class MainAgent:
     
     async def route_message(self, user_id: str, message: str, user_data: Dict[str, Any]) -> str:
         """Route user message to appropriate agent based on intent - NO AUTH CHECK"""
-        lang_map = {'es': 'Spanish', 'pt': 'Portuguese', 'en': 'English'}
-        lang = user_data.get('language', 'en')
-        lang_name = lang_map.get(lang.split('-')[0], 'English')
-        user_timezone = user_data.get('timezone', 'UTC')
+        context = self._build_context(user_id, message, user_data)
         try:
             # User is already authenticated at this point (checked in API layer)
            
             # --- 2. RUN THE BLOCKING CALL IN A SEPARATE THREAD ---
-            intent_response_obj = await asyncio.to_thread(
-                self.agent.run,
-                f"The user is speaking {lang_name}. Classify this user message and explain briefly: '{message}'"
+            intent_response_obj = await run_agent(
+                self.agent,
+                f"The user is speaking {context.lang_name}. Classify this user message: '{message}'"
             )
             intent_response = str(intent_response_obj.content)
-            print("Intent response main agent:", intent_response)
-            
-            # Route based on intent classification
-            if self._contains_intent(intent_response, "TRANSACTION"):
-                from .transaction_agent import TransactionAgent
-                transaction_agent = TransactionAgent(self.supabase_client)
-                return await transaction_agent.process_message(user_id, message, lang)
-                
-            elif self._contains_intent(intent_response, "REMINDER"):
-                from .reminder_agent import ReminderAgent
-                reminder_agent = ReminderAgent(self.supabase_client)
-                return await reminder_agent.process_message(user_id, message, lang, user_timezone)
-
-            # --- 2. Rename SUMMARY to TRANSACTION_SUMMARY ---
-            elif self._contains_intent(intent_response, "TRANSACTION_SUMMARY"):
-                from .transaction_agent import TransactionAgent
-                transaction_agent = TransactionAgent(self.supabase_client)
-                return await transaction_agent.get_summary(user_id, lang)
-
-            # --- 3. Add new route for REMINDER_SUMMARY ---
-            elif self._contains_intent(intent_response, "REMINDER_SUMMARY"):
-                from .reminder_agent import ReminderAgent
-                reminder_agent = ReminderAgent(self.supabase_client)
-                return await reminder_agent.get_reminders(user_id, lang, user_timezone)
+            logger.debug("Intent classified", user_id=user_id, intent=intent_response, sample=DEBUG_SAMPLE_RATE)
+
+            context.intent_response = intent_response
+            intent = parse_intent(intent_response)
+            return await self._handlers[intent](context)
                 
-            elif self._contains_intent(intent_response, "HELP"):
-                # Return help content directly (no auth needed here)
-                return self._get_help_content(lang)
+        except Exception:
+            logger.exception("Error routing message", user_id=user_id)
+            return "❌ Sorry, I encountered an error. Please try rephrasing your request."
+
+    def _build_context(self, user_id: str, message: str, user_data: Dict[str, Any]) -> RouteContext:
+        """Validate and normalize the arguments every handler receives"""
+        lang = (user_data.get('language') or 'en').split('-')[0].lower()
+        if lang not in LANGUAGE_NAMES:
+            lang = 'en'
+        user_timezone = user_data.get('timezone') or 'UTC'
+        return RouteContext(
+            user_id=user_id,
+            message=message,
+            # Reminder listing reads user_id/language/timezone from user_data
+            user_data={**user_data, 'user_id': user_id, 'language': lang, 'timezone': user_timezone},
+            lang=lang,
+            lang_name=LANGUAGE_NAMES[lang],
+            user_timezone=user_timezone
+        )
 
-            else:
-                # General conversation
-                # --- 3. APPLY THE FIX HERE AS WELL ---
+    @property
+    def transaction_agent(self):
+        if self._transaction_agent is None:
+            from .transaction_agent import TransactionAgent
+            self._transaction_agent = TransactionAgent(self.supabase_client)
+        return self._transaction_agent
+
+    @property
+    def reminder_agent(self):
+        if self._reminder_agent is None:
+            from .reminder_agent import ReminderAgent
+            self._reminder_agent = ReminderAgent(self.supabase_client)
+        return self._reminder_agent
+
+    async def _handle_transaction(self, context: RouteContext) -> str:
+        return await self.transaction_agent.process_message(context.user_id, context.message, context.lang)
+
+    async def _handle_reminder(self, context: RouteContext) -> str:
+        return await self.reminder_agent.process_message(
+            context.user_id, context.message, context.lang, context.user_timezone
+        )
 
-                general_prompt = f"""
-                The intent is {intent_response}. Respond helpfully and engagingly to this message: '{message}'.
-                - Always respond in the user's language ({lang_name}). If the language is unclear, default to English.
+    async def _handle_transaction_summary(self, context: RouteContext) -> str:
+        return await self.transaction_agent.get_summary(context.user_id, days=SUMMARY_DAYS, lang=context.lang)
+
+    async def _handle_reminder_summary(self, context: RouteContext) -> str:
+        return await self.reminder_agent.get_reminders(context.user_data, limit=REMINDER_SUMMARY_LIMIT)
+
+    async def _handle_help(self, context: RouteContext) -> str:
+        # Return help content directly (no auth needed here)
+        return self._get_help_content(context.lang)
+
+    async def _handle_general(self, context: RouteContext) -> str:
+        """General conversation and greetings"""
+        general_prompt = f"""
+                The intent is {context.intent_response}. Respond helpfully and engagingly to this message: '{context.message}'.
+                - Always respond in the user's language ({context.lang_name}). If the language is unclear, default to English.
                 - When reasonable, add a fun, light-hearted tone with emojis or playful phrases to keep it enjoyable (e.g., for greetings or casual chats).
                 - Suggest how they can use OkanAssistant Bot features for tracking expenses and daily reminders.
                 - Also, encourage them to follow OkanFit on social media and visit https://www.okanfit.dev.br for more tips and updates.
                 - Keep responses concise and avoid long replies.
                 """
-                general_response_obj = await asyncio.to_thread(
-                    self.agent.run,
-                    general_prompt
-                )
-                general_response = str(general_response_obj.content)
-                return str(general_response)
-                
-        except Exception as e:
-            #print("failed to route message")
-            print(f"❌ Main Agent: Error routing message: {e}")
-            return "❌ Sorry, I encountered an error. Please try rephrasing your request."
+        general_response_obj = await run_agent(
+            self.agent,
+            general_prompt
+        )
+        return str(general_response_obj.content)
 
-    async def route_audio(self, user_id: str, audio_path: str, user_data: Dict[str, Any]) -> str:
+    async def route_audio(self, user_id: str, audio_path: str, user_data: Dict[str, Any], audio_format: Optional[str] = None) -> str:
         """Transcribe audio to English and route to the correct agent."""
         try:
             # Step 1: Transcribe audio to English using Gemini
-            #audio_dict = {"filepath": audio_path}
-            #print("Routing audio for transcription:", audio_dict)
-            print("Routing audio for transcription:", audio_path)
-            response_obj = await asyncio.to_thread(
-                self.audio_agent.run,
+            logger.debug("Routing audio for transcription", user_id=user_id, audio_format=audio_format)
+            response_obj = await run_agent(
+                self.audio_agent,
                 "Identify the user's language from the audio, then transcribe the audio to English. Return ONLY the English transcript.",
-                audio=[Audio(filepath=audio_path)]
+                audio=[Audio(filepath=audio_path, format=audio_format)]
             )
             transcript = str(response_obj.content).strip()
-            print("Transcribed audio (English):", transcript)
+            logger.debug("Audio transcribed", user_id=user_id, transcript=transcript, sample=DEBUG_SAMPLE_RATE)
 
             # Step 2: Route the transcript as a message
             return await self.route_message(user_id, transcript, user_data)
 
-        except Exception as e:
-            print(f"❌ Main Agent: Error routing audio: {e}")
+        except Exception:
+            logger.exception("Error routing audio", user_id=user_id)
             return "❌ Sorry, I couldn't process your audio. Please try again or use text input."
 
     def _get_help_content(self, lang: str = 'en') -> str:
         """Return help content without authentication"""
         return get_message("help_message", lang)
 
-    def _contains_intent(self, response: str, intent: str) -> bool:
-        """Check if the response contains the specified intent"""
-        return intent.lower() in response.lower()
-    
     #TODO expand keybord lists to handle similar words in different languages
     async def classify_intent(self, message: str) -> str:
         """Classify message intent using simple keyword matching as fallback"""
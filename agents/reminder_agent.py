@@ -3,11 +3,15 @@ import re
 import json
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
-import asyncio
 from agno.models.groq import Groq
 from tools import Reminder, ReminderType, Priority, SupabaseClient
 from messages import get_message
 import pytz # <-- 1. Import pytz
+from tools.locale_data import get_tzinfo, is_valid_timezone, to_local
+from tools.metrics import FALLBACK_PARSES, run_agent
+from tools.log import DEBUG_SAMPLE_RATE, get_logger
+
+logger = get_logger(__name__)
 
 class ReminderAgent:
     """Specialized agent for handling reminders and tasks"""
@@ -76,11 +80,9 @@ class ReminderAgent:
         """Process a text message for reminder data in the user's language and timezone."""
         try:
             # Get the current time IN THE USER'S TIMEZONE
-            try:
-                user_tz = pytz.timezone(user_timezone)
-            except pytz.UnknownTimeZoneError:
-                print(f"⚠️ Unknown timezone '{user_timezone}'. Defaulting to UTC.")
-                user_tz = pytz.utc
+            if not is_valid_timezone(user_timezone):
+                logger.warning("Unknown timezone, defaulting to UTC", user_id=user_id, timezone=user_timezone)
+            user_tz = get_tzinfo(user_timezone)
             
             user_now_iso = datetime.now(user_tz).isoformat()
 
@@ -97,9 +99,9 @@ class ReminderAgent:
             **User Message:** "{message}"
             """
             
-            response_obj = await asyncio.to_thread(self.agent.run, extraction_prompt)
+            response_obj = await run_agent(self.agent, extraction_prompt)
             response_str = str(response_obj.content)
-            print(f"🤖 LLM Response: {response_str}")
+            logger.debug("LLM response", agent="reminder", response=response_str, sample=DEBUG_SAMPLE_RATE)
 
             # Extract JSON from the response (handles extra text/markdown)
             json_match = re.search(r'\{.*\}', response_str, re.DOTALL)
@@ -108,22 +110,25 @@ class ReminderAgent:
                 try:
                     data = json.loads(json_match.group())
                 except json.JSONDecodeError:
-                    print("⚠️ JSON parsing failed, using fallback.")
+                    logger.warning("JSON parsing failed, using fallback", agent="reminder")
+                    FALLBACK_PARSES.inc(agent="reminder")
                     data = self._fallback_parse(message, language)
             else:
-                print("⚠️ No JSON found in response, using fallback.")
+                logger.warning("No JSON found in response, using fallback", agent="reminder")
+                FALLBACK_PARSES.inc(agent="reminder")
                 data = self._fallback_parse(message, language)
 
             if not data.get("reminder_found", True):
                 return get_message("reminder_not_found", language)
-            print(f"✅ Parsed Data: {data}")
             due_datetime = self._parse_due_date(data.get("due_datetime")) if data.get("due_datetime") else None
             due_datetime_utc = None
             if due_datetime:
                 # Convert aware datetime to naive UTC for database storage
                 due_datetime_utc = due_datetime.astimezone(pytz.utc).replace(tzinfo=None)
-            print(f"Original due date: {due_datetime}")
-            print(f"Parsed due date (naive UTC): {due_datetime_utc}")
+            logger.debug(
+                "Reminder parsed", user_id=user_id, data=data, due_datetime=due_datetime,
+                due_datetime_utc=due_datetime_utc, sample=DEBUG_SAMPLE_RATE
+            )
 
             reminder = Reminder(
                 user_id=user_id,
@@ -145,11 +150,9 @@ class ReminderAgent:
             # Format due date for display in user's local time (convert from naive UTC)
             display_due_date = "N/A"
             if due_datetime_utc:
-                # Localize naive UTC to aware UTC, then convert to user timezone
-                utc_aware = pytz.utc.localize(due_datetime_utc)
-                local_due_date = utc_aware.astimezone(user_tz)
+                # Naive UTC -> user timezone
+                local_due_date = to_local(due_datetime_utc, user_timezone)
                 display_due_date = local_due_date.strftime('%Y-%m-%d %H:%M')
-            print(f"Display due date: {display_due_date} | Original due date: {due_datetime}")
 
             return get_message(
                 "reminder_created",
@@ -160,8 +163,8 @@ class ReminderAgent:
                 type=data.get('reminder_type', 'general').title()
             )
             
-        except Exception as e:
-            print(f"❌ Error processing reminder message: {e}")
+        except Exception:
+            logger.exception("Error processing reminder message", user_id=user_id)
             return get_message("reminder_creation_failed", language)
 
     async def get_reminders(self, user_data: dict, limit: int = 10) -> str:
@@ -179,10 +182,7 @@ class ReminderAgent:
                 return get_message("no_pending_reminders", language)
             
             # --- Also provide user's current time for relative date formatting ---
-            try:
-                user_tz = pytz.timezone(user_timezone)
-            except pytz.UnknownTimeZoneError:
-                user_tz = pytz.utc
+            user_tz = get_tzinfo(user_timezone)
             user_now_iso = datetime.now(user_tz).isoformat()
 
             reminders_data = []
@@ -252,13 +252,13 @@ class ReminderAgent:
             }
             
             format_prompt = format_prompts.get(language, format_prompts["en"])
-            response = await asyncio.to_thread(self.agent.run, format_prompt)
+            response = await run_agent(self.agent, format_prompt)
             formatted_list = str(response.content)
             
             return f"{get_message('pending_reminders_header', language)}\n\n{formatted_list}"
             
-        except Exception as e:
-            print(f"❌ Error getting reminders: {e}")
+        except Exception:
+            logger.exception("Error getting reminders")
             return get_message("reminder_fetch_failed", language)
     
     async def get_due_soon(self, user_id: str, hours: int = 24) -> str:
@@ -293,8 +293,8 @@ class ReminderAgent:
             
             return message
             
-        except Exception as e:
-            print(f"❌ Error getting due reminders: {e}")
+        except Exception:
+            logger.exception("Error getting due reminders", user_id=user_id)
             return "❌ Sorry, I couldn't check your due reminders right now."
     
     def _parse_due_date(self, date_str: str) -> Optional[datetime]:
@@ -306,7 +306,7 @@ class ReminderAgent:
             return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
         except (ValueError, TypeError):
             # Basic fallback for non-ISO formats (less reliable)
-            print(f"⚠️ Could not parse date '{date_str}' with ISO format. Fallback may be inaccurate.")
+            logger.warning("Could not parse due date as ISO 8601", due_datetime=date_str)
             return None
 
     def _fallback_parse(self, message: str, language: str) -> Dict[str, Any]:
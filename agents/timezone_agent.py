@@ -1,18 +1,20 @@
 from agno.agent import Agent
 from agno.models.groq import Groq
 import os
-import asyncio
-from datetime import datetime
-import pytz
 from typing import Tuple, Optional
 from agno.tools import tool
-from timezonefinder import TimezoneFinder
-from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+from tools import geo_lookup
+from tools.metrics import run_agent
+from tools.locale_data import format_utc_offset, is_valid_timezone
+from tools.timezone_resolver import TimezoneResolver
+from tools.log import get_logger
+
+logger = get_logger(__name__)
 
 # --- 1. Define the tool as a self-contained function ---
 # It should not have `self` or other external dependencies in its signature.
-# The necessary clients (geolocator, timezonefinder) are created inside.
+# The geocoder and timezone finder are process-wide singletons with memoized lookups.
 @tool
 def get_iana_timezone(location_name: str) -> str:
     """
@@ -26,25 +28,22 @@ def get_iana_timezone(location_name: str) -> str:
         The official IANA timezone name as a string, or "INVALID" if not found.
     """
     try:
-        geolocator = Nominatim(user_agent="okanfit_telegram_bot")
-        tf = TimezoneFinder()
-        
         # Use the geolocator to get coordinates for the location name
-        location = geolocator.geocode(location_name, timeout=10)
-        if location:
+        coordinates = geo_lookup.geocode(location_name)
+        if coordinates:
             # Find the timezone using the coordinates
-            timezone_name = tf.timezone_at(lng=location.longitude, lat=location.latitude)
+            timezone_name = geo_lookup.timezone_at(*coordinates)
             if timezone_name:
-                print(f"✅ TimezoneTool: Found '{timezone_name}' for '{location_name}'")
+                logger.info("Timezone found by geocoding", location=location_name, timezone=timezone_name)
                 return timezone_name
         
-        print(f"⚠️ TimezoneTool: Could not find a valid timezone for '{location_name}'")
+        logger.warning("No timezone found by geocoding", location=location_name)
         return "INVALID"
     except (GeocoderTimedOut, GeocoderUnavailable):
-        print(f"❌ TimezoneTool: Geocoding service is unavailable.")
+        logger.error("Geocoding service is unavailable", location=location_name)
         return "INVALID"
-    except Exception as e:
-        print(f"❌ TimezoneTool: An unexpected error occurred: {e}")
+    except Exception:
+        logger.exception("Unexpected error in timezone tool", location=location_name)
         return "INVALID"
 
 class TimezoneAgent:
@@ -67,31 +66,18 @@ class TimezoneAgent:
             """
         )
         # --- 4. Remove the geolocator from here, as it's now inside the tool ---
+        # Local tier: resolves most inputs without the LLM or a network geocode
+        self.resolver = TimezoneResolver()
 
     def _get_utc_offset_string(self, iana_timezone: str) -> Optional[str]:
         """Calculates the current UTC offset string (e.g., UTC-04:00) for a given IANA timezone."""
-        try:
-            tz = pytz.timezone(iana_timezone)
-            now = datetime.now(tz)
-            offset = now.utcoffset()
-            
-            if offset is None:
-                return None
-
-            total_seconds = offset.total_seconds()
-            sign = '+' if total_seconds >= 0 else '-'
-            hours = int(abs(total_seconds) / 3600)
-            minutes = int((abs(total_seconds) % 3600) / 60)
-            
-            return f"UTC{sign}{hours:02d}:{minutes:02d}"
-        except pytz.UnknownTimeZoneError:
-            return None
+        return format_utc_offset(iana_timezone)
     
     
     async def identify_timezone(self, language: str, text_input: str) -> Tuple[Optional[str], Optional[str]]:
         """
-        Identifies an IANA timezone and its UTC offset by using an agent with tools.
-        The 'language' parameter is no longer needed as the agent handles it.
+        Identifies an IANA timezone and its UTC offset. The offline resolver is tried
+        first; the agent with tools is only used when it can't resolve the input.
 
         Args:
             language: The user's language code (e.g., 'en', 'es', 'pt').
@@ -100,6 +86,11 @@ class TimezoneAgent:
         Returns:
             A tuple containing (iana_name, utc_offset_string), or (None, None) if identification fails.
         """
+        iana_name = self.resolver.resolve(text_input)
+        if iana_name:
+            logger.info("Timezone resolved locally", timezone=iana_name)
+            return iana_name, self._get_utc_offset_string(iana_name)
+
         # --- 1. Define multilingual prompt templates ---
         prompts = {
             "en": """
@@ -146,15 +137,15 @@ class TimezoneAgent:
             full_prompt = prompt_template.format(text_input=text_input)
 
             # --- 3. Use the LLM with the dynamic prompt ---
-            response = await asyncio.to_thread(self.agent.run, full_prompt)
+            response = await run_agent(self.agent, full_prompt)
             iana_name = response.content.strip()
-            print("✅ TimezoneAgent identified:", iana_name)
-            if iana_name == "INVALID" or iana_name not in pytz.all_timezones:
+            logger.info("Timezone identified by LLM", timezone=iana_name)
+            if iana_name == "INVALID" or not is_valid_timezone(iana_name):
                 return None, None
 
             utc_offset = self._get_utc_offset_string(iana_name)
             
             return iana_name, utc_offset
-        except Exception as e:
-            print(f"❌ Error in tool-based TimezoneAgent: {e}")
+        except Exception:
+            logger.exception("Error in tool-based TimezoneAgent")
             return None, None
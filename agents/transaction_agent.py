@@ -2,19 +2,26 @@ from agno.agent import Agent
 import re
 import json
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
 import asyncio  # <-- 1. IMPORT ASYNCIO
 from agno.models.groq import Groq
 # Fix: Use package imports from __init__.py
-from tools import Transaction, TransactionType, SupabaseClient
+from tools import Transaction, TransactionType, SupabaseClient, ExtractionCache
+from tools.metrics import FALLBACK_PARSES, run_agent
+from tools.pdf_chunks import PageRange, format_page_ranges, merge_chunk_transactions, remove_chunks, split_pdf_pages
+from tools.log import DEBUG_SAMPLE_RATE, get_logger
 from messages import  MESSAGES, get_message
 from agno.models.google import Gemini
 
+logger = get_logger(__name__)
+
 class TransactionAgent:
     """Specialized agent for handling financial transactions"""
 
-    def __init__(self, supabase_client: SupabaseClient):
+    def __init__(self, supabase_client: SupabaseClient, extraction_cache: Optional[ExtractionCache] = None):
         self.supabase_client = supabase_client
+        # Results of receipt/statement extraction keyed by upload content, so re-sent files skip the LLM
+        self.extraction_cache = extraction_cache or ExtractionCache()
         
         # Define simplified categories
         self.expense_categories = ["Essentials", "Food & Dining", "Transportation", "Shopping", "Entertainment", "Utilities", "Healthcare", "Travel", "Education", "Home"]
@@ -56,7 +63,17 @@ class TransactionAgent:
         
         # Initialize Gemini agent for vision processing (receipt/image analysis)
         # For bank statement document batch extraction
-        self.vision_agent = Agent(
+        self.vision_agent = self._create_vision_agent()
+
+        # Bank statements are split into page chunks extracted concurrently
+        self.statement_pages_per_chunk = 2
+        self.statement_max_concurrency = 4
+
+    def _create_vision_agent(self) -> Agent:
+        """Build a Gemini agent for document extraction"""
+        expense_cats = ", ".join(self.expense_categories)
+        income_cats = ", ".join(self.income_categories)
+        return Agent(
             model=Gemini(id="gemini-2.0-flash"),
             markdown=True,
             instructions=f"""
@@ -101,7 +118,7 @@ class TransactionAgent:
             }}
             ]
             """
-)
+        )
 
     #TODO adapt to respond in user's language
     async def process_message(self, user_id: str, message: str, lang: str) -> str:
@@ -120,9 +137,9 @@ class TransactionAgent:
             **JSON Output:**
             """
             
-            response_obj = await asyncio.to_thread(self.text_agent.run, extraction_prompt)
+            response_obj = await run_agent(self.text_agent, extraction_prompt)
             response = response_obj.content # <-- FIX: Access the .content attribute
-            #print("Raw response from Groq:", response)
+            logger.debug("LLM response", agent="transaction", response=response, sample=DEBUG_SAMPLE_RATE)
             # Enhanced JSON parsing for Groq responses
             try:
                 # Clean response to extract JSON
@@ -135,6 +152,7 @@ class TransactionAgent:
                     raise ValueError("No JSON found in response")
             except:
                 # Fallback parsing if JSON isn't returned
+                FALLBACK_PARSES.inc(agent="transaction")
                 data = self._fallback_parse(message)
             
             if not data.get("transaction_found", True):
@@ -143,7 +161,6 @@ class TransactionAgent:
             # Validate and fix category
             validated_category = self._validate_category(data["category"], data["transaction_type"])
             data["category"] = validated_category
-            #print("Extracted data:", data)
             # Create and save transaction
             transaction = Transaction(
                 user_id=user_id,
@@ -169,18 +186,32 @@ class TransactionAgent:
             return message_template
                 
             
-        except Exception as e:
-            print(f"❌ Transaction Agent: Error processing transaction message: {e}")
+        except Exception:
+            logger.exception("Error processing transaction message", user_id=user_id)
             return "❌ Sorry, I couldn't process that transaction. Please try again with a clearer format."
 
-    async def process_receipt_image(self, user_data: Dict[str, Any], image_path: str, lang: str = 'en') -> str:
-        """Process receipt image using Gemini vision capabilities"""
+    async def process_receipt_image(self, user_data: Dict[str, Any], image_path: str, lang: str = 'en',
+                                    cache_key: Optional[str] = None) -> str:
+        """
+        Process receipt image using Gemini vision capabilities.
+        Pass cache_key when the caller already claimed the upload with extraction_cache.get_or_claim()
+        (the caller then releases it); otherwise the claim is taken and released here.
+        """
 
+        owns_claim = False
         try:
-            #print("DEBUG: user_data type:", type(user_data), "value:", user_data)  # Debug log
             user_currency = user_data.get('currency', 'USD')
             user_id = user_data.get('user_id', None)
-            print(f"Processing receipt image for user {user_id} at {image_path}")
+            logger.info("Processing receipt image", user_id=user_id)
+
+            if cache_key is None:
+                with open(image_path, "rb") as f:
+                    cache_key = self.extraction_cache.make_key(user_id, f.read())
+                cached_result = await self.extraction_cache.get_or_claim(cache_key)
+                if cached_result:
+                    logger.info("Duplicate receipt, returning previous result", user_id=user_id)
+                    return cached_result
+                owns_claim = True
 
             # Use Gemini vision to extract receipt data
             extraction_prompt = f"""
@@ -217,8 +248,8 @@ class TransactionAgent:
 
 
             image_dict = {"filepath": image_path}
-            response_obj = await asyncio.to_thread(
-                self.vision_agent.run,  
+            response_obj = await run_agent(
+                self.vision_agent,  
                     extraction_prompt,
                     images=[image_dict]  # Try bytes instead of path
                 )
@@ -226,7 +257,7 @@ class TransactionAgent:
            
             response = response_obj.content
         
-            print("Raw response from Gemini Vision:", response)
+            logger.debug("LLM response", agent="receipt", response=response, sample=DEBUG_SAMPLE_RATE)
             # Parse the response
             try:
                 # Clean response to extract JSON
@@ -238,12 +269,12 @@ class TransactionAgent:
                     
                     # Validate that data is a dict
                     if not isinstance(data, dict):
-                        print(f"❌ Parsed data is not a dict: {type(data)}, value: {data}")
+                        logger.error("Receipt data is not a JSON object", user_id=user_id, data_type=type(data).__name__)
                         return "📸 Receipt processed, but the extracted data was invalid. Please try again."
                 else:
                     raise ValueError("No JSON found in response")
             except Exception as parse_e:
-                print(f"❌ JSON parsing error: {parse_e}")
+                logger.error("Receipt JSON parsing error", user_id=user_id, error=str(parse_e))
                 return "📸 Receipt processed, but I had trouble extracting the data. Please manually enter the transaction."
             
             # Now safe to use data.get() since we validated it's a dict
@@ -266,135 +297,206 @@ class TransactionAgent:
             # Save to database
             saved_transaction = await self.supabase_client.database.save_transaction(transaction)
             
-            return (
-                get_message(
-                    "success_process_receipt", 
-                    lang,
-                    merchant=data.get("merchant", "Store"),
-                    amount=data.get("amount", 0.0),
-                    category=validated_category,
-                    date=datetime.now().strftime("%Y-%m-%d")
-                )
+            result = get_message(
+                "success_process_receipt", 
+                lang,
+                merchant=data.get("merchant", "Store"),
+                amount=data.get("amount", 0.0),
+                category=validated_category,
+                date=datetime.now().strftime("%Y-%m-%d")
             )
+            self.extraction_cache.set(cache_key, result)
+            return result
             
-        except Exception as e:
-            print(f"❌ Transaction (Receipt): Error processing receipt image: {e}")
+        except Exception:
+            logger.exception("Error processing receipt image")
             return "❌ Sorry, I couldn't process that receipt image. Please try again or enter the transaction manually."
-
-    async def process_bank_statement(self, user_data: Dict[str, Any], pdf_path: str, lang: str = 'en') -> str:
-        """Process bank statement PDF using Gemini"""
+        finally:
+            if owns_claim:
+                self.extraction_cache.release(cache_key)
+
+    async def process_bank_statement(self, user_data: Dict[str, Any], pdf_path: str, lang: str = 'en',
+                                     cache_key: Optional[str] = None) -> str:
+        """
+        Process bank statement PDF using Gemini, extracting page chunks concurrently.
+        Pass cache_key when the caller already claimed the upload with extraction_cache.get_or_claim()
+        (the caller then releases it); otherwise the claim is taken and released here.
+        """
         user_id = user_data.get('user_id', None)
         user_currency = user_data.get('currency', 'USD')
 
+        owns_claim = False
         try:
-            # Use Gemini to extract multiple transactions from PDF
-            extraction_prompt = f"""
-            You are a financial document processor.
-
-            1. Detect the user's language from the document.
-            2. The currency for all transactions is: {user_currency}.
-
-            Analyze the attached bank statement PDF and extract every transaction.
-
-            Expense Categories (choose one for each expense): {self.expense_categories}
-            Income Categories (choose one for each income): {self.income_categories}
-
-            For each transaction, extract:
-            - Amount (positive for income, negative or positive for expenses, but mark transaction type clearly)
-            - Description (what the transaction is for)
-            - Date (YYYY-MM-DD format)
-            - Transaction type ("income" or "expense")
-            - Category (must be from the lists above)
+            if cache_key is None:
+                with open(pdf_path, "rb") as f:
+                    cache_key = self.extraction_cache.make_key(user_id, f.read())
+                cached_result = await self.extraction_cache.get_or_claim(cache_key)
+                if cached_result:
+                    logger.info("Duplicate bank statement, returning previous result", user_id=user_id)
+                    return cached_result
+                owns_claim = True
+
+            # Collect chunk results as they finish, then merge them back in page order
+            chunk_results: Dict[int, List[Dict[str, Any]]] = {}
+            failed_pages: List[PageRange] = []
+            async for chunk_index, pages, chunk_transactions in self.iter_statement_chunks(pdf_path, user_currency):
+                if chunk_transactions is None:
+                    failed_pages.append(pages)
+                    continue
+                chunk_results[chunk_index] = chunk_transactions
+                logger.info(
+                    "Statement chunk extracted", user_id=user_id,
+                    chunk=chunk_index + 1, transactions=len(chunk_transactions)
+                )
 
-            Rules:
-            - The category must be exactly one from the appropriate list.
-            - If the category is unclear for an expense, use "Shopping".
-            - If the category is unclear for an income, use "Other Income".
+            if not chunk_results:
+                return "📄 PDF processed, but I had trouble extracting transaction data. Please check the file format."
 
-            Output:
-            Return ONLY a valid JSON array of transactions. Do not include any explanation or extra text.
-            Example:
-            [
-              {{
-                "amount": 100.00,
-                "description": "Salary payment",
-                "date": "2025-09-01",
-                "transaction_type": "income",
-                "category": "Salary",
-                "confidence_score": 0.85
-              }},
-              {{
-                "amount": 25.50,
-                "description": "Grocery shopping",
-                "date": "2025-09-02",
-                "transaction_type": "expense",
-                "category": "Essentials",
-                "confidence_score": 0.9
-              }}
-            ]
-            """
-            pdf_dict = {"filepath": pdf_path}
-            response_obj = await asyncio.to_thread(
-                self.vision_agent.run,
-                extraction_prompt,
-                files=[pdf_dict]
+            transactions_data = merge_chunk_transactions(
+                [chunk_results[index] for index in sorted(chunk_results)]
             )
-            response = response_obj.content # <-- FIX: Access the .content attribute
             
-            # Parse transactions
-            try:
-                # Clean response to extract JSON array
-                json_start = response.find('[')
-                json_end = response.rfind(']') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    transactions_data = json.loads(json_str)
-                else:
-                    # Try to find JSON object instead
-                    json_start = response.find('{')
-                    json_end = response.rfind('}') + 1
-                    if json_start >= 0 and json_end > json_start:
-                        json_str = response[json_start:json_end]
-                        single_transaction = json.loads(json_str)
-                        transactions_data = [single_transaction]
-                    else:
-                        raise ValueError("No JSON found in response")
-            except:
-                return "📄 PDF processed, but I had trouble extracting transaction data. Please check the file format."
-            
-            # Save each transaction
-            saved_count = 0
+            # Build all transactions, then save them in one round-trip. Rows the table would
+            # reject (amount <= 0, no description, no date) are dropped here, since a single
+            # constraint violation rolls back the whole bulk insert.
+            transactions = []
+            invalid_count = 0
             for trans_data in transactions_data:
                 try:
-                    # Validate category
-                    validated_category = self._validate_category(
-                        trans_data.get("category", "Shopping"), 
-                        trans_data.get("transaction_type", "expense")
-                    )
-                    
-                    transaction = Transaction(
-                        user_id=user_id,
-                        amount=abs(float(trans_data.get("amount", 0))),
-                        description=trans_data.get("description", "Bank transaction"),
-                        category=validated_category,
-                        transaction_type=TransactionType(trans_data.get("transaction_type", "expense")),
-                        original_message="Bank statement import",
-                        source_platform="telegram",
-                        confidence_score=0.85,
-                        tags=["bank_import"]
-                    )
-                    
-                    await self.supabase_client.database.save_transaction(transaction)
-                    saved_count += 1
-                except Exception as e:
-                    print(f"❌ Error saving transaction: {e}")
-                    continue
-
-            return get_message("success_process_pdf", lang, saved_count=saved_count)
+                    transactions.append(self._statement_row_to_transaction(user_id, trans_data))
+                except (TypeError, ValueError) as e:
+                    invalid_count += 1
+                    logger.warning("Skipping invalid statement row", user_id=user_id, error=str(e))
+
+            import_result = await self.supabase_client.database.save_transactions_bulk(transactions)
+            saved_count = import_result.inserted_count
+            logger.info(
+                "Bank statement imported", user_id=user_id, inserted=saved_count,
+                skipped=import_result.skipped_count, invalid=invalid_count,
+                import_batch_id=import_result.import_batch_id
+            )
 
-        except Exception as e:
-            print(f"❌ Transaction (Bank Statement): Error processing bank statement: {e}")
+            result = get_message("success_process_pdf", lang, saved_count=saved_count)
+            if import_result.skipped_count:
+                result += get_message("pdf_duplicates_skipped", lang, skipped_count=import_result.skipped_count)
+            if invalid_count:
+                result += get_message("pdf_invalid_rows_skipped", lang, invalid_count=invalid_count)
+            if failed_pages:
+                # Partial import: don't cache it, so sending the statement again retries those pages
+                logger.warning("Statement chunks failed", user_id=user_id, pages=format_page_ranges(failed_pages))
+                result += get_message("pdf_pages_failed", lang, pages=format_page_ranges(failed_pages))
+            elif saved_count > 0 or import_result.skipped_count > 0:
+                self.extraction_cache.set(cache_key, result)
+            return result
+
+        except Exception:
+            logger.exception("Error processing bank statement", user_id=user_id)
             return "❌ Sorry, I couldn't process that bank statement. Please ensure it's a valid PDF with transaction data."
+        finally:
+            if owns_claim:
+                self.extraction_cache.release(cache_key)
+
+    async def iter_statement_chunks(self, pdf_path: str, user_currency: str = 'USD') -> AsyncIterator[Tuple[int, PageRange, Optional[List[Dict[str, Any]]]]]:
+        """
+        Split a statement PDF into page chunks and extract them with bounded concurrency.
+        Yields (chunk_index, pages, transactions) as each chunk finishes; transactions is None when a chunk failed.
+        """
+        chunk_paths, page_ranges, created = await asyncio.to_thread(split_pdf_pages, pdf_path, self.statement_pages_per_chunk)
+        semaphore = asyncio.Semaphore(self.statement_max_concurrency)
+
+        async def extract(chunk_index: int, chunk_path: str):
+            async with semaphore:
+                pages = page_ranges[chunk_index]
+                try:
+                    return chunk_index, pages, await self._extract_statement_chunk(chunk_path, user_currency, len(chunk_paths) > 1)
+                except Exception:
+                    logger.exception("Error extracting statement chunk", chunk=chunk_index + 1)
+                    return chunk_index, pages, None
+
+        tasks = [asyncio.create_task(extract(index, path)) for index, path in enumerate(chunk_paths)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            if created:
+                remove_chunks(chunk_paths)
+
+    async def _extract_statement_chunk(self, chunk_path: str, user_currency: str, is_partial: bool) -> List[Dict[str, Any]]:
+        """Run Gemini extraction on a single statement chunk and parse the JSON array"""
+        partial_note = (
+            "The attached file contains only some pages of a longer statement. "
+            "Extract only the transactions shown on these pages."
+        ) if is_partial else ""
+
+        extraction_prompt = f"""
+        You are a financial document processor.
+
+        1. Detect the user's language from the document.
+        2. The currency for all transactions is: {user_currency}.
+
+        Analyze the attached bank statement PDF and extract every transaction. {partial_note}
+
+        Expense Categories (choose one for each expense): {self.expense_categories}
+        Income Categories (choose one for each income): {self.income_categories}
+
+        For each transaction, extract:
+        - Amount (positive for income, negative or positive for expenses, but mark transaction type clearly)
+        - Description (what the transaction is for)
+        - Date (YYYY-MM-DD format)
+        - Transaction type ("income" or "expense")
+        - Category (must be from the lists above)
+
+        Rules:
+        - The category must be exactly one from the appropriate list.
+        - If the category is unclear for an expense, use "Shopping".
+        - If the category is unclear for an income, use "Other Income".
+
+        Output:
+        Return ONLY a valid JSON array of transactions. Do not include any explanation or extra text.
+        Example:
+        [
+          {{
+            "amount": 100.00,
+            "description": "Salary payment",
+            "date": "2025-09-01",
+            "transaction_type": "income",
+            "category": "Salary",
+            "confidence_score": 0.85
+          }},
+          {{
+            "amount": 25.50,
+            "description": "Grocery shopping",
+            "date": "2025-09-02",
+            "transaction_type": "expense",
+            "category": "Essentials",
+            "confidence_score": 0.9
+          }}
+        ]
+        """
+        # Agno agents keep per-run state, so each concurrent chunk gets its own agent
+        agent = self._create_vision_agent() if is_partial else self.vision_agent
+        pdf_dict = {"filepath": chunk_path}
+        response_obj = await run_agent(
+            agent,
+            extraction_prompt,
+            files=[pdf_dict]
+        )
+        response = response_obj.content
+
+        # Clean response to extract JSON array
+        json_start = response.find('[')
+        json_end = response.rfind(']') + 1
+        if json_start >= 0 and json_end > json_start:
+            return json.loads(response[json_start:json_end])
+
+        # Try to find JSON object instead
+        json_start = response.find('{')
+        json_end = response.rfind('}') + 1
+        if json_start >= 0 and json_end > json_start:
+            return [json.loads(response[json_start:json_end])]
+        raise ValueError("No JSON found in response")
     
     #TODO adapt to respond in user's language
     async def get_summary(self, user_id: str, days: int = 30, lang: str = 'en') -> str:
@@ -417,7 +519,7 @@ class TransactionAgent:
             Keep it concise and encouraging.
             """
             
-            insights_obj = await asyncio.to_thread(self.text_agent.run, insights_prompt)
+            insights_obj = await run_agent(self.text_agent, insights_prompt)
             insights = insights_obj.content # <-- FIX: Access the .content attribute
             
             # Calculate net flow
@@ -442,10 +544,45 @@ class TransactionAgent:
             
             return message
             
-        except Exception as e:
-            print(f"❌ Error generating summary: {e}")
+        except Exception:
+            logger.exception("Error generating summary", user_id=user_id)
             return "❌ Sorry, I couldn't generate your financial summary right now. Please try again later."
     
+    def _statement_row_to_transaction(self, user_id: str, trans_data: Dict[str, Any]) -> Transaction:
+        """Build a Transaction from an extracted statement row; ValueError if the row can't be stored"""
+        amount = abs(float(trans_data.get("amount") or 0))
+        if amount <= 0:
+            raise ValueError(f"amount must be positive, got {trans_data.get('amount')!r}")
+        description = str(trans_data.get("description") or "").strip()
+        if not description:
+            raise ValueError("missing description")
+        date = self._parse_statement_date(trans_data.get("date"))
+        if date is None:
+            raise ValueError(f"unparseable date {trans_data.get('date')!r}")
+
+        transaction_type = trans_data.get("transaction_type") or "expense"
+        return Transaction(
+            user_id=user_id,
+            amount=amount,
+            description=description,
+            category=self._validate_category(trans_data.get("category") or "Shopping", transaction_type),
+            transaction_type=TransactionType(transaction_type),
+            original_message="Bank statement import",
+            source_platform="telegram",
+            date=date,
+            confidence_score=0.85,
+            tags=["bank_import"]
+        )
+
+    def _parse_statement_date(self, date_str: Optional[str]) -> Optional[datetime]:
+        """Parse the YYYY-MM-DD date extracted from a statement row"""
+        if not date_str:
+            return None
+        try:
+            return datetime.strptime(str(date_str)[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+
     def _validate_category(self, category: str, transaction_type: str) -> str:
         """Validate category against predefined lists"""
         if transaction_type == "expense":
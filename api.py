@@ -1,24 +1,24 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile, BackgroundTasks, Request, Form
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, FastAPI, HTTPException, File, UploadFile, BackgroundTasks, Request, Form, Depends
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from typing import Optional, List, Dict, Any, Tuple
-import uvicorn
+from contextlib import asynccontextmanager
+import asyncio
 import os
 import tempfile
+import time
 from datetime import datetime
 from dotenv import load_dotenv
-import aiohttp
-import pytz  # Ensure pytz is imported at the top
 # Import standardized messages
 from messages import MESSAGES, get_message
-import subprocess
 # Import models
 from models import (
     MessageRequest,
     TransactionResponse,
     SummaryRequest,
+    ReportRequest,
     StartRequest,
     NotificationRequest,
     RegisterRequest,
@@ -30,56 +30,52 @@ from models import (
 load_dotenv()
 
 # Import existing components
-from tools.supabase_tools import SupabaseClient
-from agents.transaction_agent import TransactionAgent
-from agents.reminder_agent import ReminderAgent
-from agents.main_agent import MainAgent
-from agents.timezone_agent import TimezoneAgent
-from tools.session_manager import SessionManager
-
-# Global services (initialized on-demand for GCF)
-supabase_client = None
-transaction_agent = None
-reminder_agent = None
-main_agent = None
-timezone_agent = None
-session_manager = None
-bot_token = None
-async def initialize_services():
-    """Initialize services on-demand (for GCF compatibility)"""
-    global supabase_client, transaction_agent, reminder_agent, main_agent, timezone_agent, session_manager, bot_token
-
-    if supabase_client is None:
-        print("🚀 Initializing API services...")
-        
-        # Initialize Supabase client
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_SECRET_KEY')
-        bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
-        if not supabase_url or not supabase_key:
-            raise ValueError("SUPABASE_URL and SUPABASE_SECRET_KEY are required")
-        
-        supabase_client = SupabaseClient(supabase_url, supabase_key)
-        await supabase_client.connect()
-        
-        # Initialize agents
-        transaction_agent = TransactionAgent(supabase_client)
-        reminder_agent = ReminderAgent(supabase_client)
-        main_agent = MainAgent(supabase_client)
-        timezone_agent = TimezoneAgent()
-        
-        # Initialize session manager
-        session_manager = SessionManager(session_timeout_minutes=30)
-        
-        print("✅ API services initialized successfully")
-
-# Create FastAPI app (no lifespan for GCF)
+# Light modules only: agno, the LLM SDKs, supabase/stripe, asyncpg, numpy and aiohttp
+# are imported where they're first used (services.py, /reports), so cold starts and /health don't pay for them.
+from tools import geo_lookup
+from tools.locale_data import currency_for_timezone, to_local
+from services import ServiceContainer
+from tools.audio_formats import AudioFormatNegotiator
+from tools.transaction_export import EXPORT_COLUMNS, EXPORT_FORMATS, stream_export
+from tools.metrics import (
+    AUTH_SECONDS, CREDIT_CHECK_SECONDS, HTTP_REQUEST_SECONDS, SESSION_LOOKUPS, TELEGRAM_SEND_SECONDS,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+)
+from tools.log import DEBUG_SAMPLE_RATE, get_logger
+from tools.tracing import current_span, new_request_id, request_span, traced
+
+logger = get_logger(__name__)
+
+# Process-wide services, started by the lifespan (or by the first request where none runs)
+services = ServiceContainer()
+audio_negotiator = AudioFormatNegotiator(backend="gemini")
+
+METRICS_PATH = "/metrics"
+
+async def ensure_services():
+    """Route dependency: services are ready before any handler runs (no-op once started)"""
+    await services.start()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start services before serving; drain and close them on shutdown"""
+    await services.start()
+    yield
+    await services.stop()
+
+# Create FastAPI app
 app = FastAPI(
     title="OkanFit Assist AI API",
     description="Financial AI processing service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Endpoints that use services. Under Cloud Functions (Mangum, lifespan off) ensure_services starts
+# them on the first such request; /health, /help, /auth/confirm and /metrics stay on the app so
+# probes and static pages never trigger (or fail on) a start-up
+router = APIRouter(dependencies=[Depends(ensure_services)])
+
 # Add CORS
 app.add_middleware(
     CORSMiddleware,
@@ -89,6 +85,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    """
+    Root span and request id for every request (echoed as X-Request-ID), plus per-endpoint
+    latency labelled by route template so path params don't explode the series.
+    Prometheus scrapes are left out of both.
+    """
+    if request.url.path == METRICS_PATH:
+        return await call_next(request)
+    request_id = request.headers.get("x-request-id") or new_request_id()
+    started = time.perf_counter()
+    status = 500
+    with request_span(request.method, request_id, request.headers.get("traceparent"),
+                      **{"http.method": request.method, "http.target": request.url.path}) as span:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            response.headers["X-Request-ID"] = request_id
+            return response
+        finally:
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            span.name = f"{request.method} {route}"
+            span.set_attribute("http.route", route)
+            span.set_attribute("http.status_code", status)
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=request.method,
+                route=route,
+                status=status
+            )
+
+async def metrics_endpoint(request: Request):
+    """Prometheus scrape target"""
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+# Plain Starlette route, outside the router: scrapes never start services
+app.add_route(METRICS_PATH, metrics_endpoint, methods=["GET"], include_in_schema=False)
+
 # API Endpoints
 @app.get("/okanassist/v1/auth/confirm", response_class=JSONResponse)
 async def handle_email_confirmation():
@@ -98,13 +132,12 @@ async def handle_email_confirmation():
     download_url = os.getenv("APP_DOWNLOAD_URL", "https://play.google.com/store/apps/details?id=com.okanassist")
     return {"message": "Registration confirmed! Download the app here.", "download_url": download_url}
 
-@app.post("/okanassist/v1/start")
+@router.post("/okanassist/v1/start")
 async def handle_start(request: StartRequest):
     """Handle /start command with authentication handling"""
-    await initialize_services()  # Ensure services are ready
     lang = request.language_code
     try:
-        if not main_agent:
+        if not services.main_agent:
             raise HTTPException(status_code=503, detail="Service not ready")
         
         # Use centralized authentication
@@ -127,13 +160,13 @@ async def handle_start(request: StartRequest):
         }
         
     except HTTPException as e:
-        print(f"HTTPException in handle_start: {e.detail}")
+        logger.info("Start for unauthenticated user", telegram_id=request.user_id, detail=e.detail)
         return {
             "success": True,
             "message": get_message("welcome_unauthenticated", lang)
         }
-    except Exception as e:
-        print(f"❌ Unhandled Exception in handle_start: {e}")
+    except Exception:
+        logger.exception("Unhandled exception in handle_start")
         raise HTTPException(status_code=500, detail="An internal server error occurred.")
 
 @app.get("/okanassist/v1/help")
@@ -141,10 +174,9 @@ async def handle_help(language_code: Optional[str] = 'en'):
     """Handle /help command - No authentication required"""
     return {"success": True, "message": get_message("help_message", language_code)}
 
-@app.post("/okanassist/v1/upgrade")
+@router.post("/okanassist/v1/upgrade")
 async def handle_upgrade(request: UpgradeRequest):
     """Handles the premium upgrade request and generates a payment link."""
-    await initialize_services()
     try:
         # 1. Authenticate the user and get their data
         auth_request = AuthCheckRequest(telegram_id=request.user_id)
@@ -158,7 +190,7 @@ async def handle_upgrade(request: UpgradeRequest):
             }
 
         # 3. Generate the payment link
-        payment_details = await supabase_client.create_upgrade_link(user_data)
+        payment_details = await services.supabase_client.create_upgrade_link(user_data)
 
         if not payment_details.get("success"):
             raise HTTPException(status_code=500, detail="Could not generate payment link.")
@@ -175,16 +207,15 @@ async def handle_upgrade(request: UpgradeRequest):
         if e.status_code == 401:
             raise
         return {"success": False, "message": e.detail}
-    except Exception as e:
-        print(f"❌ Error in handle_upgrade: {e}")
+    except Exception:
+        logger.exception("Error in handle_upgrade")
         raise HTTPException(status_code=500, detail="An internal error occurred while processing your upgrade request.")
 ###
 ##TODO improve the webhook to handle refunds and cancellations
-@app.post("/okanassist/v1/webhooks/stripe")
+@router.post("/okanassist/v1/webhooks/stripe")
 async def handle_stripe_webhook(request: Request):
     """Handles incoming webhooks from Stripe to confirm payments."""
-    await initialize_services()
-    if not supabase_client:
+    if not services.supabase_client:
         raise HTTPException(status_code=503, detail="Service not ready")
 
     payload = await request.body()
@@ -194,18 +225,20 @@ async def handle_stripe_webhook(request: Request):
         raise HTTPException(status_code=400, detail="Missing Stripe-Signature header")
 
     try:
-        result = await supabase_client.handle_stripe_webhook(payload, sig_header)
+        result = await services.supabase_client.handle_stripe_webhook(payload, sig_header)
         success = result.get("success", False)
         telegram_id = result.get("telegram_id", None)
         message = result.get("message", "")
-        print(f"Webhook processed: success={success}, telegram_id={telegram_id}, message={message}")
+        logger.info("Stripe webhook processed", success=success, telegram_id=telegram_id)
         
         if success and telegram_id:
-            await send_telegram_message(telegram_id, message) if message else None
-            user_data = await supabase_client.get_user_by_telegram_id_auth(telegram_id)
+            if message:
+                # Answer Stripe right away; shutdown still waits for the send
+                services.spawn(send_telegram_message(telegram_id, message))
+            user_data = await services.supabase_client.get_user_by_telegram_id_auth(telegram_id)
             if user_data:
-                session_manager.create_session(telegram_id, user_data)
-                print(f"✅ Session refreshed for user {telegram_id} after payment.")
+                services.session_manager.create_session(telegram_id, user_data)
+                logger.info("Session refreshed after payment", telegram_id=telegram_id)
 
             return JSONResponse(content={"status": "success"}, status_code=200)
         elif success:
@@ -213,31 +246,32 @@ async def handle_stripe_webhook(request: Request):
         else:
             return JSONResponse(content={"status": "failed"}, status_code=400)
 
-    except Exception as e:
-        print(f"❌ Error processing Stripe webhook: {e}")
+    except Exception:
+        logger.exception("Error processing Stripe webhook")
         return JSONResponse(content={"status": "error"}, status_code=500)
 
-@app.post("/okanassist/v1/route-message")
+@router.post("/okanassist/v1/route-message")
 async def route_message(request: MessageRequest):
     """Route message through main agent - REQUIRES AUTHENTICATION + CREDITS"""
-    await initialize_services()
     lang = request.language_code
     try:
-        if not main_agent:
+        if not services.main_agent:
             raise HTTPException(status_code=503, detail="Service not ready")
         
         # Step 1: Get user data using centralized helper
         user_data = await get_user_data(AuthCheckRequest(telegram_id=request.user_id))
         supabase_id = user_data.get('user_id', None)
         telegram_id = request.user_id
-        print("user_data:", user_data)
         # Step 2: Consume credits (since auth is now verified)
         credit_result = await check_and_consume_credits(supabase_id, 'text_message', 1, user_data)
-        print("credit_result:", credit_result)
+        logger.debug(
+            "Routing message", user_id=supabase_id, telegram_id=telegram_id,
+            credits=credit_result, sample=DEBUG_SAMPLE_RATE
+        )
         user_data.setdefault('language', lang)
         # Step 3: Process the message
         if credit_result["success"]:
-            result = await main_agent.route_message(supabase_id, request.message, user_data)
+            result = await services.main_agent.route_message(supabase_id, request.message, user_data)
             # Add credit info to response if not premium
             if not credit_result.get('is_premium', False):
                 credits_remaining = credit_result.get('credits_remaining', 0)
@@ -245,23 +279,23 @@ async def route_message(request: MessageRequest):
                 if credits_remaining <= 10:
                     result += get_message("credit_warning", lang, credits_remaining=credits_remaining)
                     result += get_message("credit_low", lang)
-                print("Final result:", result)
+                logger.debug("Route message result", user_id=supabase_id, result=result, sample=DEBUG_SAMPLE_RATE)
             return {"success": True, "message": result}
         else:
             return {"success": False, "message": credit_result.get("message")}
         
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Unexpected error in route_message: {e}")
+    except Exception:
+        logger.exception("Unexpected error in route_message")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.post("/okanassist/v1/process-audio")
+@router.post("/okanassist/v1/process-audio")
 async def process_audio(user_id: str = Form(...), file: UploadFile = File(...)):
     """Process user audio input and route to the correct agent."""
-    await initialize_services()
+    temp_path = audio_path = None
     try:
-        if not main_agent:
+        if not services.main_agent:
             raise HTTPException(status_code=503, detail="Service not ready")
         # Step 1: Get user data
         user_data = await get_user_data(AuthCheckRequest(telegram_id=user_id))
@@ -273,37 +307,34 @@ async def process_audio(user_id: str = Form(...), file: UploadFile = File(...)):
         with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as temp_file:
             content = await file.read()
             temp_file.write(content)
-            ogg_path = temp_file.name
-        mp3_path = ogg_path.replace(".ogg", ".mp3")
-        mp3_path=await convert_audio(ogg_path, mp3_path)
-        # Step 2: Route audio through main agent
-        result = await main_agent.route_audio(supabase_id, mp3_path, user_data)
+            temp_path = temp_file.name
 
-        # Clean up temp file
-        os.unlink(ogg_path)
-        os.unlink(mp3_path)
+        # Only transcode when the backend can't take the upload as-is
+        audio_path, audio_format, _ = await audio_negotiator.prepare(temp_path, file.filename)
+        # Step 2: Route audio through main agent
+        result = await services.main_agent.route_audio(supabase_id, audio_path, user_data, audio_format)
 
         return {"success": True, "message": result}
     except HTTPException:
         raise
-    except Exception as e:
-        if 'temp_path' in locals():
-            try:
-                os.unlink(ogg_path)
-                os.unlink(mp3_path)
-            except:
-                pass
-        print(f"❌ Unexpected error in process_audio: {e}")
+    except Exception:
+        logger.exception("Unexpected error in process_audio")
         raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        # Clean up temp files
+        for path in {temp_path, audio_path}:
+            if path:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
 
 ####### Transactions Endpoints
 
 
-@app.post("/okanassist/v1/process-notification")
+@router.post("/okanassist/v1/process-notification")
 async def process_notification(request: NotificationRequest):
     """Handle automated transactions parser - REQUIRES AUTHENTICATION"""
-    print("here: in process_notification")
-    await initialize_services()
     try:
         # Step 1: Check if telegram_id is provided; if not, fetch it using fetch_telegram_id
         telegram_id = request.telegram_id
@@ -317,47 +348,61 @@ async def process_notification(request: NotificationRequest):
         user_data = await get_user_data(AuthCheckRequest(telegram_id=telegram_id))
         # At this point, user is authenticated, and user_data is available
         
-        # Step 3: Print the data received (for debugging/logging)
-        print(f"📨 Processed notification data: {request.model_dump()}")
+        # Step 3: Log the data received. Title and text are personal (bank alerts, messages), so only their shape is logged
+        logger.info(
+            "Notification received", telegram_id=telegram_id, app=request.app,
+            title_length=len(request.title), text_length=len(request.text)
+        )
         
         # Step 4: Return the response
         return {"message": "Processed", "telegram_id": telegram_id}
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Unexpected error in process_notification: {e}")
+    except Exception:
+        logger.exception("Unexpected error in process_notification")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.post("/okanassist/v1/process-receipt")
+@router.post("/okanassist/v1/process-receipt")
 async def process_receipt(user_id: str=Form(...), file: UploadFile = File(...)):
     """Process receipt image - REQUIRES AUTHENTICATION + CREDITS"""
-    await initialize_services()
     try:
-        if not transaction_agent:
+        if not services.transaction_agent:
             raise HTTPException(status_code=503, detail="Service not ready")
-        print("here: in process_receipt")
         # Step 1: Get user data using centralized helper
         user_data = await get_user_data(AuthCheckRequest(telegram_id=user_id))
         supabase_id = user_data.get('user_id', None)
         lang_code = user_data.get('language', 'en')
-        # Step 2: Consume credits (since auth is now verified)
-        credit_result = await check_and_consume_credits(supabase_id, 'receipt_processing', 5, user_data)
+        content = await file.read()
+        # Step 2: Re-sent receipts are served from cache for free. One lookup decides both, so an
+        # entry can't expire between the credit check and the extraction, and a duplicate upload
+        # arriving while this one is extracted waits for its result instead of paying again
+        extraction_cache = services.transaction_agent.extraction_cache
+        cache_key = extraction_cache.make_key(supabase_id, content)
+        cached_result = await extraction_cache.get_or_claim(cache_key)
+        if cached_result:
+            logger.info("Duplicate receipt, returning previous result", user_id=supabase_id)
+            return TransactionResponse(success=True, message=cached_result)
+        try:
+            # Consume credits (since auth is now verified)
+            credit_result = await check_and_consume_credits(supabase_id, 'receipt_processing', 5, user_data)
 
-        # Step 3: Process the receipt
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
+            # Step 3: Process the receipt
+            # Save uploaded file temporarily
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_file:
+                temp_file.write(content)
+                temp_path = temp_file.name
 
-        result = await transaction_agent.process_receipt_image(user_data, temp_path)
+            result = await services.transaction_agent.process_receipt_image(user_data, temp_path, cache_key=cache_key)
+        finally:
+            # The agent cached the result on success; wake any duplicate waiting on this upload
+            extraction_cache.release(cache_key)
 
         # Clean up temp file
         os.unlink(temp_path)
         
         # Add credit info to response if not premium
-        if not credit_result.get('is_premium', False):
+        if credit_result and not credit_result.get('is_premium', False):
             credits_remaining = credit_result.get('credits_remaining', 0)
             result += get_message("credit_warning", lang_code, credits_remaining=credits_remaining)
         
@@ -365,41 +410,53 @@ async def process_receipt(user_id: str=Form(...), file: UploadFile = File(...)):
         
     except HTTPException:
         raise
-    except Exception as e:
+    except Exception:
         # Clean up temp file on error
         if 'temp_path' in locals():
             try:
                 os.unlink(temp_path)
             except:
                 pass
-        print(f"❌ Unexpected error in process_receipt: {e}")
+        logger.exception("Unexpected error in process_receipt")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.post("/okanassist/v1/process-bank-statement")
+@router.post("/okanassist/v1/process-bank-statement")
 async def process_bank_statement(user_id: str = Form(...), file: UploadFile = File(...)):
     """Process bank statement PDF - REQUIRES AUTHENTICATION"""
-    await initialize_services()
     try:
-        if not transaction_agent:
+        if not services.transaction_agent:
             raise HTTPException(status_code=503, detail="Service not ready")
         
         # Step 1: Get user data using centralized helper
         user_data = await get_user_data(AuthCheckRequest(telegram_id=user_id))
         supabase_id = user_data.get('user_id', None)
         lang_code = user_data.get('language', 'en')
-        # Step 2: Consume credits (since auth is now verified) - Note: 0 credits for bank statement
-        credit_result = await check_and_consume_credits(supabase_id, 'bank_statement', 5, user_data)
+        content = await file.read()
+        # Step 2: Re-sent statements are served from cache for free. One lookup decides both, so an
+        # entry can't expire between the credit check and the extraction, and a duplicate upload
+        # arriving while this one is extracted waits for its result instead of paying again
+        extraction_cache = services.transaction_agent.extraction_cache
+        cache_key = extraction_cache.make_key(supabase_id, content)
+        cached_result = await extraction_cache.get_or_claim(cache_key)
+        if cached_result:
+            logger.info("Duplicate bank statement, returning previous result", user_id=supabase_id)
+            return TransactionResponse(success=True, message=cached_result)
+        try:
+            # Consume credits (since auth is now verified)
+            credit_result = await check_and_consume_credits(supabase_id, 'bank_statement', 5, user_data)
 
-        # Step 3: Process the bank statement
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
+            # Step 3: Process the bank statement
+            # Save uploaded file temporarily
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+                temp_file.write(content)
+                temp_path = temp_file.name
 
-        result = await transaction_agent.process_bank_statement(supabase_id, temp_path)
+            result = await services.transaction_agent.process_bank_statement(user_data, temp_path, lang_code, cache_key=cache_key)
+        finally:
+            # The agent cached the result on success; wake any duplicate waiting on this upload
+            extraction_cache.release(cache_key)
 
-        if not credit_result.get('is_premium', False):
+        if credit_result and not credit_result.get('is_premium', False):
             credits_remaining = credit_result.get('credits_remaining', 0)
             result += get_message("credit_warning", lang_code, credits_remaining=credits_remaining)
         
@@ -411,66 +468,144 @@ async def process_bank_statement(user_id: str = Form(...), file: UploadFile = Fi
         
     except HTTPException:
         raise
-    except Exception as e:
+    except Exception:
         # Clean up temp file on error
         if 'temp_path' in locals():
             try:
                 os.unlink(temp_path)
             except:
                 pass
-        print(f"❌ Unexpected error in process_bank_statement: {e}")
+        logger.exception("Unexpected error in process_bank_statement")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.post("/okanassist/v1/get-transaction-summary")
+@router.post("/okanassist/v1/get-transaction-summary")
 async def get_transaction_summary(request: SummaryRequest):
     """Get transaction summary - REQUIRES AUTHENTICATION"""
-    await initialize_services()
     try:
-        if not transaction_agent:
+        if not services.transaction_agent:
             raise HTTPException(status_code=503, detail="Service not ready")
         
         # Step 1: Get user data using centralized helper
         user_data = await get_user_data(AuthCheckRequest(telegram_id=request.user_id))
         supabase_id = user_data.get('user_id', None)
         # Step 2: Process the summary (no credits needed)
-        result = await transaction_agent.get_summary(supabase_id, request.days)
+        result = await services.transaction_agent.get_summary(supabase_id, request.days)
         return {"success": True, "message": result}
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Unexpected error in get_transaction_summary: {e}")
+    except Exception:
+        logger.exception("Unexpected error in get_transaction_summary")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.post("/okanassist/v1/reports")
+async def get_financial_report(request: ReportRequest):
+    """
+    Multi-period financial report - REQUIRES AUTHENTICATION
+    Daily moving averages, weekly/monthly totals with month-over-month deltas,
+    per-category trends and expense percentiles, computed from one fetch of the period.
+    """
+    try:
+        # Step 1: Get user data using centralized helper
+        user_data = await get_user_data(AuthCheckRequest(telegram_id=request.user_id))
+        supabase_id = user_data.get('user_id', None)
+
+        from tools.analytics import TransactionColumns, build_financial_report
+
+        # Step 2: Fetch the period as columns and compute off the event loop (no credits needed)
+        raw_columns = await services.supabase_client.database.get_transaction_columns(supabase_id, request.days)
+        columns = await asyncio.to_thread(TransactionColumns.from_lists, **raw_columns)
+        report = await asyncio.to_thread(build_financial_report, supabase_id, columns, request.days)
+        return {"success": True, "report": report.to_dict()}
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Unexpected error in get_financial_report")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/okanassist/v1/transactions")
+async def list_transactions(user_id: str, limit: int = 50, cursor: Optional[str] = None,
+                            transaction_type: Optional[str] = None, category: Optional[str] = None,
+                            fields: Optional[str] = None):
+    """
+    List transactions newest first, one page at a time - REQUIRES AUTHENTICATION
+    Pass the returned next_cursor to get the following page; fields is a comma-separated column list.
+    """
+    try:
+        # Step 1: Get user data using centralized helper
+        user_data = await get_user_data(AuthCheckRequest(telegram_id=user_id))
+        supabase_id = user_data.get('user_id', None)
+
+        # Step 2: Fetch the page (no credits needed)
+        columns = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        page = await services.supabase_client.database.list_transactions(
+            supabase_id, limit=limit, cursor=cursor,
+            transaction_type=transaction_type, category=category, columns=columns
+        )
+        return {"success": True, **page.to_dict()}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        logger.exception("Unexpected error in list_transactions")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/okanassist/v1/transactions/export")
+async def export_transactions(user_id: str, format: str = "csv", days: Optional[int] = None):
+    """
+    Stream the user's full transaction history as CSV or NDJSON - REQUIRES AUTHENTICATION
+    Rows flow from a server-side cursor straight to the client, so memory stays flat for any history size.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    try:
+        # Step 1: Get user data using centralized helper
+        user_data = await get_user_data(AuthCheckRequest(telegram_id=user_id))
+        supabase_id = user_data.get('user_id', None)
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Unexpected error in export_transactions")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    # Step 2: Stream the export (no credits needed)
+    rows = services.supabase_client.database.iter_transactions_for_export(supabase_id, list(EXPORT_COLUMNS), days=days)
+    filename = f"transactions_{datetime.now():%Y%m%d}.{format}"
+    return StreamingResponse(
+        stream_export(rows, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 
 ### Reminders Endpoints
-@app.post("/okanassist/v1/get-reminders")
+@router.post("/okanassist/v1/get-reminders")
 async def get_reminders(user_id: str, limit: int = 10):
     """Get user reminders - REQUIRES AUTHENTICATION"""
-    await initialize_services()
     try:
-        if not reminder_agent:
+        if not services.reminder_agent:
             raise HTTPException(status_code=503, detail="Service not ready")
         
         # Step 1: Get user data using centralized helper
         user_data = await get_user_data(AuthCheckRequest(telegram_id=user_id))
         
         # Step 2: Process the reminders (no credits needed)
-        result = await reminder_agent.get_reminders(user_data)
+        result = await services.reminder_agent.get_reminders(user_data)
         return {"success": True, "message": result}
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Unexpected error in get_reminders: {e}")
+    except Exception:
+        logger.exception("Unexpected error in get_reminders")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 ## server function to receive batch of reminders and send notifications
-@app.post("/okanassist/v1/batch-notify-reminders")
+@router.post("/okanassist/v1/batch-notify-reminders")
 async def batch_notify_reminders(request: Request):
     """Receive batch of reminders and send notifications."""
     try:
         data = await request.json()
         reminders = data.get("reminders", [])
-        print(f"Received {len(reminders)} reminders for notification.")
+        logger.info("Reminder batch received", count=len(reminders))
         notified = []
         for reminder_data in reminders:
             reminder_id = reminder_data["reminder_id"]
@@ -484,7 +619,7 @@ async def batch_notify_reminders(request: Request):
             await send_telegram_notification(telegram_id, title, description, due_datetime, timezone)
 
             # Mark as notified in DB
-            await supabase_client.database.mark_reminder_notified(reminder_id)
+            await services.supabase_client.database.mark_reminder_notified(reminder_id)
             notified.append(reminder_id)
 
             # --- Recurring logic ---
@@ -502,34 +637,33 @@ async def batch_notify_reminders(request: Request):
                     next_due = None
 
                 if next_due:
-                    await supabase_client.database.update_reminder_due_datetime(
+                    await services.supabase_client.database.update_reminder_due_datetime(
                         reminder_id,
                         next_due.isoformat().replace("+00:00", "Z")
                     )
 
         return {"success": True, "notified_count": len(notified), "reminder_ids": notified}
     except Exception as e:
-        print(f"❌ Error in batch_notify_reminders: {e}")
+        logger.exception("Error in batch_notify_reminders")
         return {"success": False, "error": str(e)}
 
 ##### User Management Endpoints
-@app.post("/okanassist/v1/register")
+@router.post("/okanassist/v1/register")
 async def register_user(request: RegisterRequest):
     """Register new user using Supabase Auth"""
-    await initialize_services()
     lang_code = request.language_code
     try:
-        if not supabase_client or not timezone_agent:
+        if not services.supabase_client or not services.timezone_agent:
             raise HTTPException(status_code=503, detail="Service not ready")
         
         # Try to check if the user is already registered/authenticated
         user_data = None
         try:
             user_data = await get_user_data(AuthCheckRequest(telegram_id=request.telegram_id))
-            print("User already authenticated:", user_data)
+            logger.info("User already registered", telegram_id=request.telegram_id, user_id=user_data.get("user_id"))
         except HTTPException as e:
             if e.status_code not in (401, 404):
-                print(f"❌ Error checking existing user in register_user: {e}")
+                logger.error("Error checking existing user in register_user", status=e.status_code, detail=e.detail)
                 raise
             user_data = None
 
@@ -541,20 +675,19 @@ async def register_user(request: RegisterRequest):
         
         # --- Registration process continues here ---
         raw_timezone_input = request.timezone
-        processed_timezone, utc_offset = await timezone_agent.identify_timezone(
+        processed_timezone, utc_offset = await services.timezone_agent.identify_timezone(
             language=lang_code, 
             text_input=raw_timezone_input
         )
-        print(f"Processed timezone: {processed_timezone}, UTC offset: {utc_offset}")
+        logger.info("Registration timezone resolved", timezone=processed_timezone, utc_offset=utc_offset)
 
         if not processed_timezone:
-            print(f"⚠️ Timezone identification failed for input '{raw_timezone_input}'. Defaulting to UTC.")
+            logger.warning("Timezone identification failed, defaulting to UTC", timezone_input=raw_timezone_input)
             processed_timezone = "UTC"
-        inferred_currency = infer_currency(processed_timezone)
-        print(f"Inferred currency: {inferred_currency}")
+        inferred_currency = currency_for_timezone(processed_timezone)
         
         # Create new user in Supabase Auth
-        auth_result = await supabase_client.sign_up_user_with_auth(
+        auth_result = await services.supabase_client.sign_up_user_with_auth(
             email=request.email,
             password=None,
             user_metadata={
@@ -572,7 +705,7 @@ async def register_user(request: RegisterRequest):
             }
         
         # Create user settings in the database and already link telegram_id
-        result = await supabase_client.create_new_user_settings(
+        result = await services.supabase_client.create_new_user_settings(
             auth_result['user_id'],
             {
                 'name': request.name,
@@ -596,7 +729,7 @@ async def register_user(request: RegisterRequest):
                 'telegram_id': request.telegram_id,
                 'authenticated': True
             }
-            session_manager.create_session(request.telegram_id, user_data)
+            services.session_manager.create_session(request.telegram_id, user_data)
             return {
                 "success": True,
                 "message": get_message("registration_success", lang_code, name=request.name, password=auth_result['password'], download_url=os.getenv("APP_DOWNLOAD_URL", "https://play.google.com/store/apps/details?id=com.okanassist")),
@@ -610,45 +743,50 @@ async def register_user(request: RegisterRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Registration error API register_user: error aqui {e}")
+        logger.exception("Registration error in register_user")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/okanassist/v1/profile")
+@router.get("/okanassist/v1/profile")
 async def get_profile(user_id: str):
     """Get user profile - REQUIRES AUTHENTICATION"""
-    await initialize_services()
     try:
         # Step 1: Get user data using centralized helper
         user_data = await get_user_data(AuthCheckRequest(telegram_id=user_id))
         if user_data.get("is_premium"):
-            customer_id = await supabase_client.get_customer_id_from_payments(user_data["user_id"])
-            manage_url = await supabase_client.create_customer_portal_link(customer_id)
+            customer_id = await services.supabase_client.get_customer_id_from_payments(user_data["user_id"])
+            manage_url = await services.supabase_client.create_customer_portal_link(customer_id)
             return {"success": True, "user_data": user_data, "manage_url": manage_url}
         else:
             return {"success": True, "user_data": user_data, "manage_url": None}
 
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Unexpected error in get_profile: {e}")
+    except Exception:
+        logger.exception("Unexpected error in get_profile")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/okanassist/v1/health")
 async def health_check():
-    """Health check endpoint"""
-    await initialize_services()
+    """Health check endpoint; never starts services, reports "starting" until they are up"""
     return {
-        "status": "healthy", 
+        "status": "healthy" if services.ready else "starting",
         "service": "okanassist-ai",
         "timestamp": datetime.now().isoformat(),
         "services": {
-            "supabase_client": supabase_client is not None,
-            "transaction_agent": transaction_agent is not None,
-            "reminder_agent": reminder_agent is not None,
-            "main_agent": main_agent is not None
-        }
+            "supabase_client": services.supabase_client is not None,
+            "transaction_agent": services.transaction_agent is not None,
+            "reminder_agent": services.reminder_agent is not None,
+            "main_agent": services.main_agent is not None
+        },
+        "audio": audio_negotiator.get_stats(),
+        "extraction_cache": services.transaction_agent.extraction_cache.get_stats() if services.transaction_agent else None,
+        "summary_cache": services.supabase_client.database.summary_cache.get_stats() if services.supabase_client else None,
+        "timezone_resolver": services.timezone_agent.resolver.get_stats() if services.timezone_agent else None,
+        "geo_lookup": geo_lookup.get_stats()
     }
 
+app.include_router(router)
+
 ##### HELPER FUNCTIONS #####
 # Centralized authentication function
 async def check_authentication(request: AuthCheckRequest) -> Dict[str, Any]:
@@ -659,67 +797,66 @@ async def check_authentication(request: AuthCheckRequest) -> Dict[str, Any]:
     lang_code = request.language
     try:
         # First, check if the telegram_id is linked to a supabase user
-        user_data = await supabase_client.get_user_by_telegram_id_auth(request.telegram_id)
+        user_data = await services.supabase_client.get_user_by_telegram_id_auth(request.telegram_id)
         if user_data:
-            print(f"🔍 Found linked user for telegram_id {request.telegram_id}")
+            logger.debug("Found linked user", telegram_id=request.telegram_id)
             return await _validate_and_complete_user_data(user_data, request.telegram_id)
 
         # If not found, try to link if supabase_user_id is provided
         if request.supabase_user_id:
-            print("Trying to link:", request)
+            logger.info("Linking Telegram user", telegram_id=request.telegram_id, supabase_user_id=request.supabase_user_id)
             try:
-                result = await supabase_client.link_telegram_user(
+                result = await services.supabase_client.link_telegram_user(
                     request.supabase_user_id, 
                     request.telegram_id, 
                 )
                 if result.get("success"):
                     # After successful link, fetch the complete user data again
-                    user_data = await supabase_client.get_user_by_telegram_id_auth(request.telegram_id)
-                    print("Linking successful, fetched user_data:", user_data)
+                    user_data = await services.supabase_client.get_user_by_telegram_id_auth(request.telegram_id)
+                    logger.info("Linking successful", telegram_id=request.telegram_id, found=user_data is not None)
                     if user_data:
                         return await _validate_and_complete_user_data(user_data, request.telegram_id)
                 
                 # If linking or re-fetching fails, raise an exception
                 raise HTTPException(status_code=401, detail=get_message("link_failed", lang_code))
 
-            except Exception as e:
-                print(f"❌ Error linking user in check_authentication: {e}")
+            except Exception:
+                logger.exception("Error linking user in check_authentication", telegram_id=request.telegram_id)
                 raise HTTPException(status_code=401, detail=get_message("link_failed", lang_code))
         
         # If no user found and no supabase_user_id to link, they must register
         else:
-            print(f"⚠️ User {request.telegram_id} not registered.")
+            logger.info("User not registered", telegram_id=request.telegram_id)
             raise HTTPException(status_code=401, detail=get_message("user_not_registered", lang_code))
 
     except HTTPException:
         raise # Re-raise known HTTP exceptions
-    except Exception as e:
-        print(f"❌ Uncaught error in check_authentication: {e}")
+    except Exception:
+        logger.exception("Uncaught error in check_authentication")
         raise HTTPException(status_code=500, detail="An error occurred during authentication.")
 
 ##used for sending payments telegram messages to users
 async def send_telegram_message(telegram_id: str, message: str):
     """Send message via Telegram Bot API"""
-    bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    async with aiohttp.ClientSession() as session:
-        await session.post(url, json={"chat_id": telegram_id, "text": message})
+    url = f"{services.telegram_api_url}/bot{services.bot_token}/sendMessage"
+    with TELEGRAM_SEND_SECONDS.time(kind="message"):
+        async with services.http_session.post(url, json={"chat_id": telegram_id, "text": message}) as response:
+            await response.read()
 
 #function used when the notification system sends the first automated transaction to api
 async def fetch_telegram_id(request: NotificationRequest):
     """Fetch Telegram ID by email"""
-    await initialize_services()
     try:
-        if not supabase_client:
+        if not services.supabase_client:
             raise HTTPException(status_code=503, detail="Service not ready")
-        telegram_id = await supabase_client.get_telegram_id_by_email(request.email)
+        telegram_id = await services.supabase_client.get_telegram_id_by_email(request.email)
         if not telegram_id:
             return {"success": False, "message": "Telegram ID not found"}
         return {"success": True, "telegram_id": telegram_id}
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Unexpected error in fetch_telegram_id: {e}")
+    except Exception:
+        logger.exception("Unexpected error in fetch_telegram_id")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -727,29 +864,28 @@ async def fetch_telegram_id(request: NotificationRequest):
 async def send_telegram_notification(telegram_id: str, title: str, description: str, due_datetime: str, timezone: str = "UTC"):
     """Send notification via Telegram bot, converting due_datetime to user's timezone."""
     try:
-        # Parse UTC datetime
-        utc_dt = datetime.fromisoformat(due_datetime.replace("Z", "+00:00")).replace(tzinfo=pytz.utc)
-        
-        # Convert to user's timezone
-        user_tz = pytz.timezone(timezone)
-        local_dt = utc_dt.astimezone(user_tz)
+        # Parse UTC datetime and convert to user's timezone
+        utc_dt = datetime.fromisoformat(due_datetime.replace("Z", "+00:00")).replace(tzinfo=None)
+        local_dt = to_local(utc_dt, timezone)
         
         # Format for display (e.g., "2025-09-29 10:00")
         formatted_due = local_dt.strftime('%Y-%m-%d %H:%M')
         
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        url = f"{services.telegram_api_url}/bot{services.bot_token}/sendMessage"
         message = f"🔔 Reminder: {title}\n\n{description}\n\nDue: {formatted_due} ({timezone})"
         
-        async with aiohttp.ClientSession() as session:
-            await session.post(url, json={
+        with TELEGRAM_SEND_SECONDS.time(kind="reminder"):
+            async with services.http_session.post(url, json={
                 "chat_id": telegram_id,
                 "text": message,
                 "parse_mode": "Markdown"
-            })
-    except Exception as e:
-        print(f"❌ Error sending Telegram notification: {e}")
+            }) as response:
+                await response.read()
+    except Exception:
+        logger.exception("Error sending Telegram notification", telegram_id=telegram_id)
 
 # Wrap the session manager access and use the exception-based check_authentication
+@traced("get_user_data")
 async def get_user_data(auth_request: AuthCheckRequest) -> Dict[str, Any]:
     """
     Helper to get user data from session or database.
@@ -757,29 +893,35 @@ async def get_user_data(auth_request: AuthCheckRequest) -> Dict[str, Any]:
     """
     try:
         # 1. Check for a valid and complete session first
-        if session_manager.is_authenticated(auth_request.telegram_id):
-            session = session_manager.get_session(auth_request.telegram_id)
-            if session and _is_user_data_complete(session):
-                print(f"✅ Retrieved complete user data from session for {auth_request.telegram_id}")
-                return session
+        with AUTH_SECONDS.time(source="session"):
+            session = None
+            if services.session_manager.is_authenticated(auth_request.telegram_id):
+                session = services.session_manager.get_session(auth_request.telegram_id)
+        if session and _is_user_data_complete(session):
+            SESSION_LOOKUPS.inc(result="hit")
+            current_span().set_attribute("auth.source", "session")
+            return session
+        SESSION_LOOKUPS.inc(result="miss")
+        current_span().set_attribute("auth.source", "database")
         
         # 2. If no valid session, perform full authentication
-        print(f"🔍 No valid session for {auth_request.telegram_id} - performing full authentication.")
-        user_data = await check_authentication(auth_request)
+        logger.debug("No valid session, authenticating", telegram_id=auth_request.telegram_id)
+        with AUTH_SECONDS.time(source="database"):
+            user_data = await check_authentication(auth_request)
         
         # 3. On successful authentication, create a new session
-        session_manager.create_session(auth_request.telegram_id, user_data)
-        print(f"✅ Session created for {auth_request.telegram_id}")
+        services.session_manager.create_session(auth_request.telegram_id, user_data)
+        logger.debug("Session created", telegram_id=auth_request.telegram_id)
         
         return user_data
 
     except HTTPException as e:
         # Log and re-raise HTTP exceptions from check_authentication
-        print(f"❌ Authentication failed for {auth_request.telegram_id}: {e.detail}")
+        logger.info("Authentication failed", telegram_id=auth_request.telegram_id, status=e.status_code)
         raise
-    except Exception as e:
+    except Exception:
         # Catch any other unexpected errors
-        print(f"❌ Unexpected error in get_user_data: {e}")
+        logger.exception("Unexpected error in get_user_data")
         raise HTTPException(status_code=500, detail="Internal server error during data retrieval.")
 
 
@@ -791,20 +933,20 @@ async def _validate_and_complete_user_data(user_data: Dict[str, Any], telegram_i
     # Check if all required fields are present and non-empty
     for field in required_fields:
         if not user_data.get(field):
-            print(f"⚠️ Missing or empty field '{field}' in user data for {telegram_id} - attempting to complete")
+            logger.warning("Incomplete user data, attempting to complete", field=field, telegram_id=telegram_id)
             # Try to fetch from Supabase Auth if user_id is available
             if user_data.get('user_id'):
                 try:
-                    #auth_user = await supabase_client.supabase.auth.admin.get_user_by_id(user_data['user_id'])
-                    auth_user=await supabase_client.get_user_by_telegram_id_auth(telegram_id) # Avoid bugs
+                    #auth_user = await services.supabase_client.supabase.auth.admin.get_user_by_id(user_data['user_id'])
+                    auth_user=await services.supabase_client.get_user_by_telegram_id_auth(telegram_id) # Avoid bugs
                     if auth_user:
                         user_data['email'] = auth_user.get('email') or user_data.get('email', '')
                         user_data['name'] = auth_user.get('name') or user_data.get('name', 'Unknown')
                         #user_data['last_name'] = auth_user.user.user_metadata.get('last_name', user_data.get('last_name', ''))
                         user_data['authenticated'] = True
-                        print(f"✅ Completed user data for {telegram_id}")
-                except Exception as e:
-                    print(f"❌ Failed to complete user data for {telegram_id}: {e}")
+                        logger.info("Completed user data", telegram_id=telegram_id)
+                except Exception:
+                    logger.exception("Failed to complete user data", telegram_id=telegram_id)
             break  # Stop after first missing field to avoid redundant calls
     
     return user_data
@@ -816,9 +958,10 @@ def _is_user_data_complete(user_data: Dict[str, Any]) -> bool:
     return all(user_data.get(field) for field in required_fields)
 
 
+@traced("check_and_consume_credits")
 async def check_and_consume_credits(user_id: str, operation_type: str, credits_needed: int, user_data: Dict[str, Any] = None) -> dict:
     """Check and consume credits before processing - Assumes auth is already verified"""
-    if not supabase_client:
+    if not services.supabase_client:
         raise HTTPException(status_code=503, detail="Service not ready")
     
     # REMOVED: No need to re-check authentication here (it's done upstream)
@@ -827,9 +970,13 @@ async def check_and_consume_credits(user_id: str, operation_type: str, credits_n
         raise HTTPException(status_code=401, detail="User data not provided - authentication required")
     
     # Try to consume credits
-    result = await supabase_client.consume_credits(
-        user_id, operation_type, credits_needed
-    )
+    with CREDIT_CHECK_SECONDS.time(operation=operation_type):
+        result = await services.supabase_client.consume_credits(
+            user_id, operation_type, credits_needed
+        )
+    span = current_span()
+    span.set_attribute("credits.operation", operation_type)
+    span.set_attribute("credits.success", bool(result['success']))
     
     if not result['success']:
         if result.get('error') == 'insufficient_credits':
@@ -846,54 +993,3 @@ async def check_and_consume_credits(user_id: str, operation_type: str, credits_n
             }
     
     return result
-
-
-def infer_currency(timezone: str) -> str:
-    """Infer currency code from timezone (basic mapping, can be expanded)."""
-    timezone_currency_map = {
-        "America/Sao_Paulo": "BRL",
-        "America/New_York": "USD",
-        "America/Los_Angeles": "USD",
-        "Europe/London": "GBP",
-        "Europe/Madrid": "EUR",
-        "Europe/Paris": "EUR",
-        "Europe/Berlin": "EUR",
-        "Asia/Tokyo": "JPY",
-        "Asia/Shanghai": "CNY",
-        "Asia/Kolkata": "INR",
-        "Australia/Sydney": "AUD",
-        "Africa/Johannesburg": "ZAR",
-        "UTC": "USD",
-    }
-    currency = timezone_currency_map.get(timezone)
-    if currency:
-        return currency
-    if timezone.startswith("America/"):
-        return "USD"
-    elif timezone.startswith("Europe/"):
-        return "EUR"
-    elif timezone.startswith("Asia/"):
-        return "USD"
-    elif timezone.startswith("Australia/"):
-        return "AUD"
-    elif timezone.startswith("Africa/"):
-        return "USD"
-    return "USD"
-
-async def convert_audio(input_path: str, output_path: str) -> str:
-    """
-    Convert .ogg audio file to .mp3 using ffmpeg.
-    Returns the output file path.
-    """
-    try:
-        # Run ffmpeg to convert .ogg to .mp3
-        subprocess.run(
-            ["ffmpeg", "-y", "-i", input_path, output_path],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        return output_path
-    except Exception as e:
-        print(f"❌ Audio conversion failed: {e}")
-        raise RuntimeError("Audio conversion failed")
\ No newline at end of file
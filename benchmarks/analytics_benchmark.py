@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy analytics engine behind /okanassist/v1/reports on synthetic
+transactions at increasing sizes up to 1M rows, to check that time scales linearly.
+
+    python benchmarks/analytics_benchmark.py [--max-rows 1000000] [--days 365]
+
+Reports column build time (lists -> arrays, what the endpoint does with the DB result)
+and report time separately, plus microseconds per row.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.analytics import TransactionColumns, build_financial_report, _epoch_day
+
+CATEGORIES = ["groceries", "transport", "restaurants", "utilities", "entertainment",
+              "health", "shopping", "education", "travel", "salary", "freelance"]
+
+
+def synthetic_lists(rows: int, days: int, end_date: date):
+    """Column lists shaped like Database.get_transaction_columns output"""
+    rng = random.Random(42)
+    end_day = _epoch_day(end_date)
+    day_values = [end_day - rng.randrange(days) for _ in range(rows)]
+    is_expense = [rng.random() < 0.9 for _ in range(rows)]
+    amounts = [round(rng.lognormvariate(3, 1), 2) for _ in range(rows)]
+    categories = [CATEGORIES[rng.randrange(9)] if expense else CATEGORIES[9 + rng.randrange(2)]
+                  for expense in is_expense]
+    return {"days": day_values, "amounts": amounts, "is_expense": is_expense, "categories": categories}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    end_date = date.today()
+    sizes = [size for size in (125_000, 250_000, 500_000, 1_000_000) if size <= args.max_rows] or [args.max_rows]
+
+    print(f"📊 Financial report over {args.days} days")
+    print(f"  {'rows':>10}  {'columns ms':>10}  {'report ms':>10}  {'us/row':>7}")
+    for size in sizes:
+        raw = synthetic_lists(size, args.days, end_date)
+
+        started = time.perf_counter()
+        columns = TransactionColumns.from_lists(**raw)
+        built = time.perf_counter()
+        report = build_financial_report("benchmark", columns, args.days, end_date=end_date)
+        finished = time.perf_counter()
+
+        assert report.totals["expense_count"] + report.totals["income_count"] == size
+        print(f"  {size:>10,}  {(built - started) * 1000:10.1f}  {(finished - built) * 1000:10.1f}  "
+              f"{(finished - started) / size * 1e6:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
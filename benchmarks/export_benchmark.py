@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming transaction export with 1M synthetic rows.
+Rows go through the same formatter the /transactions/export endpoint uses and are
+drained by a consumer, while RSS is sampled every 100k rows: it should stay flat.
+
+    python benchmarks/export_benchmark.py                  # in-process synthetic rows
+    python benchmarks/export_benchmark.py --format ndjson
+    python benchmarks/export_benchmark.py --database-url postgresql://...  # server-side cursor over generate_series
+
+Exits non-zero if RSS grows more than --max-growth-mb after the first sample.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.json_codec import init_json_codecs
+from tools.transaction_export import EXPORT_COLUMNS, stream_export
+
+SAMPLE_EVERY = 100_000
+CATEGORIES = ["groceries", "transport", "restaurants", "utilities", "salary", "entertainment"]
+
+
+def current_rss_mb() -> float:
+    """Resident set size right now (Linux), falling back to the peak elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def synthetic_rows(count: int):
+    """Rows shaped like the export query's records"""
+    start = datetime(2020, 1, 1)
+    batch_id = uuid.uuid4()
+    for i in range(count):
+        yield {
+            "id": i + 1,
+            "date": start + timedelta(minutes=i),
+            "amount": Decimal(f"{(i % 50000) / 100 + 1:.2f}"),
+            "transaction_type": "income" if i % 10 == 0 else "expense",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "description": f"Synthetic transaction {i}",
+            "merchant": f"Merchant {i % 300}",
+            "source_platform": "telegram",
+            "tags": ["benchmark"],
+            "is_recurring": False,
+            "confidence_score": Decimal("0.95"),
+            "import_batch_id": batch_id,
+            "created_at": start + timedelta(minutes=i),
+        }
+        # Yield to the loop like a real cursor fetch would between batches
+        if i % 1000 == 0:
+            await asyncio.sleep(0)
+
+
+async def database_rows(database_url: str, count: int):
+    """Same shape, produced by Postgres and read through a server-side cursor"""
+    import asyncpg
+
+    conn = await asyncpg.connect(database_url)
+    await init_json_codecs(conn)
+    try:
+        async with conn.transaction(readonly=True):
+            query = """
+                SELECT g AS id,
+                       TIMESTAMP '2020-01-01' + g * INTERVAL '1 minute' AS date,
+                       ((g % 50000) / 100.0 + 1)::numeric(12,2) AS amount,
+                       CASE WHEN g % 10 = 0 THEN 'income' ELSE 'expense' END AS transaction_type,
+                       (ARRAY['groceries','transport','restaurants','utilities','salary','entertainment'])[g % 6 + 1] AS category,
+                       'Synthetic transaction ' || g AS description,
+                       'Merchant ' || (g % 300) AS merchant,
+                       'telegram' AS source_platform,
+                       '["benchmark"]'::jsonb AS tags,
+                       FALSE AS is_recurring,
+                       0.95::numeric(3,2) AS confidence_score,
+                       NULL::uuid AS import_batch_id,
+                       NOW()::timestamp AS created_at
+                FROM generate_series(1, $1) AS g
+            """
+            async for row in conn.cursor(query, count, prefetch=1000):
+                yield row
+    finally:
+        await conn.close()
+
+
+async def run(args) -> bool:
+    rows = database_rows(args.database_url, args.rows) if args.database_url else synthetic_rows(args.rows)
+
+    counted = 0
+    samples = []
+
+    async def counting(source):
+        nonlocal counted
+        async for row in source:
+            counted += 1
+            if counted % SAMPLE_EVERY == 0:
+                samples.append((counted, current_rss_mb()))
+            yield row
+
+    started = time.perf_counter()
+    total_bytes = 0
+    async for chunk in stream_export(counting(rows), args.format, list(EXPORT_COLUMNS)):
+        # Drain like a socket would; nothing is retained
+        total_bytes += len(chunk)
+    elapsed = time.perf_counter() - started
+
+    print(f"📊 Exported {counted:,} rows as {args.format}: {total_bytes / 1024 / 1024:.1f} MB in {elapsed:.1f}s "
+          f"({counted / elapsed:,.0f} rows/s)")
+    for rows_done, rss in samples:
+        print(f"  {rows_done:>9,} rows  RSS {rss:7.1f} MB")
+
+    if len(samples) < 2:
+        return True
+    growth = max(rss for _, rss in samples) - samples[0][1]
+    if growth > args.max_growth_mb:
+        print(f"❌ RSS grew {growth:.1f} MB after the first sample (limit {args.max_growth_mb} MB)")
+        return False
+    print(f"✅ RSS flat: grew {growth:.1f} MB after the first sample")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--max-growth-mb", type=float, default=20.0)
+    args = parser.parse_args()
+
+    success = asyncio.run(run(args))
+    exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the pure-Python functions that run on every request: message
+lookup, keyword categorization, the agents' fallback parsers and category validation,
+currency inference, session completeness and DB row mapping. Each case cycles through
+realistic inputs and reports nanoseconds per call (median/min over repeats).
+
+    python benchmarks/hot_paths_benchmark.py
+    python benchmarks/hot_paths_benchmark.py --json results/hot_paths.json
+    python benchmarks/hot_paths_benchmark.py --compare results/hot_paths.json --threshold 0.25
+    python benchmarks/hot_paths_benchmark.py --filter fallback --repeats 20
+
+--json stores the results; --compare runs the suite again and exits 1 if any case's
+median got slower than the stored one by more than --threshold. Compare results
+taken on the same machine and Python version.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import cycle, islice
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+RESULTS_SCHEMA = 1
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass
+class Case:
+    name: str
+    description: str
+    func: Callable[..., Any]
+    inputs: Sequence[tuple]
+    kwargs: Optional[Sequence[Dict[str, Any]]] = None
+
+
+# ============================================================================
+# INPUTS
+# ============================================================================
+
+MESSAGES_EN_ES_PT = [
+    "spent $25.50 on groceries at Walmart",
+    "paid 1,200 for rent",
+    "received 3000 salary",
+    "Uber to the airport 38",
+    "Gastei 40 reais no mercado",
+    "almuerzo 12.50",
+    "bought a coffee",
+    "earned 150 bonus from the freelance project",
+]
+
+REMINDER_MESSAGES = [
+    ("Remind me to call the bank tomorrow at 10am", "en"),
+    ("don't forget the dentist appointment on Friday", "en"),
+    ("Lembre-me de pagar a conta de luz amanhã, urgente", "pt"),
+    ("recuérdame la cita con el médico el lunes", "es"),
+    ("spent 20 on lunch", "en"),
+    ("agende uma reunião com o time às 15h", "pt"),
+]
+
+DESCRIPTIONS = [
+    ("Lunch at the Italian restaurant", "expense"),
+    ("Uber ride to the airport", "expense"),
+    ("Monthly electricity bill", "expense"),
+    ("Netflix subscription", "expense"),
+    ("Pharmacy - vitamins and medicine", "expense"),
+    ("Salary deposit from employer", "income"),
+    ("Dividend payment from stock portfolio", "income"),
+    ("Something unusual", "expense"),
+]
+
+TIMEZONES = [
+    "America/Sao_Paulo", "America/Mexico_City", "America/Argentina/Buenos_Aires", "Europe/Madrid",
+    "Europe/Lisbon", "America/New_York", "Asia/Tokyo", "UTC", "Africa/Lagos", "Pacific/Auckland",
+]
+
+CATEGORIES = [
+    ("Food & Dining", "expense"), ("Transportation", "expense"), ("Groceries", "expense"),
+    ("Salary", "income"), ("Bonus", "income"), ("Utilities", "expense"),
+]
+
+
+def transaction_rows(count: int = 64) -> List[Dict[str, Any]]:
+    """Dicts shaped like the asyncpg Records _row_to_transaction receives"""
+    base = datetime(2025, 9, 1, 12, 0)
+    user_id = uuid.UUID("3f0c9f2e-8a51-4a8e-9f0a-1c2d3e4f5a6b")
+    rows = []
+    for i in range(count):
+        imported = i % 4 == 0
+        rows.append({
+            "id": i, "user_id": user_id, "amount": Decimal(f"{12 + i % 50}.50"),
+            "description": f"Purchase {i}", "category": "Food & Dining",
+            "transaction_type": "income" if i % 10 == 0 else "expense",
+            "original_message": f"spent {12 + i % 50}.50 on food", "source_platform": "telegram",
+            "merchant": "Mercado Central" if i % 2 else None, "date": base - timedelta(hours=i),
+            "receipt_image_url": None, "location": None, "is_recurring": False,
+            "recurring_pattern": None, "tags": ["bank_import"] if imported else [],
+            "confidence_score": Decimal("0.85"),
+            "import_batch_id": uuid.uuid4() if imported else None,
+            "fingerprint": f"{i:064x}" if imported else None,
+            "created_at": base, "updated_at": base,
+        })
+    return rows
+
+
+def reminder_rows(count: int = 32) -> List[Dict[str, Any]]:
+    """Dicts shaped like the asyncpg Records _row_to_reminder receives"""
+    base = datetime(2025, 9, 1, 12, 0)
+    user_id = uuid.UUID("3f0c9f2e-8a51-4a8e-9f0a-1c2d3e4f5a6b")
+    return [{
+        "id": i, "user_id": user_id, "title": f"Reminder {i}", "description": "Pay the bill",
+        "source_platform": "telegram", "due_datetime": base + timedelta(hours=i),
+        "reminder_type": ("task", "event", "deadline", "habit", "general")[i % 5],
+        "priority": ("urgent", "high", "medium", "low")[i % 4], "is_completed": False,
+        "is_recurring": i % 3 == 0, "recurrence_pattern": "weekly" if i % 3 == 0 else None,
+        "notification_sent": False, "snooze_until": None, "tags": None, "location_reminder": None,
+        "attachments": [], "assigned_to_platforms": [], "created_at": base, "completed_at": None,
+        "updated_at": base,
+    } for i in range(count)]
+
+
+def user_sessions() -> List[Dict[str, Any]]:
+    complete = {
+        "user_id": "3f0c9f2e-8a51-4a8e-9f0a-1c2d3e4f5a6b", "email": "maria@example.com",
+        "name": "Maria", "currency": "BRL", "language": "pt", "timezone": "America/Sao_Paulo",
+        "is_premium": False, "premium_until": None, "freemium_credits": 42,
+        "telegram_id": "123456789", "authenticated": True,
+    }
+    return [complete, {**complete, "email": None}, {**complete, "name": ""}, {"user_id": complete["user_id"]}]
+
+
+# ============================================================================
+# CASES
+# ============================================================================
+
+def build_cases() -> List[Case]:
+    from agents.reminder_agent import ReminderAgent
+    from agents.transaction_agent import TransactionAgent
+    from api import _is_user_data_complete
+    from messages import get_message
+    from tools.database import Database
+    from tools.locale_data import currency_for_timezone
+    from tools.models import categorize_transaction
+
+    # Only the pure helpers are called; no client or model request is made
+    transaction_agent = TransactionAgent(None)
+    reminder_agent = ReminderAgent(None)
+    database = Database("postgresql://localhost/unused")
+
+    return [
+        Case("get_message", "translated template lookup and format (en/es/pt, with/without fields)",
+             get_message,
+             [("welcome_authenticated", "pt"), ("credit_warning", "es"), ("help_message", "en"),
+              ("transaction_created", "en-US"), ("upgrade_to_premium", "fr"), ("generic_error", "")],
+             [{"name": "Maria"}, {"credits_remaining": 7}, {},
+              {"emoji": "💸", "description": "Groceries", "amount": 25.5, "category": "Food & Dining",
+               "transaction_type": "expense"},
+              {"stripe_url": "https://checkout.stripe.com/c/pay/cs_test"}, {}]),
+        Case("categorize_transaction", "keyword scoring over the category tables",
+             categorize_transaction, DESCRIPTIONS),
+        Case("TransactionAgent._fallback_parse", "regex amount/type extraction when the LLM returns no JSON",
+             transaction_agent._fallback_parse, [(message,) for message in MESSAGES_EN_ES_PT]),
+        Case("TransactionAgent._validate_category", "category membership check with defaults",
+             transaction_agent._validate_category, CATEGORIES),
+        Case("ReminderAgent._fallback_parse", "per-language reminder keyword detection",
+             reminder_agent._fallback_parse, REMINDER_MESSAGES),
+        Case("currency_for_timezone", "currency inferred from the timezone on /register",
+             currency_for_timezone, [(zone,) for zone in TIMEZONES]),
+        Case("_is_user_data_complete", "session completeness check on every authenticated request",
+             _is_user_data_complete, [(session,) for session in user_sessions()]),
+        Case("Database._row_to_transaction", "row to Transaction dataclass",
+             database._row_to_transaction, [(row,) for row in transaction_rows()]),
+        Case("Database._row_to_reminder", "row to Reminder dataclass",
+             database._row_to_reminder, [(row,) for row in reminder_rows()]),
+    ]
+
+
+# ============================================================================
+# TIMING
+# ============================================================================
+
+def calls_for(case: Case, count: int) -> List[tuple]:
+    """`count` (args, kwargs) pairs cycling through the case inputs"""
+    kwargs = case.kwargs or [{}] * len(case.inputs)
+    return list(islice(cycle(zip(case.inputs, kwargs)), count))
+
+
+def time_calls(func: Callable[..., Any], calls: List[tuple]) -> float:
+    started = time.perf_counter_ns()
+    for args, kwargs in calls:
+        func(*args, **kwargs)
+    return time.perf_counter_ns() - started
+
+
+def calibrate(case: Case, min_time: float) -> int:
+    """Calls per repeat so one repeat takes at least min_time seconds"""
+    count = len(case.inputs)
+    while True:
+        elapsed = time_calls(case.func, calls_for(case, count)) / 1e9
+        if elapsed >= min_time or count >= 10_000_000:
+            return count
+        count = max(count * 2, int(count * min_time / max(elapsed, 1e-9) * 1.2))
+
+
+def run_case(case: Case, repeats: int, min_time: float) -> Dict[str, Any]:
+    count = calibrate(case, min_time)
+    calls = calls_for(case, count)
+    time_calls(case.func, calls)  # warm-up
+    samples = [time_calls(case.func, calls) / count for _ in range(repeats)]
+    return {
+        "description": case.description,
+        "inputs": len(case.inputs),
+        "calls_per_repeat": count,
+        "median_ns": round(statistics.median(samples), 1),
+        "min_ns": round(min(samples), 1),
+        "stdev_ns": round(statistics.stdev(samples), 1) if len(samples) > 1 else 0.0,
+        "samples_ns": [round(sample, 1) for sample in samples],
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_suite(cases: List[Case], repeats: int, min_time: float) -> Dict[str, Any]:
+    benchmarks = {}
+    for case in cases:
+        benchmarks[case.name] = result = run_case(case, repeats, min_time)
+        print(f"  {case.name:<38} {result['median_ns']:>10.0f} ns  "
+              f"(min {result['min_ns']:.0f}, ±{result['stdev_ns']:.0f})")
+    return {
+        "schema": RESULTS_SCHEMA,
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {"repeats": repeats, "min_time_s": min_time},
+        "benchmarks": benchmarks,
+    }
+
+
+# ============================================================================
+# COMPARISON
+# ============================================================================
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print per-case deltas against the baseline; returns the names that regressed"""
+    if baseline.get("schema") != RESULTS_SCHEMA:
+        raise SystemExit(f"Baseline schema {baseline.get('schema')} is not {RESULTS_SCHEMA}; re-create it with --json")
+    for key in ("python", "machine", "implementation"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"⚠️  Baseline {key} is {baseline['meta'].get(key)}, now {current['meta'].get(key)}; "
+                  f"timings may not be comparable")
+
+    regressions = []
+    print(f"\n{'benchmark':<38} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in current["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            print(f"{name:<38} {'-':>10} {result['median_ns']:>8.0f}ns      new")
+            continue
+        ratio = result["median_ns"] / previous["median_ns"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  ❌ slower"
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold):
+            flag = "  ✅ faster"
+        print(f"{name:<38} {previous['median_ns']:>8.0f}ns {result['median_ns']:>8.0f}ns {ratio - 1:>+8.1%}{flag}")
+    for name in baseline["benchmarks"]:
+        if name not in current["benchmarks"]:
+            print(f"{name:<38} {baseline['benchmarks'][name]['median_ns']:>8.0f}ns {'-':>10}  not run")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=15, help="timed repeats per case")
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per repeat (sets calls per repeat)")
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="results file to compare against; exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed median slowdown before a case counts as a regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    cases = [case for case in build_cases() if not args.filter or args.filter.lower() in case.name.lower()]
+    if not cases:
+        parser.error(f"No benchmark matches {args.filter!r}")
+
+    # Read the baseline first: --json may overwrite the same file
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"📊 Hot paths: {len(cases)} case(s), {args.repeats} repeats of ≥{args.min_time * 1000:.0f} ms")
+    results = run_suite(cases, args.repeats, args.min_time)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n✅ No regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON/JSONB row decoding per 10k rows: before (JSON text columns decoded with
+json.loads per row in Python, as _row_to_transaction/_row_to_reminder did) versus after
+(the json_codec decoder asyncpg runs while decoding each record).
+
+    python benchmarks/json_decode_benchmark.py
+    python benchmarks/json_decode_benchmark.py --database-url postgresql://...
+
+With --database-url both variants fetch real jsonb columns from Postgres (generate_series),
+one connection without codecs and one with init_json_codecs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.json_codec import json_loads, orjson, init_json_codecs
+
+ROWS = 10_000
+JSON_COLUMNS = ("tags", "location", "attachments", "assigned_to_platforms")
+
+
+def synthetic_text_rows(count: int):
+    """Rows as asyncpg returns them without codecs: jsonb columns as JSON text"""
+    return [
+        {
+            "id": i,
+            "tags": json.dumps(["food", "weekly", f"tag{i % 20}"]),
+            "location": json.dumps({"lat": 40.4168 + i / 1e6, "lng": -3.7038, "name": "Madrid"}),
+            "attachments": json.dumps([{"url": f"https://example.com/{i}.jpg", "size": 1024}]),
+            "assigned_to_platforms": json.dumps(["telegram", "web_app"]),
+        }
+        for i in range(count)
+    ]
+
+
+def decode_before(rows):
+    """Per-row json.loads in Python, as the old row mappers did"""
+    return [
+        {column: json.loads(row[column]) if row[column] else None for column in JSON_COLUMNS}
+        for row in rows
+    ]
+
+
+def decode_after(rows):
+    """What the codec does: one decoder call per value, done inside record decoding"""
+    return [
+        {column: json_loads(row[column]) for column in JSON_COLUMNS}
+        for row in rows
+    ]
+
+
+def best_of(fn, *args, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+async def database_benchmark(database_url: str, count: int):
+    import asyncpg
+
+    query = """
+        SELECT g AS id,
+               jsonb_build_array('food', 'weekly', 'tag' || (g % 20)) AS tags,
+               jsonb_build_object('lat', 40.4168 + g / 1e6, 'lng', -3.7038, 'name', 'Madrid') AS location,
+               jsonb_build_array(jsonb_build_object('url', 'https://example.com/' || g || '.jpg', 'size', 1024)) AS attachments,
+               '["telegram", "web_app"]'::jsonb AS assigned_to_platforms
+        FROM generate_series(1, $1) AS g
+    """
+    plain = await asyncpg.connect(database_url)
+    coded = await asyncpg.connect(database_url)
+    await init_json_codecs(coded)
+    try:
+        async def before():
+            rows = await plain.fetch(query, count)
+            return decode_before(rows)
+
+        async def after():
+            rows = await coded.fetch(query, count)
+            return [{column: row[column] for column in JSON_COLUMNS} for row in rows]
+
+        results = {}
+        for name, fn in (("before", before), ("after", after)):
+            await fn()  # warm up statement cache
+            timings = []
+            for _ in range(5):
+                started = time.perf_counter()
+                await fn()
+                timings.append(time.perf_counter() - started)
+            results[name] = min(timings)
+        return results
+    finally:
+        await plain.close()
+        await coded.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    print(f"📊 Decoding {len(JSON_COLUMNS)} JSON columns x {args.rows:,} rows "
+          f"(decoder: {'orjson' if orjson else 'stdlib json'})")
+
+    if args.database_url:
+        results = asyncio.run(database_benchmark(args.database_url, args.rows))
+        before, after = results["before"], results["after"]
+        print("  (fetch + decode from Postgres)")
+    else:
+        rows = synthetic_text_rows(args.rows)
+        before = best_of(decode_before, rows)
+        after = best_of(decode_after, rows)
+
+    print(f"  before: {before * 1000:8.1f} ms")
+    print(f"  after:  {after * 1000:8.1f} ms  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Load test every /okanassist/v1/* endpoint against local stand-ins for the external APIs.
+
+Starts the fake Groq/Gemini/Supabase/Stripe/Telegram server (fake_services.py), creates
+and seeds the schema in a local Postgres (seed.py), launches `uvicorn api:app` pointed at
+both, then runs a closed-loop asyncio driver over a weighted endpoint mix and reports
+requests, errors, RPS and p50/p95/p99 latency per endpoint.
+
+    createdb okanassist_load
+    python benchmarks/loadtest/run_load.py --database-url postgresql://localhost/okanassist_load
+    python benchmarks/loadtest/run_load.py --database-url ... --concurrency 50 --duration 60 \\
+        --llm-latency-ms 800 --json results/load.json
+
+With --api-url the driver targets an API that is already running (it must use the fakes
+and the same database); only the fakes and the seed data are set up.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import io
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fake_services import service_env, start_fake_services
+from seed import LoadUser, load_users, prepare_database, reminder_ids
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PREFIX = "/okanassist/v1"
+WEBHOOK_SECRET = service_env("")["STRIPE_WEBHOOK_SECRET"]
+
+MESSAGES = [
+    "Spent 25 on groceries", "Paid 12.50 for lunch", "Uber to the airport 38",
+    "Received 3000 salary", "Remind me to call the bank tomorrow at 10am",
+    "Gastei 40 reais no mercado", "show me my summary",
+]
+
+
+# ============================================================================
+# SCENARIOS
+# ============================================================================
+
+@dataclass
+class Call:
+    method: str
+    path: str
+    json: Any = None
+    params: Optional[Dict[str, Any]] = None
+    data: Any = None
+    headers: Optional[Dict[str, str]] = None
+
+
+@dataclass
+class LoadContext:
+    users: List[LoadUser]
+    reminder_ids: List[int]
+    rng: random.Random
+    registrations: Any = field(default_factory=lambda: itertools.count(800_000_000 + random.randrange(10_000) * 1000))
+
+    @property
+    def user(self) -> LoadUser:
+        return self.rng.choice(self.users)
+
+    def free_user(self) -> LoadUser:
+        return self.rng.choice([user for user in self.users if not user.is_premium] or self.users)
+
+    def premium_user(self) -> LoadUser:
+        return self.rng.choice([user for user in self.users if user.is_premium] or self.users)
+
+
+def _upload(user: LoadUser, filename: str, content: bytes, content_type: str) -> aiohttp.FormData:
+    form = aiohttp.FormData()
+    form.add_field("user_id", user.telegram_id)
+    form.add_field("file", content, filename=filename, content_type=content_type)
+    return form
+
+
+def _statement_pdf(pages: int = 4) -> bytes:
+    """A small valid PDF, unique per call so the extraction cache doesn't short-circuit it"""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    writer.add_metadata({"/Title": f"Statement {os.urandom(8).hex()}"})
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _stripe_webhook(ctx: LoadContext) -> Call:
+    """A subscription update signed like Stripe does (t=timestamp, v1=HMAC-SHA256)"""
+    user = ctx.premium_user()
+    payload = json.dumps({
+        "id": f"evt_{os.urandom(8).hex()}",
+        "object": "event",
+        "type": "customer.subscription.updated",
+        "data": {"object": {"object": "subscription", "customer": user.customer_id,
+                            "cancel_at_period_end": False, "metadata": {}}},
+    })
+    timestamp = int(time.time())
+    signature = hmac.new(WEBHOOK_SECRET.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return Call("POST", "/webhooks/stripe", data=payload,
+                headers={"Stripe-Signature": f"t={timestamp},v1={signature}", "Content-Type": "application/json"})
+
+
+def _batch_notify(ctx: LoadContext) -> Call:
+    due = (datetime.now(timezone.utc) + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    user = ctx.user
+    reminders = [
+        {"reminder_id": reminder_id, "telegram_id": user.telegram_id, "title": "Load test",
+         "description": "Seeded reminder", "due_datetime": due, "timezone": "America/Sao_Paulo"}
+        for reminder_id in ctx.rng.sample(ctx.reminder_ids, min(3, len(ctx.reminder_ids)))
+    ]
+    return Call("POST", "/batch-notify-reminders", json={"reminders": reminders})
+
+
+def _register(ctx: LoadContext) -> Call:
+    telegram_id = str(next(ctx.registrations))
+    return Call("POST", "/register", json={
+        "telegram_id": telegram_id, "email": f"new-{telegram_id}@loadtest.local", "name": "New Tester",
+        "language_code": "pt", "timezone": "America/Sao_Paulo",
+    })
+
+
+# endpoint label -> (weight, request builder). Weights approximate bot traffic: mostly
+# text messages and reads, a few uploads, rare registrations and payments.
+SCENARIOS: Dict[str, tuple] = {
+    "GET /health": (4, lambda ctx: Call("GET", "/health")),
+    "GET /help": (3, lambda ctx: Call("GET", "/help", params={"language_code": "es"})),
+    "GET /auth/confirm": (1, lambda ctx: Call("GET", "/auth/confirm")),
+    "POST /start": (3, lambda ctx: Call("POST", "/start", json={
+        "user_id": ctx.user.telegram_id, "user_data": {"name": "Tester"}, "args": [], "language_code": "en"})),
+    "POST /route-message": (20, lambda ctx: Call("POST", "/route-message", json={
+        "user_id": ctx.user.telegram_id, "message": ctx.rng.choice(MESSAGES), "language_code": "en"})),
+    "POST /process-audio": (3, lambda ctx: Call("POST", "/process-audio", data=_upload(
+        ctx.user, "voice.ogg", b"OggS\x00\x02" + os.urandom(4096), "audio/ogg"))),
+    "POST /process-notification": (3, lambda ctx: Call("POST", "/process-notification", json={
+        "email": "user@loadtest.local", "telegram_id": ctx.user.telegram_id, "app": "nubank",
+        "title": "Compra aprovada", "text": "Compra de R$ 42,90 aprovada em MERCADO CENTRAL"})),
+    "POST /process-receipt": (3, lambda ctx: Call("POST", "/process-receipt", data=_upload(
+        ctx.user, "receipt.jpg", b"\xff\xd8\xff\xe0" + os.urandom(16_384), "image/jpeg"))),
+    "POST /process-bank-statement": (1, lambda ctx: Call("POST", "/process-bank-statement", data=_upload(
+        ctx.user, "statement.pdf", _statement_pdf(), "application/pdf"))),
+    "POST /get-transaction-summary": (8, lambda ctx: Call("POST", "/get-transaction-summary", json={
+        "user_id": ctx.user.telegram_id, "days": 30})),
+    "POST /reports": (4, lambda ctx: Call("POST", "/reports", json={"user_id": ctx.user.telegram_id, "days": 365})),
+    "GET /transactions": (8, lambda ctx: Call("GET", "/transactions", params={
+        "user_id": ctx.user.telegram_id, "limit": 50})),
+    "GET /transactions/export": (2, lambda ctx: Call("GET", "/transactions/export", params={
+        "user_id": ctx.user.telegram_id, "format": "csv"})),
+    "POST /get-reminders": (5, lambda ctx: Call("POST", "/get-reminders", params={"user_id": ctx.user.telegram_id})),
+    "POST /batch-notify-reminders": (2, _batch_notify),
+    "POST /register": (1, _register),
+    "GET /profile": (4, lambda ctx: Call("GET", "/profile", params={"user_id": ctx.user.telegram_id})),
+    "POST /upgrade": (2, lambda ctx: Call("POST", "/upgrade", json={"user_id": ctx.free_user().telegram_id})),
+    "POST /webhooks/stripe": (2, _stripe_webhook),
+}
+
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+@dataclass
+class EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, latency_ms: float, status: str, ok: bool) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(fraction * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def send(session: aiohttp.ClientSession, base_url: str, call: Call) -> str:
+    async with session.request(call.method, f"{base_url}{PREFIX}{call.path}", json=call.json,
+                               params=call.params, data=call.data, headers=call.headers) as response:
+        await response.read()
+        return str(response.status)
+
+
+async def worker(session: aiohttp.ClientSession, base_url: str, ctx: LoadContext,
+                 names: List[str], weights: List[int], deadline: float,
+                 stats: Optional[Dict[str, EndpointStats]]) -> None:
+    while time.perf_counter() < deadline:
+        name = ctx.rng.choices(names, weights)[0]
+        call = SCENARIOS[name][1](ctx)
+        started = time.perf_counter()
+        try:
+            status = await send(session, base_url, call)
+            ok = status.startswith("2")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status, ok = type(e).__name__, False
+        if stats is not None:
+            stats.setdefault(name, EndpointStats()).record((time.perf_counter() - started) * 1000, status, ok)
+
+
+async def run_phase(base_url: str, ctx: LoadContext, names: List[str], concurrency: int,
+                    duration: float, stats: Optional[Dict[str, EndpointStats]]) -> float:
+    weights = [SCENARIOS[name][0] for name in names]
+    timeout = aiohttp.ClientTimeout(total=120)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            worker(session, base_url, LoadContext(ctx.users, ctx.reminder_ids, random.Random(ctx.rng.random()),
+                                                  ctx.registrations),
+                   names, weights, deadline, stats)
+            for _ in range(concurrency)
+        ))
+        return time.perf_counter() - started
+
+
+def summarize(stats: Dict[str, EndpointStats], elapsed: float) -> Dict[str, Dict[str, Any]]:
+    summary = {}
+    for name in sorted(stats, key=lambda n: -len(stats[n].latencies_ms)):
+        endpoint = stats[name]
+        ordered = sorted(endpoint.latencies_ms)
+        summary[name] = {
+            "requests": len(ordered),
+            "errors": endpoint.errors,
+            "rps": round(len(ordered) / elapsed, 2),
+            "p50_ms": round(percentile(ordered, 0.50), 2),
+            "p95_ms": round(percentile(ordered, 0.95), 2),
+            "p99_ms": round(percentile(ordered, 0.99), 2),
+            "statuses": endpoint.statuses,
+        }
+    return summary
+
+
+def print_report(summary: Dict[str, Dict[str, Any]], elapsed: float) -> None:
+    print(f"\n{'endpoint':<34} {'requests':>8} {'errors':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    print("-" * 90)
+    total = errors = 0
+    for name, row in summary.items():
+        total += row["requests"]
+        errors += row["errors"]
+        print(f"{name:<34} {row['requests']:>8} {row['errors']:>7} {row['rps']:>8.1f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+    print("-" * 90)
+    print(f"{'total':<34} {total:>8} {errors:>7} {total / elapsed:>8.1f}   over {elapsed:.1f} s")
+    for name, row in summary.items():
+        failures = {status: count for status, count in row["statuses"].items() if not status.startswith("2")}
+        if failures:
+            print(f"  {name}: {failures}")
+
+
+# ============================================================================
+# API PROCESS
+# ============================================================================
+
+def start_api(port: int, database_url: str, fakes_url: str, workers: int) -> subprocess.Popen:
+    env = {**os.environ, **service_env(fakes_url), "DATABASE_URL": database_url,
+           "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"), "PYTHONUNBUFFERED": "1"}
+    command = [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    return subprocess.Popen(command, cwd=ROOT, env=env)
+
+
+async def wait_until_healthy(base_url: str, process: Optional[subprocess.Popen], timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.perf_counter() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"API process exited with code {process.returncode}")
+            try:
+                async with session.get(f"{base_url}{PREFIX}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"API at {base_url} not healthy after {timeout:.0f} s")
+
+
+def select_endpoints(patterns: Optional[str]) -> List[str]:
+    if not patterns:
+        return list(SCENARIOS)
+    wanted = [pattern.strip() for pattern in patterns.split(",") if pattern.strip()]
+    names = [name for name in SCENARIOS if any(pattern in name for pattern in wanted)]
+    if not names:
+        raise SystemExit(f"No endpoints match {patterns!r}; choose from: {', '.join(SCENARIOS)}")
+    return names
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    random.seed(args.seed)
+    fakes, fake_runner = await start_fake_services(args.host, args.fake_port, llm_latency_ms=args.llm_latency_ms,
+                                      api_latency_ms=args.api_latency_ms, jitter=args.jitter)
+    fakes_url = f"http://{args.host}:{args.fake_port}"
+    process = None
+    try:
+        if args.skip_seed:
+            users = load_users(args.users)
+        else:
+            users = await prepare_database(args.database_url, args.users, args.transactions_per_user)
+        ctx = LoadContext(users, await reminder_ids(args.database_url, users), random.Random(args.seed))
+
+        base_url = args.api_url
+        if not base_url:
+            base_url = f"http://127.0.0.1:{args.port}"
+            process = start_api(args.port, args.database_url, fakes_url, args.workers)
+        await wait_until_healthy(base_url, process)
+
+        names = select_endpoints(args.endpoints)
+        if args.warmup > 0:
+            print(f"Warming up for {args.warmup:.0f} s...")
+            await run_phase(base_url, ctx, names, args.concurrency, args.warmup, None)
+
+        print(f"Running {len(names)} endpoint(s) for {args.duration:.0f} s at concurrency {args.concurrency}...")
+        stats: Dict[str, EndpointStats] = {}
+        elapsed = await run_phase(base_url, ctx, names, args.concurrency, args.duration, stats)
+        summary = summarize(stats, elapsed)
+        print_report(summary, elapsed)
+        return {
+            "config": {key: value for key, value in vars(args).items() if key not in ("database_url", "json")},
+            "elapsed_s": round(elapsed, 3),
+            "fake_requests": dict(fakes.requests),
+            "endpoints": summary,
+        }
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        await fake_runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("LOADTEST_DATABASE_URL"),
+                        help="local Postgres to create and seed (defaults to $LOADTEST_DATABASE_URL)")
+    parser.add_argument("--api-url", help="target an already running API instead of starting one")
+    parser.add_argument("--host", default="127.0.0.1", help="interface for the fake services")
+    parser.add_argument("--port", type=int, default=8085, help="port for the spawned API")
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds first (sessions, caches, pools)")
+    parser.add_argument("--endpoints", help="comma-separated substrings to restrict the mix, e.g. 'route-message,reports'")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--transactions-per-user", type=int, default=200)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data from a previous run")
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--api-latency-ms", type=float, default=30)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the request mix")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or LOADTEST_DATABASE_URL is required")
+
+    results = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    failed = sum(row["errors"] for row in results["endpoints"].values())
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
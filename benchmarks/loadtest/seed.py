@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Create the schema in a local Postgres and seed deterministic load-test users.
+
+The schema comes from the migration runner (tools/migrations), after a small shim for
+the Supabase-only objects the migrations reference (the auth.uid() function and the
+anon/authenticated roles), so a stock Postgres works:
+
+    createdb okanassist_load
+    python benchmarks/loadtest/seed.py --database-url postgresql://localhost/okanassist_load --users 200
+
+Re-running resets the seeded users' credits, transactions and reminders, so every load
+test starts from the same data.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List
+
+import asyncpg
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from tools.database import Database
+
+SUPABASE_SHIM = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        CREATE ROLE anon NOLOGIN;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+        CREATE ROLE authenticated NOLOGIN;
+    END IF;
+END
+$$;
+CREATE SCHEMA IF NOT EXISTS auth;
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS uuid
+    LANGUAGE sql STABLE
+    AS $$ SELECT NULLIF(current_setting('request.jwt.claim.sub', true), '')::uuid $$;
+"""
+
+# Telegram ids of seeded users start here; registrations made during a run use another range
+TELEGRAM_ID_BASE = 900_000_000
+USER_NAMESPACE = uuid.UUID("6b1f3c2a-4d5e-4f60-8a71-92b3c4d5e6f7")
+FREE_USER_CREDITS = 1_000_000
+
+EXPENSES = [
+    ("Food & Dining", "Supermarket", "Mercado Central"), ("Food & Dining", "Lunch", "Bistro"),
+    ("Transportation", "Uber ride", "Uber"), ("Transportation", "Fuel", "Shell"),
+    ("Shopping", "Clothes", "Zara"), ("Entertainment", "Cinema", "Cinemark"),
+    ("Bills & Utilities", "Electricity bill", None), ("Healthcare", "Pharmacy", "Drogasil"),
+]
+INCOMES = [("Salary", "Monthly salary", None), ("Freelance", "Website project", None)]
+TIMEZONES = [("America/Sao_Paulo", "BRL", "pt"), ("America/Mexico_City", "MXN", "es"),
+             ("America/New_York", "USD", "en"), ("Europe/Madrid", "EUR", "es")]
+
+
+@dataclass
+class LoadUser:
+    user_id: str
+    telegram_id: str
+    is_premium: bool
+    customer_id: str
+
+
+def load_users(count: int) -> List[LoadUser]:
+    """The seeded users, derived from their index (the driver rebuilds them without the DB)"""
+    users = []
+    for i in range(count):
+        telegram_id = str(TELEGRAM_ID_BASE + i)
+        users.append(LoadUser(
+            user_id=str(uuid.uuid5(USER_NAMESPACE, telegram_id)),
+            telegram_id=telegram_id,
+            is_premium=i % 4 == 0,
+            customer_id=f"cus_loadtest{i:06d}",
+        ))
+    return users
+
+
+async def apply_schema(database_url: str) -> None:
+    """Supabase shim, then every pending migration"""
+    conn = await asyncpg.connect(database_url)
+    try:
+        await conn.execute(SUPABASE_SHIM)
+    finally:
+        await conn.close()
+
+    db = Database(database_url)
+    await db.connect()
+    try:
+        applied = await db.migrate()
+        print(f"Applied {len(applied)} migration(s)")
+    finally:
+        await db.close()
+
+
+async def seed(database_url: str, user_count: int, transactions_per_user: int,
+               reminders_per_user: int, seed_value: int = 42) -> List[LoadUser]:
+    rng = random.Random(seed_value)
+    users = load_users(user_count)
+    now = datetime.now().replace(microsecond=0)
+
+    conn = await asyncpg.connect(database_url)
+    try:
+        async with conn.transaction():
+            user_ids = [user.user_id for user in users]
+            await conn.execute("DELETE FROM transactions WHERE user_id = ANY($1::uuid[])", user_ids)
+            await conn.execute("DELETE FROM reminders WHERE user_id = ANY($1::uuid[])", user_ids)
+            await conn.execute("DELETE FROM payments WHERE user_id = ANY($1::uuid[])", user_ids)
+
+            settings = []
+            for i, user in enumerate(users):
+                timezone, currency, language = TIMEZONES[i % len(TIMEZONES)]
+                settings.append((
+                    user.user_id, f"Load Tester {i}", currency, language, timezone, user.is_premium,
+                    user.telegram_id, now + timedelta(days=365) if user.is_premium else None, FREE_USER_CREDITS,
+                ))
+            await conn.executemany("""
+                INSERT INTO user_settings (user_id, name, currency, language, timezone, is_premium,
+                                           telegram_id, premium_until, freemium_credits)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    name = EXCLUDED.name, currency = EXCLUDED.currency, language = EXCLUDED.language,
+                    timezone = EXCLUDED.timezone, is_premium = EXCLUDED.is_premium,
+                    telegram_id = EXCLUDED.telegram_id, premium_until = EXCLUDED.premium_until,
+                    freemium_credits = EXCLUDED.freemium_credits,
+                    credits_reset_date = CURRENT_DATE + INTERVAL '30 days'
+            """, settings)
+
+            await conn.executemany("""
+                INSERT INTO payments (user_id, provider, amount, currency, status, transaction_id, subscription_id)
+                VALUES ($1, 'stripe', 4.99, 'usd', 'success', $2, $3)
+            """, [(user.user_id, user.customer_id, f"sub_{user.customer_id[4:]}")
+                  for user in users if user.is_premium])
+
+            transactions = []
+            for user in users:
+                for _ in range(transactions_per_user):
+                    is_income = rng.random() < 0.1
+                    category, description, merchant = rng.choice(INCOMES if is_income else EXPENSES)
+                    amount = round(rng.uniform(800, 5000) if is_income else rng.lognormvariate(3.2, 0.9), 2)
+                    transactions.append((
+                        user.user_id, max(amount, 0.5), description, category,
+                        "income" if is_income else "expense", f"{description} {amount}", merchant,
+                        now - timedelta(days=rng.uniform(0, 365)), round(rng.uniform(0.7, 1.0), 2),
+                    ))
+            await conn.executemany("""
+                INSERT INTO transactions (user_id, amount, description, category, transaction_type,
+                                          original_message, source_platform, merchant, date, confidence_score)
+                VALUES ($1, $2, $3, $4, $5, $6, 'telegram', $7, $8, $9)
+            """, transactions)
+
+            reminders = []
+            for user in users:
+                for j in range(reminders_per_user):
+                    reminders.append((
+                        user.user_id, f"Reminder {j}", "Seeded for load testing",
+                        now + timedelta(hours=rng.uniform(1, 24 * 14)), rng.choice(["task", "event", "deadline"]),
+                    ))
+            await conn.executemany("""
+                INSERT INTO reminders (user_id, title, description, source_platform, due_datetime, reminder_type)
+                VALUES ($1, $2, $3, 'telegram', $4, $5)
+            """, reminders)
+    finally:
+        await conn.close()
+
+    print(f"Seeded {len(users)} users, {len(transactions)} transactions, {len(reminders)} reminders")
+    return users
+
+
+async def reminder_ids(database_url: str, users: List[LoadUser]) -> List[int]:
+    """Ids of the seeded reminders, for batch-notify-reminders payloads"""
+    conn = await asyncpg.connect(database_url)
+    try:
+        rows = await conn.fetch("SELECT id FROM reminders WHERE user_id = ANY($1::uuid[])",
+                                [user.user_id for user in users])
+        return [row["id"] for row in rows]
+    finally:
+        await conn.close()
+
+
+async def prepare_database(database_url: str, users: int, transactions_per_user: int = 200,
+                           reminders_per_user: int = 5) -> List[LoadUser]:
+    await apply_schema(database_url)
+    return await seed(database_url, users, transactions_per_user, reminders_per_user)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="defaults to $DATABASE_URL")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--transactions-per-user", type=int, default=200)
+    parser.add_argument("--reminders-per-user", type=int, default=5)
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+    asyncio.run(prepare_database(args.database_url, args.users, args.transactions_per_user, args.reminders_per_user))
+
+
+if __name__ == "__main__":
+    main()
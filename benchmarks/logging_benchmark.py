@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request logging overhead on the /route-message path: before (print() of
+user_data, credit_result, the LLM response and the final result on every call, written
+synchronously by the request) versus after (tools.log: gated, sampled structured lines
+handed to the queue listener thread).
+
+    python benchmarks/logging_benchmark.py
+    python benchmarks/logging_benchmark.py --requests 20000 --output /tmp/bench.log
+
+Times only the request side (what the event loop pays). Output goes to --output
+(default os.devnull); point it at a file or pipe to include real write costs for print().
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.log import configure_logging, flush_logs, get_logger
+
+USER_DATA = {
+    "user_id": "3f0c9f2e-8a51-4a8e-9f0a-1c2d3e4f5a6b",
+    "email": "maria.silva@example.com",
+    "name": "Maria Silva",
+    "currency": "BRL",
+    "language": "pt",
+    "timezone": "America/Sao_Paulo",
+    "is_premium": False,
+    "premium_until": None,
+    "freemium_credits": 42,
+    "telegram_id": "123456789",
+    "authenticated": True,
+}
+CREDIT_RESULT = {"success": True, "is_premium": False, "credits_remaining": 41}
+LLM_RESPONSE = '{"transaction_found": true, "amount": 25.0, "category": "Food & Dining", "transaction_type": "expense"}'
+RESULT = "💸 Gastei 25 no mercado registrado: R$25,00 em Food & Dining"
+
+logger = get_logger("benchmark")
+
+
+def request_with_print():
+    """The prints one /route-message request used to make (session hit, transaction intent)"""
+    print(f"✅ Retrieved complete user data from session for {USER_DATA['telegram_id']}")
+    print("user_data:", USER_DATA)
+    print("credit_result:", CREDIT_RESULT)
+    print("Intent response main agent:", "TRANSACTION")
+    print("Raw response from Groq:", LLM_RESPONSE)
+    print("Final result:", RESULT)
+
+
+def request_with_logger(sample: float):
+    """The same request with tools.log (sampled debug lines, as in api.py and the agents)"""
+    user_id = USER_DATA["user_id"]
+    logger.debug("Routing message", user_id=user_id, telegram_id=USER_DATA["telegram_id"],
+                 credits=CREDIT_RESULT, sample=sample)
+    logger.debug("Intent classified", user_id=user_id, intent="TRANSACTION", sample=sample)
+    logger.debug("LLM response", agent="transaction", response=LLM_RESPONSE, sample=sample)
+    logger.debug("Route message result", user_id=user_id, result=RESULT, sample=sample)
+
+
+def time_requests(fn, count: int, *args) -> list:
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return timings
+
+
+def report(label: str, timings: list):
+    ordered = sorted(timings)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(f"{label:<36} median {statistics.median(timings):8.2f} µs   p99 {p99:8.2f} µs", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10_000, help="simulated requests per variant")
+    parser.add_argument("--output", default=os.devnull, help="where log lines are written")
+    args = parser.parse_args()
+
+    with open(args.output, "a", encoding="utf-8") as sink:
+        with contextlib.redirect_stdout(sink):
+            report("before  print() x6", time_requests(request_with_print, args.requests))
+
+        for level, sample, label in (
+            ("INFO", 1.0, "after   LOG_LEVEL=INFO (gated)"),
+            ("DEBUG", 0.1, "after   LOG_LEVEL=DEBUG sample=0.1"),
+            ("DEBUG", 1.0, "after   LOG_LEVEL=DEBUG sample=1.0"),
+        ):
+            configure_logging(level=level, stream=sink)
+            timings = time_requests(request_with_logger, args.requests, sample)
+            drain_started = time.perf_counter()
+            flush_logs()
+            drain_ms = (time.perf_counter() - drain_started) * 1000
+            report(label, timings)
+            if level == "DEBUG":
+                print(f"{'':<36} listener drained the backlog in {drain_ms:.1f} ms (off the request path)",
+                      file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the row models: memory per 100k rows and construction time of the
+slotted Transaction/Reminder dataclasses versus the same fields as a regular dataclass
+(what they were before slots=True).
+
+    python benchmarks/row_model_benchmark.py [--rows 100000]
+"""
+import argparse
+import dataclasses
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.models import Reminder, Transaction, TransactionType
+
+
+def unslotted_copy(cls):
+    """Rebuild a slotted dataclass as a plain one with identical fields and defaults"""
+    fields = []
+    for f in dataclasses.fields(cls):
+        if f.default is not dataclasses.MISSING:
+            fields.append((f.name, f.type, dataclasses.field(default=f.default)))
+        elif f.default_factory is not dataclasses.MISSING:
+            fields.append((f.name, f.type, dataclasses.field(default_factory=f.default_factory)))
+        else:
+            fields.append((f.name, f.type))
+    return dataclasses.make_dataclass(f"{cls.__name__}Plain", fields)
+
+
+def transaction_kwargs(i: int) -> dict:
+    """Roughly what _row_to_transaction passes for one row"""
+    now = datetime(2025, 1, 1) + timedelta(minutes=i)
+    return dict(
+        id=i, user_id="00000000-0000-0000-0000-000000000001", amount=Decimal("12.50"),
+        description=f"Coffee {i}", category="restaurants", transaction_type=TransactionType.EXPENSE,
+        original_message="coffee 12.50", source_platform="telegram", merchant="Cafe",
+        date=now, receipt_image_url=None, location=None, is_recurring=False,
+        recurring_pattern=None, tags=[], confidence_score=Decimal("0.95"),
+        import_batch_id=None, fingerprint=None, created_at=now, updated_at=now
+    )
+
+
+def reminder_kwargs(i: int) -> dict:
+    """Roughly what _row_to_reminder passes for one row"""
+    now = datetime(2025, 1, 1) + timedelta(minutes=i)
+    return dict(
+        id=i, user_id="00000000-0000-0000-0000-000000000001", title=f"Pay rent {i}",
+        description="Monthly rent", source_platform="telegram", due_datetime=now,
+        reminder_type="deadline", priority="high", is_completed=False, is_recurring=True,
+        recurrence_pattern="monthly", notification_sent=False, snooze_until=None, tags=None,
+        location_reminder=None, attachments=[], assigned_to_platforms=[],
+        created_at=now, completed_at=None, updated_at=now
+    )
+
+
+def measure(cls, make_kwargs, rows: int):
+    """(bytes per row, construction seconds) for `rows` instances"""
+    kwargs = [make_kwargs(i) for i in range(rows)]
+
+    gc.collect()
+    started = time.perf_counter()
+    instances = [cls(**kw) for kw in kwargs]
+    elapsed = time.perf_counter() - started
+    del instances
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    instances = [cls(**kw) for kw in kwargs]
+    allocated = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del instances
+
+    return allocated / rows, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"📊 Row models, {args.rows:,} rows")
+    for cls, make_kwargs in ((Transaction, transaction_kwargs), (Reminder, reminder_kwargs)):
+        plain_bytes, plain_time = measure(unslotted_copy(cls), make_kwargs, args.rows)
+        slot_bytes, slot_time = measure(cls, make_kwargs, args.rows)
+        print(f"  {cls.__name__}")
+        print(f"    plain dataclass:   {plain_bytes:6.0f} B/row  {plain_bytes * args.rows / 1024 / 1024:6.1f} MB  {plain_time * 1000:7.1f} ms")
+        print(f"    slotted dataclass: {slot_bytes:6.0f} B/row  {slot_bytes * args.rows / 1024 / 1024:6.1f} MB  {slot_time * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark timezone lookups on the /register path: cold (a new TimezoneFinder per call,
+as get_iana_timezone used to do) versus warm (the geo_lookup singleton, first call and
+memoized repeats), plus the offline TimezoneResolver tier in front of both.
+
+    python benchmarks/timezone_lookup_benchmark.py
+    python benchmarks/timezone_lookup_benchmark.py --cold-runs 5
+
+No network: geocoding is skipped and fixed city coordinates are used.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timezonefinder import TimezoneFinder
+
+from tools import geo_lookup
+from tools.timezone_resolver import TimezoneResolver
+
+CITIES = {
+    "Sao Paulo": (-23.5505, -46.6333),
+    "Rio de Janeiro": (-22.9068, -43.1729),
+    "Buenos Aires": (-34.6037, -58.3816),
+    "Mexico City": (19.4326, -99.1332),
+    "Madrid": (40.4168, -3.7038),
+    "Lisbon": (38.7223, -9.1393),
+    "New York": (40.7128, -74.0060),
+    "Tokyo": (35.6762, 139.6503),
+}
+
+RESOLVER_INPUTS = (
+    "sao paulo", "Estou em São Paulo", "vivo en la ciudad de México", "I live in London",
+    "CET", "UTC-3", "America/Bogota", "moro em sao paolo",
+)
+
+
+def timed_ms(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def cold_lookup(lat: float, lng: float):
+    """Previous behaviour: open the polygon data for every lookup"""
+    return TimezoneFinder().timezone_at(lng=lng, lat=lat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cold-runs", type=int, default=3, help="cold lookups to time (each opens the data files)")
+    args = parser.parse_args()
+
+    coordinates = list(CITIES.values())
+
+    cold = [timed_ms(cold_lookup, *coordinates[i % len(coordinates)]) for i in range(args.cold_runs)]
+    print(f"cold   new TimezoneFinder per call: median {statistics.median(cold):9.3f} ms")
+
+    warm_up_ms = timed_ms(geo_lookup.warm_up)
+    print(f"warm   singleton warm-up (once):           {warm_up_ms:9.3f} ms")
+
+    first = [timed_ms(geo_lookup.timezone_at, *point) for point in coordinates]
+    print(f"warm   first lookup per city:       median {statistics.median(first):9.3f} ms")
+
+    repeat = [timed_ms(geo_lookup.timezone_at, *point) for point in coordinates * 100]
+    print(f"warm   memoized repeat lookup:      median {statistics.median(repeat):9.3f} ms")
+
+    resolver = TimezoneResolver()
+    local = [timed_ms(resolver.resolve, text) for text in RESOLVER_INPUTS * 100]
+    print(f"local  TimezoneResolver.resolve:    median {statistics.median(local):9.3f} ms")
+
+    print(f"speedup cold -> memoized: {statistics.median(cold) / statistics.median(repeat):,.0f}x")
+    print(geo_lookup.get_stats())
+
+
+if __name__ == "__main__":
+    main()
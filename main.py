@@ -1,8 +1,15 @@
 from api import app
 
+# Built on the first invocation and reused while the instance stays warm
+_handler = None
+
 # For GCP Functions, you need a function called 'app' or 'main'
 def main(request):
     # Use FastAPI's ASGI adapter for GCP Functions (Mangum or similar)
-    from mangum import Mangum
-    handler = Mangum(app)
-    return handler(request)
\ No newline at end of file
+    global _handler
+    if _handler is None:
+        from mangum import Mangum
+        # Lifespan off: it would open and close the DB pool on every invocation.
+        # Services start on the first request instead (see ensure_services in api.py).
+        _handler = Mangum(app, lifespan="off")
+    return _handler(request)
@@ -47,6 +47,9 @@ MESSAGES = {
                 "📊 *Ready for analysis*\n\n"
                 "Use /balance to see your updated summary!\n"
             ),
+        "pdf_duplicates_skipped": "♻️ *{skipped_count} duplicate transactions skipped*\n",
+        "pdf_invalid_rows_skipped": "⚠️ *{invalid_count} rows skipped* (missing amount, description or date)\n",
+        "pdf_pages_failed": "⚠️ *Pages {pages} could not be read and were not imported.* Send the statement again to retry them.\n",
 
 
         # --- Reminder Messages ---
@@ -146,6 +149,9 @@ Just talk to me naturally - I understand! 🎉
                 "📊 *Listo para análisis*\n\n"
                 "Usa /balance para ver tu resumen actualizado!\n"
         ),
+        "pdf_duplicates_skipped": "♻️ *{skipped_count} transacciones duplicadas omitidas*\n",
+        "pdf_invalid_rows_skipped": "⚠️ *{invalid_count} filas omitidas* (sin monto, descripción o fecha)\n",
+        "pdf_pages_failed": "⚠️ *No pude leer las páginas {pages}; no se importaron.* Envía el extracto de nuevo para reintentarlas.\n",
         # --- Mensajes de Recordatorio ---
         "reminder_created": (
             "✅ ¡*Recordatorio Creado!*\n\n"
@@ -218,6 +224,9 @@ Just talk to me naturally - I understand! 🎉
             "📊 *Pronto para análise*\n\n"
             "Use /balance para ver seu resumo atualizado!\n"
         ),
+        "pdf_duplicates_skipped": "♻️ *{skipped_count} transações duplicadas ignoradas*\n",
+        "pdf_invalid_rows_skipped": "⚠️ *{invalid_count} linhas ignoradas* (sem valor, descrição ou data)\n",
+        "pdf_pages_failed": "⚠️ *Não consegui ler as páginas {pages}; elas não foram importadas.* Envie o extrato de novo para tentar outra vez.\n",
         # --- Mensagens de Lembrete ---
         "reminder_created": (
             "✅ *Lembrete Criado!*\n\n"
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 
 class MessageRequest(BaseModel):
@@ -23,6 +23,10 @@ class SummaryRequest(BaseModel):
     user_id: str
     days: int = 30
 
+class ReportRequest(BaseModel):
+    user_id: str
+    days: int = Field(365, ge=1, le=3650)  # up to ten years of history
+
 class StartRequest(BaseModel):
     user_id: str
     user_data: Dict[str, Any]
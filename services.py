@@ -0,0 +1,133 @@
+import asyncio
+import os
+from typing import TYPE_CHECKING, Any, Coroutine, Optional, Set
+
+from tools import geo_lookup
+from tools.log import get_logger
+from tools.session_manager import SessionManager
+
+if TYPE_CHECKING:
+    import aiohttp
+    from agents.main_agent import MainAgent
+    from agents.reminder_agent import ReminderAgent
+    from agents.timezone_agent import TimezoneAgent
+    from agents.transaction_agent import TransactionAgent
+    from tools.supabase_tools import SupabaseClient
+
+# How long shutdown waits for in-flight background work before cancelling it
+SHUTDOWN_DRAIN_SECONDS = 10
+
+# Bot API base URL; the load-test harness points it at a local stand-in
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+
+logger = get_logger(__name__)
+
+
+class ServiceContainer:
+    """
+    Process-wide services shared by every request: the Supabase client and its DB pool,
+    the agents, the session manager and one HTTP client session. start() runs once
+    (lock-guarded, so concurrent first requests can't build everything twice) from the
+    FastAPI lifespan, or on the first request where no lifespan runs (Cloud Functions).
+    """
+
+    def __init__(self):
+        self.supabase_client: Optional["SupabaseClient"] = None
+        self.transaction_agent: Optional["TransactionAgent"] = None
+        self.reminder_agent: Optional["ReminderAgent"] = None
+        self.main_agent: Optional["MainAgent"] = None
+        self.timezone_agent: Optional["TimezoneAgent"] = None
+        self.session_manager: Optional[SessionManager] = None
+        self.http_session: Optional["aiohttp.ClientSession"] = None
+        self.bot_token: Optional[str] = None
+        self.telegram_api_url = TELEGRAM_API_URL
+        self.ready = False
+        self._lock = asyncio.Lock()
+        self._background_tasks: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Build and warm up every service; later calls return immediately"""
+        if self.ready:
+            return
+        async with self._lock:
+            if self.ready:
+                return
+            logger.info("Initializing API services")
+            import aiohttp
+            from tools.supabase_tools import SupabaseClient
+            from agents.transaction_agent import TransactionAgent
+            from agents.reminder_agent import ReminderAgent
+            from agents.main_agent import MainAgent
+            from agents.timezone_agent import TimezoneAgent
+
+            supabase_url = os.getenv('SUPABASE_URL')
+            supabase_key = os.getenv('SUPABASE_SECRET_KEY')
+            if not supabase_url or not supabase_key:
+                raise ValueError("SUPABASE_URL and SUPABASE_SECRET_KEY are required")
+            self.bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
+
+            supabase_client = SupabaseClient(supabase_url, supabase_key)
+            await supabase_client.connect()
+            try:
+                # Round-trip once so the pool's connections (and their codecs) are live
+                await supabase_client.database.pool.fetchval("SELECT 1")
+
+                self.transaction_agent = TransactionAgent(supabase_client)
+                self.reminder_agent = ReminderAgent(supabase_client)
+                self.main_agent = MainAgent(
+                    supabase_client,
+                    transaction_agent=self.transaction_agent,
+                    reminder_agent=self.reminder_agent
+                )
+                self.timezone_agent = TimezoneAgent()
+                # Open the timezone polygon data now rather than on the first /register
+                await asyncio.to_thread(geo_lookup.warm_up)
+
+                self.http_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15))
+                self.session_manager = SessionManager(session_timeout_minutes=30)
+                self.session_manager.start()
+            except Exception:
+                # Undo the partial start so the next request retries from scratch
+                if self.session_manager:
+                    await self.session_manager.stop()
+                if self.http_session:
+                    await self.http_session.close()
+                self.transaction_agent = self.reminder_agent = self.main_agent = self.timezone_agent = None
+                self.session_manager = None
+                self.http_session = None
+                await supabase_client.disconnect()
+                raise
+
+            self.supabase_client = supabase_client
+            self.ready = True
+            logger.info("API services initialized")
+
+    def spawn(self, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """Run work after the response is sent; shutdown waits for it"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def stop(self) -> None:
+        """Drain background work, then close the HTTP session and the DB pool"""
+        async with self._lock:
+            if not self.ready:
+                return
+            logger.info("Shutting down API services")
+            self.ready = False
+
+            if self._background_tasks:
+                pending = list(self._background_tasks)
+                logger.info("Waiting for background tasks", pending=len(pending))
+                _, still_running = await asyncio.wait(pending, timeout=SHUTDOWN_DRAIN_SECONDS)
+                for task in still_running:
+                    task.cancel()
+
+            if self.session_manager:
+                await self.session_manager.stop()
+            if self.http_session:
+                await self.http_session.close()
+            if self.supabase_client:
+                await self.supabase_client.disconnect()
+            logger.info("API services stopped")
@@ -1,32 +1,41 @@
 """Core application components"""
 
-#from .database import Database
-from .database import Database
-from .models import (
-    Transaction, 
-    Reminder, 
-    TransactionSummary,
-    ReminderSummary,
-    UserActivity,
-    UserSettings,
-    TransactionType,
-    ReminderType, 
-    Priority,
-    Payment
-)
-from .supabase_tools import SupabaseClient
+import importlib
 
-__all__ = [
-    'Database',
-    'SupabaseClient',
-    'Transaction',
-    'Reminder',
-    'TransactionSummary',
-    'ReminderSummary',
-    'UserActivity',
-    'UserSettings',
-    'TransactionType',
-    'ReminderType',
-    'Priority',
-    'Payment'
-]
\ No newline at end of file
+# Exported name -> submodule. Resolved on first access (PEP 562) so importing one
+# light submodule (e.g. tools.locale_data) doesn't pull in asyncpg, supabase and stripe.
+_EXPORTS = {
+    'Database': '.database',
+    'SupabaseClient': '.supabase_tools',
+    'AudioFormatNegotiator': '.audio_formats',
+    'ExtractionCache': '.extraction_cache',
+    'SummaryCache': '.summary_cache',
+    'Transaction': '.models',
+    'Reminder': '.models',
+    'TransactionSummary': '.models',
+    'ImportResult': '.models',
+    'TransactionPage': '.models',
+    'FinancialReport': '.models',
+    'ReminderSummary': '.models',
+    'UserActivity': '.models',
+    'UserSettings': '.models',
+    'TransactionType': '.models',
+    'ReminderType': '.models',
+    'Priority': '.models',
+    'Payment': '.models'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,191 @@
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .models import FinancialReport
+
+EPOCH = date(1970, 1, 1)
+EXPENSE_PERCENTILES = (50, 75, 90, 95, 99)
+MOVING_AVERAGE_WINDOWS = (7, 30)
+
+
+class TransactionColumns:
+    """A user's transactions as parallel NumPy arrays, one entry per transaction"""
+
+    def __init__(self, days: np.ndarray, amounts: np.ndarray, is_expense: np.ndarray,
+                 category_codes: np.ndarray, categories: List[str]):
+        self.days = days                      # int32, days since 1970-01-01
+        self.amounts = amounts                # float64
+        self.is_expense = is_expense          # bool
+        self.category_codes = category_codes  # int32 index into categories
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @classmethod
+    def from_lists(cls, days: Sequence[int], amounts: Sequence[float],
+                   is_expense: Sequence[bool], categories: Sequence[str]) -> "TransactionColumns":
+        """Build from Database.get_transaction_columns output; categories are dictionary-encoded in one pass"""
+        count = len(days)
+        index: Dict[str, int] = {}
+        codes = np.fromiter((index.setdefault(c, len(index)) for c in categories), dtype=np.int32, count=count)
+        return cls(
+            days=np.fromiter(days, dtype=np.int32, count=count),
+            amounts=np.fromiter(amounts, dtype=np.float64, count=count),
+            is_expense=np.fromiter(is_expense, dtype=bool, count=count),
+            category_codes=codes,
+            categories=list(index),
+        )
+
+
+def _epoch_day(day: date) -> int:
+    return (day - EPOCH).days
+
+
+def _round(values: np.ndarray) -> List[float]:
+    return np.round(values, 2).tolist()
+
+
+def _moving_average(series: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` days; the first days average over what exists"""
+    cumulative = np.cumsum(np.concatenate(([0.0], series)))
+    ends = np.arange(1, len(series) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (cumulative[ends] - cumulative[starts]) / (ends - starts)
+
+
+def build_financial_report(user_id: str, columns: TransactionColumns, period_days: int,
+                           end_date: Optional[date] = None) -> FinancialReport:
+    """
+    Compute every report section from the column arrays in a single pass of bincounts:
+    daily series with moving averages, ISO-week and calendar-month totals,
+    month-over-month deltas, per-category monthly trends and expense percentiles.
+    """
+    end_date = end_date or date.today()
+    # A zero or negative period still reports on end_date itself rather than an empty window
+    period_days = max(period_days, 0)
+    start_date = end_date - timedelta(days=period_days)
+    start_day, end_day = _epoch_day(start_date), _epoch_day(end_date)
+    n_days = end_day - start_day + 1
+
+    in_period = (columns.days >= start_day) & (columns.days <= end_day)
+    days = columns.days[in_period]
+    amounts = columns.amounts[in_period]
+    is_expense = columns.is_expense[in_period]
+    category_codes = columns.category_codes[in_period]
+    expense_amounts = np.where(is_expense, amounts, 0.0)
+    income_amounts = np.where(is_expense, 0.0, amounts)
+
+    # Daily series
+    day_index = days - start_day
+    daily_expenses = np.bincount(day_index, weights=expense_amounts, minlength=n_days)
+    daily_income = np.bincount(day_index, weights=income_amounts, minlength=n_days)
+    moving_averages = {window: _moving_average(daily_expenses, window) for window in MOVING_AVERAGE_WINDOWS}
+    period_dates = np.arange(start_day, end_day + 1).astype("datetime64[D]").astype(str).tolist()
+    daily_expense_values = _round(daily_expenses)
+    daily_income_values = _round(daily_income)
+    moving_average_values = {window: _round(values) for window, values in moving_averages.items()}
+    daily = [
+        {
+            "date": period_dates[i],
+            "expenses": daily_expense_values[i],
+            "income": daily_income_values[i],
+            **{f"expenses_ma{window}": moving_average_values[window][i] for window in MOVING_AVERAGE_WINDOWS}
+        }
+        for i in range(n_days)
+    ]
+
+    # ISO weeks (Monday start); 1970-01-01 was a Thursday
+    period_weeks = np.arange(start_day, end_day + 1)
+    week_starts = period_weeks - (period_weeks + 3) % 7
+    first_week = week_starts[0]
+    n_weeks = (week_starts[-1] - first_week) // 7 + 1
+    week_index = (week_starts[day_index] - first_week) // 7
+    weekly_expenses = np.bincount(week_index, weights=expense_amounts, minlength=n_weeks)
+    weekly_income = np.bincount(week_index, weights=income_amounts, minlength=n_weeks)
+    week_labels = (first_week + 7 * np.arange(n_weeks)).astype("datetime64[D]").astype(str).tolist()
+    weekly = [
+        {"week_start": label, "expenses": expenses, "income": income}
+        for label, expenses, income in zip(week_labels, _round(weekly_expenses), _round(weekly_income))
+    ]
+
+    # Calendar months with month-over-month deltas
+    period_months = np.arange(start_day, end_day + 1).astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+    first_month = period_months[0]
+    n_months = period_months[-1] - first_month + 1
+    month_index = period_months[day_index] - first_month
+    monthly_expenses = np.bincount(month_index, weights=expense_amounts, minlength=n_months)
+    monthly_income = np.bincount(month_index, weights=income_amounts, minlength=n_months)
+    expense_change = np.diff(monthly_expenses, prepend=np.nan)
+    previous = np.concatenate(([np.nan], monthly_expenses[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expense_change_pct = np.where(previous > 0, expense_change / previous * 100, np.nan)
+    month_labels = (first_month + np.arange(n_months)).astype("datetime64[M]").astype(str).tolist()
+    monthly = []
+    for i, label in enumerate(month_labels):
+        monthly.append({
+            "month": label,
+            "expenses": round(float(monthly_expenses[i]), 2),
+            "income": round(float(monthly_income[i]), 2),
+            "net": round(float(monthly_income[i] - monthly_expenses[i]), 2),
+            "expense_change": None if np.isnan(expense_change[i]) else round(float(expense_change[i]), 2),
+            "expense_change_pct": None if np.isnan(expense_change_pct[i]) else round(float(expense_change_pct[i]), 1),
+        })
+
+    # Per-category monthly expenses and least-squares trend (change per month)
+    n_categories = len(columns.categories)
+    category_trends: List[Dict[str, Any]] = []
+    if n_categories and is_expense.any():
+        matrix = np.bincount(
+            category_codes * n_months + month_index,
+            weights=expense_amounts,
+            minlength=n_categories * n_months
+        ).reshape(n_categories, n_months)
+        category_totals = matrix.sum(axis=1)
+        x = np.arange(n_months, dtype=np.float64) - (n_months - 1) / 2
+        denominator = float(x @ x)
+        slopes = matrix @ x / denominator if denominator else np.zeros(n_categories)
+        total_expenses = category_totals.sum()
+        for code in np.argsort(-category_totals):
+            if category_totals[code] <= 0:
+                break
+            category_trends.append({
+                "category": columns.categories[code],
+                "total": round(float(category_totals[code]), 2),
+                "share_pct": round(float(category_totals[code] / total_expenses * 100), 1),
+                "monthly": _round(matrix[code]),
+                "trend_per_month": round(float(slopes[code]), 2),
+            })
+
+    expense_values = amounts[is_expense]
+    expense_percentiles = {}
+    if len(expense_values):
+        values = np.percentile(expense_values, EXPENSE_PERCENTILES)
+        expense_percentiles = {f"p{p}": round(float(v), 2) for p, v in zip(EXPENSE_PERCENTILES, values)}
+
+    total_expenses = float(expense_amounts.sum())
+    total_income = float(income_amounts.sum())
+    expense_count = int(is_expense.sum())
+    totals = {
+        "expenses": round(total_expenses, 2),
+        "income": round(total_income, 2),
+        "net": round(total_income - total_expenses, 2),
+        "expense_count": expense_count,
+        "income_count": int(len(days) - expense_count),
+        "average_daily_expenses": round(total_expenses / n_days, 2),
+    }
+
+    return FinancialReport(
+        user_id=user_id,
+        period_days=period_days,
+        start_date=start_date.isoformat(),
+        end_date=end_date.isoformat(),
+        totals=totals,
+        daily=daily,
+        weekly=weekly,
+        monthly=monthly,
+        category_trends=category_trends,
+        expense_percentiles=expense_percentiles,
+    )
@@ -0,0 +1,131 @@
+import asyncio
+import os
+from typing import Dict, Optional, Set, Tuple
+
+from .metrics import TRANSCODE_SECONDS
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Input formats each transcription backend accepts without conversion.
+# Gemini takes OGG/Opus (Telegram voice notes) directly, so those skip ffmpeg.
+BACKEND_ACCEPTED_FORMATS: Dict[str, Set[str]] = {
+    "gemini": {"ogg", "mp3", "wav", "flac", "aac", "aiff"},
+    "groq": {"ogg", "mp3", "wav", "flac", "m4a", "webm", "mp4"},
+}
+
+# Format produced when a backend can't take the upload as-is
+BACKEND_TRANSCODE_TARGET: Dict[str, str] = {
+    "gemini": "mp3",
+    "groq": "mp3",
+}
+
+MIME_TYPES: Dict[str, str] = {
+    "ogg": "audio/ogg",
+    "mp3": "audio/mp3",
+    "wav": "audio/wav",
+    "flac": "audio/flac",
+    "aac": "audio/aac",
+    "aiff": "audio/aiff",
+    "m4a": "audio/mp4",
+    "mp4": "audio/mp4",
+    "webm": "audio/webm",
+}
+
+TRANSCODE_SAMPLE_RATE = 16000
+TRANSCODE_CHANNELS = 1
+
+
+def detect_audio_format(header: bytes, filename: Optional[str] = None) -> Optional[str]:
+    """Detect the container format from the first bytes of a file, falling back to the extension"""
+    if header.startswith(b"OggS"):
+        return "ogg"
+    if header.startswith(b"ID3") or header[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return "mp3"
+    if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+        return "wav"
+    if header.startswith(b"fLaC"):
+        return "flac"
+    if header.startswith(b"FORM") and header[8:12] in (b"AIFF", b"AIFC"):
+        return "aiff"
+    if header[4:8] == b"ftyp":
+        return "m4a"
+    if header.startswith(b"\x1a\x45\xdf\xa3"):
+        return "webm"
+    if header[:2] in (b"\xff\xf1", b"\xff\xf9"):
+        return "aac"
+
+    if filename:
+        extension = os.path.splitext(filename)[1].lstrip(".").lower()
+        if extension == "oga" or extension == "opus":
+            return "ogg"
+        if extension in MIME_TYPES:
+            return extension
+    return None
+
+
+class AudioFormatNegotiator:
+    """Decides whether an audio upload can go straight to a transcription backend or needs ffmpeg"""
+
+    def __init__(self, backend: str = "gemini"):
+        if backend not in BACKEND_ACCEPTED_FORMATS:
+            raise ValueError(f"Unknown transcription backend: {backend}")
+        self.backend = backend
+        self.accepted_formats = BACKEND_ACCEPTED_FORMATS[backend]
+        self.transcode_target = BACKEND_TRANSCODE_TARGET[backend]
+        self.bypassed_count = 0
+        self.transcoded_count = 0
+
+    def accepts(self, audio_format: Optional[str]) -> bool:
+        """Check if the backend accepts the given format natively"""
+        return audio_format in self.accepted_formats
+
+    async def prepare(self, input_path: str, filename: Optional[str] = None) -> Tuple[str, str, bool]:
+        """
+        Return (path, format, transcoded) ready to send to the backend.
+        When transcoded is True the caller owns the new file and must delete it.
+        """
+        with open(input_path, "rb") as f:
+            header = f.read(16)
+        audio_format = detect_audio_format(header, filename or input_path)
+
+        if self.accepts(audio_format):
+            self.bypassed_count += 1
+            return input_path, audio_format, False
+
+        output_path = f"{os.path.splitext(input_path)[0]}.{self.transcode_target}"
+        await transcode_audio(input_path, output_path)
+        self.transcoded_count += 1
+        return output_path, self.transcode_target, True
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counters for bypassed versus transcoded files"""
+        return {
+            "backend": self.backend,
+            "bypassed": self.bypassed_count,
+            "transcoded": self.transcoded_count,
+        }
+
+
+async def transcode_audio(input_path: str, output_path: str) -> str:
+    """
+    Convert an audio file with ffmpeg, downsampled to 16 kHz mono for speech.
+    Returns the output file path.
+    """
+    try:
+        with TRANSCODE_SECONDS.time():
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-y", "-i", input_path,
+                "-ac", str(TRANSCODE_CHANNELS),
+                "-ar", str(TRANSCODE_SAMPLE_RATE),
+                output_path,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(stderr.decode(errors="ignore")[-500:])
+        return output_path
+    except Exception:
+        logger.exception("Audio conversion failed")
+        raise RuntimeError("Audio conversion failed")
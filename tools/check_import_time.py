@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Cold-start check for the serverless entry point. Imports `api` in a fresh interpreter
+under `python -X importtime`, prints the slowest modules and fails (exit 1) if the
+total import time is over budget or if a deferred heavy dependency got imported at
+module load again.
+
+    python tools/check_import_time.py
+    python tools/check_import_time.py --module main --budget-ms 1200 --top 30
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Total cumulative import time allowed for the entry module
+DEFAULT_BUDGET_MS = 1000
+
+# Top-level packages that must only be imported on first use (see the api.py imports)
+DEFERRED_PACKAGES = (
+    "agno", "groq", "google.genai", "supabase", "stripe", "asyncpg",
+    "geopy", "timezonefinder", "numpy", "aiohttp", "mangum",
+)
+
+
+def measure_imports(module: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every import made by `import <module>`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def check_import_time(module: str, budget_ms: float, top: int) -> bool:
+    timings = measure_imports(module)
+    cumulative: Dict[str, int] = {name: cumulative_us for name, _, cumulative_us in timings}
+    total_ms = cumulative.get(module, 0) / 1000
+
+    print(f"📦 Slowest imports for 'import {module}' (cumulative ms):")
+    for name, _, cumulative_us in sorted(timings, key=lambda t: t[2], reverse=True)[:top]:
+        print(f"   {cumulative_us / 1000:9.1f}  {name}")
+
+    success = True
+    deferred = [package for package in DEFERRED_PACKAGES if package in cumulative]
+    if deferred:
+        success = False
+        print(f"\n❌ Imported at module load but should be deferred: {', '.join(deferred)}")
+
+    if total_ms > budget_ms:
+        success = False
+        print(f"\n❌ import {module} took {total_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    else:
+        print(f"\n✅ import {module} took {total_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    return success
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="api", help="entry module to import (default: api)")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    parser.add_argument("--top", type=int, default=20, help="how many of the slowest imports to list")
+    args = parser.parse_args()
+
+    success = check_import_time(args.module, args.budget_ms, args.top)
+    exit(0 if success else 1)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN-based regression check for the indexes in tools/migrations.
+Each query below mirrors a query in tools/database.py or a SQL function, and must be
+served by the index it was designed for. Run against a local Postgres with the schema
+applied (python setup_database.py setup); exits non-zero if any plan regressed.
+"""
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+# Add the parent directory to the Python path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.database import Database
+
+SAMPLE_USER_ID = "00000000-0000-0000-0000-000000000001"
+NOW = datetime.now()
+
+# (description, query, params, expected index)
+QUERY_PLAN_CHECKS = [
+    (
+        "get_transaction_summary (partial first day)",
+        """
+        SELECT transaction_type, category, amount FROM transactions
+        WHERE user_id = $1 AND date >= $2 AND date < $3
+        """,
+        [SAMPLE_USER_ID, NOW - timedelta(days=30), (NOW - timedelta(days=29)).date()],
+        "idx_transactions_user_date_id",
+    ),
+    (
+        "get_transaction_summary (rollup days)",
+        """
+        SELECT transaction_type, category, total, tx_count FROM transaction_daily_rollup
+        WHERE user_id = $1 AND day >= $2
+        """,
+        [SAMPLE_USER_ID, (NOW - timedelta(days=29)).date()],
+        "transaction_daily_rollup_pkey",
+    ),
+    (
+        "get_user_transactions",
+        """
+        SELECT * FROM transactions
+        WHERE user_id = $1 AND date >= $2
+        ORDER BY date DESC
+        """,
+        [SAMPLE_USER_ID, NOW - timedelta(days=30)],
+        "idx_transactions_user_date_id",
+    ),
+    (
+        "list_transactions (next page)",
+        """
+        SELECT id, date, amount, transaction_type, category FROM transactions
+        WHERE user_id = $1 AND (date, id) < ($2, $3)
+        ORDER BY date DESC, id DESC
+        LIMIT $4
+        """,
+        [SAMPLE_USER_ID, NOW, 1000, 51],
+        "idx_transactions_user_date_id",
+    ),
+    (
+        "delete_import_batch",
+        """
+        SELECT id FROM transactions
+        WHERE user_id = $1 AND import_batch_id = $2
+        """,
+        [SAMPLE_USER_ID, "00000000-0000-0000-0000-0000000000aa"],
+        "idx_transactions_import_batch",
+    ),
+    (
+        "get_user_reminders",
+        """
+        SELECT * FROM reminders
+        WHERE user_id = $1 AND is_completed = FALSE
+        ORDER BY due_datetime ASC NULLS LAST, created_at DESC
+        LIMIT $2
+        """,
+        [SAMPLE_USER_ID, 10],
+        "idx_reminders_user_pending_due",
+    ),
+    (
+        "get_due_reminders",
+        """
+        SELECT * FROM reminders
+        WHERE user_id = $1
+        AND is_completed = FALSE
+        AND due_datetime IS NOT NULL
+        AND due_datetime <= $2
+        """,
+        [SAMPLE_USER_ID, NOW + timedelta(hours=24)],
+        "idx_reminders_user_pending_due",
+    ),
+    (
+        "get_customer_id_from_payments",
+        """
+        SELECT transaction_id FROM payments
+        WHERE user_id = $1 AND transaction_id IS NOT NULL
+        ORDER BY created_at DESC LIMIT 1
+        """,
+        [SAMPLE_USER_ID],
+        "idx_payments_user_created",
+    ),
+    (
+        "get_telegram_id_from_customer",
+        """
+        SELECT user_id FROM payments WHERE transaction_id = $1
+        """,
+        ["cus_sample"],
+        "idx_payments_transaction_id",
+    ),
+    (
+        "check_expired_premium()",
+        """
+        SELECT user_id FROM user_settings
+        WHERE is_premium = TRUE AND premium_until IS NOT NULL AND premium_until < NOW()
+        """,
+        [],
+        "idx_user_settings_premium_expiry",
+    ),
+    (
+        "reset_monthly_credits()",
+        """
+        SELECT user_id FROM user_settings
+        WHERE is_premium = FALSE AND credits_reset_date < CURRENT_DATE
+        """,
+        [],
+        "idx_user_settings_credits_reset",
+    ),
+]
+
+
+def _plan_indexes(plan: dict) -> set:
+    """Collect every index name used anywhere in an EXPLAIN (FORMAT JSON) plan tree"""
+    indexes = set()
+    if plan.get("Index Name"):
+        indexes.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        indexes |= _plan_indexes(child)
+    return indexes
+
+
+async def check_query_plans() -> bool:
+    """EXPLAIN each query and verify it uses its intended index"""
+    load_dotenv()
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("❌ DATABASE_URL environment variable not found!")
+        return False
+
+    db = Database(database_url)
+    await db.connect()
+
+    failures = 0
+    try:
+        async with db.pool.acquire() as conn:
+            for description, query, params, expected_index in QUERY_PLAN_CHECKS:
+                async with conn.transaction():
+                    # Tables in a test database are tiny; make the planner show whether the index is usable
+                    await conn.execute("SET LOCAL enable_seqscan = off")
+                    raw_plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *params)
+                plan = json.loads(raw_plan) if isinstance(raw_plan, str) else raw_plan
+                used_indexes = _plan_indexes(plan[0]["Plan"])
+
+                if expected_index in used_indexes:
+                    print(f"✅ {description}: {expected_index}")
+                else:
+                    failures += 1
+                    print(f"❌ {description}: expected {expected_index}, plan used {sorted(used_indexes) or 'no index'}")
+    finally:
+        await db.close()
+
+    if failures:
+        print(f"\n❌ {failures} of {len(QUERY_PLAN_CHECKS)} query plans regressed")
+        return False
+
+    print(f"\n✅ All {len(QUERY_PLAN_CHECKS)} query plans use their intended indexes")
+    return True
+
+
+if __name__ == "__main__":
+    success = asyncio.run(check_query_plans())
+    exit(0 if success else 1)
@@ -1,535 +1,192 @@
 # Simple database manager with RLS policies
 import asyncpg
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator
 from datetime import datetime, timedelta
 from decimal import Decimal
-import json
+import uuid
 
 from .models import (
     Transaction, TransactionSummary, Reminder, ReminderSummary, 
-    UserActivity, ReminderType, Priority, TransactionType, UserSettings
+    UserActivity, ReminderType, Priority, TransactionType, UserSettings,
+    ImportResult, TransactionPage, transaction_fingerprint,
+    encode_transaction_cursor, decode_transaction_cursor
 )
+from .migrator import Migration, MigrationRunner
+from .json_codec import init_json_codecs, json_dumps
+from .summary_cache import SummaryCache
+from .metrics import instrument_db_methods
+from .log import get_logger
 
+logger = get_logger(__name__)
+
+# Columns a transaction listing may project (never user_id or the dedupe fingerprint)
+TRANSACTION_LIST_COLUMNS = (
+    "id", "date", "amount", "transaction_type", "category", "description", "merchant",
+    "source_platform", "tags", "location", "is_recurring", "recurring_pattern",
+    "confidence_score", "receipt_image_url", "import_batch_id", "original_message",
+    "created_at", "updated_at"
+)
+TRANSACTION_LIST_DEFAULT_COLUMNS = ("id", "date", "amount", "transaction_type", "category", "description", "merchant")
+TRANSACTION_LIST_MAX_LIMIT = 100
+
+# Every public coroutine method is timed in okanassist_db_query_duration_seconds{method}
+@instrument_db_methods
 class Database:
     """Simplified Database manager with RLS policies"""
     
     def __init__(self, database_url: str):
         self.database_url = database_url
         self.pool = None
+        self.summary_cache = SummaryCache()
     
     async def connect(self):
         """Initialize database connection"""
-        self.pool = await asyncpg.create_pool(self.database_url)
-        print("✅ Database connected")
+        # json/jsonb values are decoded to Python objects on every pooled connection
+        self.pool = await asyncpg.create_pool(self.database_url, init=init_json_codecs)
+        logger.info("Database pool connected")
 
     async def close(self):
         """Close database connection"""
         if self.pool:
             await self.pool.close()
-            print("✅ Database disconnected")
+            logger.info("Database pool closed")
     
-    async def _create_tables(self):
-        """Create simplified tables with RLS policies and proper permissions"""
-        async with self.pool.acquire() as conn:
-            # Create update timestamp function first (with security fixes)
-            await conn.execute("""
-                CREATE OR REPLACE FUNCTION update_updated_at_column()
-                RETURNS TRIGGER 
-                LANGUAGE plpgsql
-                SECURITY DEFINER
-                SET search_path = public
-                AS $$
-                BEGIN
-                    NEW.updated_at = NOW();
-                    RETURN NEW;
-                END;
-                $$;
-            """)
-            
-            # 1. Transactions table (expenses + income)
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS transactions (
-                    id SERIAL PRIMARY KEY,
-                    user_id UUID NOT NULL REFERENCES user_settings(user_id) ON DELETE CASCADE,
-                    amount DECIMAL(12,2) NOT NULL CHECK (amount > 0),
-                    description TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    transaction_type TEXT NOT NULL CHECK (transaction_type IN ('expense', 'income')),
-                    original_message TEXT NOT NULL,
-                    source_platform TEXT DEFAULT 'web_app' CHECK (source_platform IN ('telegram', 'whatsapp', 'mobile_app', 'web_app')),
-                    merchant TEXT,
-                    date TIMESTAMP DEFAULT NOW() NOT NULL,
-                    receipt_image_url TEXT,
-                    location JSONB,
-                    is_recurring BOOLEAN DEFAULT FALSE NOT NULL,
-                    recurring_pattern TEXT,
-                    tags JSONB DEFAULT '[]' NOT NULL,
-                    confidence_score DECIMAL(3,2) CHECK (confidence_score >= 0.00 AND confidence_score <= 1.00),
-                    created_at TIMESTAMP DEFAULT NOW() NOT NULL,
-                    updated_at TIMESTAMP DEFAULT NOW() NOT NULL
-                );
-                
-                -- Indexes for transactions
-                CREATE INDEX IF NOT EXISTS idx_transactions_user ON transactions(user_id);
-                CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
-                CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions(category);
-                CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions(transaction_type);
-                CREATE INDEX IF NOT EXISTS idx_transactions_platform ON transactions(source_platform);
-                CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions(amount);
-                CREATE INDEX IF NOT EXISTS idx_transactions_user_date ON transactions(user_id, date);
-                
-                -- Table comments
-                COMMENT ON TABLE transactions IS 'User financial transactions (expenses and income)';
-                COMMENT ON COLUMN transactions.user_id IS 'User ID from authentication system';
-                COMMENT ON COLUMN transactions.amount IS 'Transaction amount (positive values only)';
-                COMMENT ON COLUMN transactions.transaction_type IS 'Type: expense or income';
-                COMMENT ON COLUMN transactions.source_platform IS 'Platform where transaction was created';
-                COMMENT ON COLUMN transactions.confidence_score IS 'AI parsing confidence (0.00-1.00)';
-            """)
-            
-            # 2. Reminders table
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS reminders (
-                    id SERIAL PRIMARY KEY,
-                    user_id UUID NOT NULL REFERENCES user_settings(user_id) ON DELETE CASCADE,
-                    title TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    source_platform TEXT DEFAULT 'web_app' CHECK (source_platform IN ('telegram', 'whatsapp', 'mobile_app', 'web_app')),
-                    due_datetime TIMESTAMP,
-                    reminder_type TEXT DEFAULT 'general' CHECK (reminder_type IN ('task', 'event', 'deadline', 'habit', 'general')),
-                    priority TEXT DEFAULT 'medium' CHECK (priority IN ('urgent', 'high', 'medium', 'low')),
-                    is_completed BOOLEAN DEFAULT FALSE NOT NULL,
-                    is_recurring BOOLEAN DEFAULT FALSE NOT NULL,
-                    recurrence_pattern TEXT,
-                    notification_sent BOOLEAN DEFAULT FALSE NOT NULL,
-                    snooze_until TIMESTAMP,
-                    tags TEXT,
-                    location_reminder JSONB,
-                    attachments JSONB DEFAULT '[]' NOT NULL,
-                    assigned_to_platforms JSONB DEFAULT '[]' NOT NULL,
-                    created_at TIMESTAMP DEFAULT NOW() NOT NULL,
-                    completed_at TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT NOW() NOT NULL
-                );
-                
-                -- Indexes for reminders
-                CREATE INDEX IF NOT EXISTS idx_reminders_user ON reminders(user_id);
-                CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders(due_datetime);
-                CREATE INDEX IF NOT EXISTS idx_reminders_platform ON reminders(source_platform);
-                CREATE INDEX IF NOT EXISTS idx_reminders_completed ON reminders(is_completed);
-                CREATE INDEX IF NOT EXISTS idx_reminders_priority ON reminders(priority);
-                CREATE INDEX IF NOT EXISTS idx_reminders_type ON reminders(reminder_type);
-                CREATE INDEX IF NOT EXISTS idx_reminders_notification ON reminders(notification_sent, due_datetime);
-                CREATE INDEX IF NOT EXISTS idx_reminders_user_due ON reminders(user_id, due_datetime);
-                
-                -- Table comments
-                COMMENT ON TABLE reminders IS 'User reminders and tasks with scheduling and notification features';
-                COMMENT ON COLUMN reminders.user_id IS 'User ID from authentication system';
-                COMMENT ON COLUMN reminders.reminder_type IS 'Type: task, event, deadline, habit, or general';
-                COMMENT ON COLUMN reminders.priority IS 'Priority: urgent, high, medium, or low';
-                COMMENT ON COLUMN reminders.source_platform IS 'Platform where reminder was created';
-            """)
-            
-            # 3. User settings table with freemium credits
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS user_settings (
-                    user_id UUID PRIMARY KEY,
-                    name TEXT,
-                    currency TEXT DEFAULT 'USD' NOT NULL,
-                    language TEXT DEFAULT 'en' NOT NULL,
-                    timezone TEXT DEFAULT 'UTC' NOT NULL,
-                    is_premium BOOLEAN DEFAULT FALSE NOT NULL,
-                    telegram_id TEXT UNIQUE,
-                    premium_until TIMESTAMPTZ,
-                    freemium_credits INTEGER DEFAULT 50 NOT NULL CHECK (freemium_credits >= 0),
-                    credits_reset_date DATE DEFAULT (CURRENT_DATE + INTERVAL '30 days') NOT NULL,
-                    last_bot_interaction TIMESTAMP DEFAULT NOW(),
-                    created_at TIMESTAMP DEFAULT NOW() NOT NULL,
-                    updated_at TIMESTAMP DEFAULT NOW() NOT NULL
-                );
-                
-                -- Indexes for user_settings
-                CREATE INDEX IF NOT EXISTS idx_user_settings_telegram_id ON user_settings(telegram_id);
-                CREATE INDEX IF NOT EXISTS idx_user_settings_is_premium ON user_settings(is_premium);
-                CREATE INDEX IF NOT EXISTS idx_user_settings_premium_until ON user_settings(premium_until);
-                CREATE INDEX IF NOT EXISTS idx_user_settings_credits ON user_settings(freemium_credits);
-                CREATE INDEX IF NOT EXISTS idx_user_settings_reset_date ON user_settings(credits_reset_date);
-                
-                -- Table comments
-                COMMENT ON TABLE user_settings IS 'User preferences, premium status, and freemium credits';
-                COMMENT ON COLUMN user_settings.user_id IS 'User ID from authentication system';
-                COMMENT ON COLUMN user_settings.currency IS 'User preferred currency code (e.g., USD, EUR, GBP)';
-                COMMENT ON COLUMN user_settings.language IS 'User preferred language code (e.g., en, es, fr)';
-                COMMENT ON COLUMN user_settings.timezone IS 'User timezone (e.g., UTC, America/New_York)';
-                COMMENT ON COLUMN user_settings.is_premium IS 'Whether user has active premium subscription';
-                COMMENT ON COLUMN user_settings.telegram_id IS 'Telegram user ID for bot integration (unique)';
-                COMMENT ON COLUMN user_settings.premium_until IS 'Premium subscription expiration date';
-                COMMENT ON COLUMN user_settings.freemium_credits IS 'Available freemium credits for AI processing';
-                COMMENT ON COLUMN user_settings.credits_reset_date IS 'Date when credits were last reset';
-                COMMENT ON COLUMN user_settings.last_bot_interaction IS 'Last time user interacted with Telegram bot';
-            """)
-            
-            # 4. Payments table for subscription management
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS payments (
-                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                    user_id UUID NOT NULL REFERENCES user_settings(user_id) ON DELETE CASCADE,
-                    provider TEXT NOT NULL CHECK (provider IN ('paypal', 'mercadopago', 'stripe')),
-                    amount NUMERIC NOT NULL CHECK (amount > 0),
-                    currency TEXT NOT NULL,
-                    status TEXT NOT NULL CHECK (status IN ('pending', 'success', 'failed', 'cancelled')),
-                    transaction_id TEXT, -- External payment provider transaction ID
-                    subscription_id TEXT, -- Provider subscription ID
-                    created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
-                    valid_until TIMESTAMPTZ,
-                    updated_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
-                );
-                
-                -- Indexes for payments
-                CREATE INDEX IF NOT EXISTS idx_payments_user_id ON payments(user_id);
-                CREATE INDEX IF NOT EXISTS idx_payments_status ON payments(status);
-                CREATE INDEX IF NOT EXISTS idx_payments_provider ON payments(provider);
-                CREATE INDEX IF NOT EXISTS idx_payments_created_at ON payments(created_at);
-                CREATE INDEX IF NOT EXISTS idx_payments_valid_until ON payments(valid_until);
-                CREATE INDEX IF NOT EXISTS idx_payments_transaction_id ON payments(transaction_id);
-                
-                -- Table comments
-                COMMENT ON TABLE payments IS 'Payment records for premium subscriptions';
-                COMMENT ON COLUMN payments.user_id IS 'User ID from authentication system';
-                COMMENT ON COLUMN payments.provider IS 'Payment provider: paypal or mercadopago';
-                COMMENT ON COLUMN payments.amount IS 'Payment amount (positive values only)';
-                COMMENT ON COLUMN payments.status IS 'Payment status: pending, success, failed, or cancelled';
-                COMMENT ON COLUMN payments.transaction_id IS 'External payment provider transaction ID';
-                COMMENT ON COLUMN payments.subscription_id IS 'Provider subscription ID for recurring payments';
-                COMMENT ON COLUMN payments.valid_until IS 'Premium access valid until this date';
-            """)
-            
-            # ============================================================================
-            # ENABLE ROW LEVEL SECURITY ON ALL TABLES
-            # ============================================================================
-            await conn.execute("""
-                ALTER TABLE transactions ENABLE ROW LEVEL SECURITY;
-                ALTER TABLE reminders ENABLE ROW LEVEL SECURITY;
-                ALTER TABLE user_settings ENABLE ROW LEVEL SECURITY;
-                ALTER TABLE payments ENABLE ROW LEVEL SECURITY;
-            """)
-            
-            # ============================================================================
-            # CREATE RLS POLICIES FOR TRANSACTIONS
-            # ============================================================================
-            await conn.execute("""
-                DROP POLICY IF EXISTS "Users can view own transactions" ON transactions;
-                DROP POLICY IF EXISTS "Users can insert own transactions" ON transactions;
-                DROP POLICY IF EXISTS "Users can update own transactions" ON transactions;
-                DROP POLICY IF EXISTS "Users can delete own transactions" ON transactions;
-                
-                CREATE POLICY "Users can view own transactions" ON transactions
-                    FOR SELECT USING ((SELECT auth.uid()) = user_id);
-                CREATE POLICY "Users can insert own transactions" ON transactions
-                    FOR INSERT WITH CHECK ((SELECT auth.uid()) = user_id);
-                CREATE POLICY "Users can update own transactions" ON transactions
-                    FOR UPDATE USING ((SELECT auth.uid()) = user_id);
-                CREATE POLICY "Users can delete own transactions" ON transactions
-                    FOR DELETE USING ((SELECT auth.uid()) = user_id);
-            """)
-            
-            # ============================================================================
-            # CREATE RLS POLICIES FOR REMINDERS
-            # ============================================================================
-            await conn.execute("""
-                DROP POLICY IF EXISTS "Users can view own reminders" ON reminders;
-                DROP POLICY IF EXISTS "Users can insert own reminders" ON reminders;
-                DROP POLICY IF EXISTS "Users can update own reminders" ON reminders;
-                DROP POLICY IF EXISTS "Users can delete own reminders" ON reminders;
-                
-                CREATE POLICY "Users can view own reminders" ON reminders
-                    FOR SELECT USING ((SELECT auth.uid()) = user_id);
-                CREATE POLICY "Users can insert own reminders" ON reminders
-                    FOR INSERT WITH CHECK ((SELECT auth.uid()) = user_id);
-                CREATE POLICY "Users can update own reminders" ON reminders
-                    FOR UPDATE USING ((SELECT auth.uid()) = user_id);
-                CREATE POLICY "Users can delete own reminders" ON reminders
-                    FOR DELETE USING ((SELECT auth.uid()) = user_id);
-            """)
-            
-            # ============================================================================
-            # CREATE RLS POLICIES FOR USER_SETTINGS
-            # ============================================================================
-            await conn.execute("""
-                DROP POLICY IF EXISTS "Users can view own settings" ON user_settings;
-                DROP POLICY IF EXISTS "Users can insert own settings" ON user_settings;
-                DROP POLICY IF EXISTS "Users can update own settings" ON user_settings;
-                DROP POLICY IF EXISTS "Users can delete own settings" ON user_settings;
-                
-                CREATE POLICY "Users can view own settings" ON user_settings
-                    FOR SELECT USING ((SELECT auth.uid()) = user_id);
-                CREATE POLICY "Users can insert own settings" ON user_settings
-                    FOR INSERT WITH CHECK ((SELECT auth.uid()) = user_id);
-                CREATE POLICY "Users can update own settings" ON user_settings
-                    FOR UPDATE USING ((SELECT auth.uid()) = user_id);
-                CREATE POLICY "Users can delete own settings" ON user_settings
-                    FOR DELETE USING ((SELECT auth.uid()) = user_id);
-            """)
-            
-            # ============================================================================
-            # CREATE RLS POLICIES FOR PAYMENTS
-            # ============================================================================
-            await conn.execute("""
-                DROP POLICY IF EXISTS "Users can view own payments" ON payments;
-                DROP POLICY IF EXISTS "Users can insert own payments" ON payments;
-                DROP POLICY IF EXISTS "Users can update own payments" ON payments;
-                
-                CREATE POLICY "Users can view own payments" ON payments
-                    FOR SELECT USING ((SELECT auth.uid()) = user_id);
-                CREATE POLICY "Users can insert own payments" ON payments
-                    FOR INSERT WITH CHECK ((SELECT auth.uid()) = user_id);
-                CREATE POLICY "Users can update own payments" ON payments
-                    FOR UPDATE USING ((SELECT auth.uid()) = user_id);
-            """)
-            
-            # Create automatic timestamp triggers
-            await conn.execute("""
-                DROP TRIGGER IF EXISTS update_transactions_updated_at ON transactions;
-                DROP TRIGGER IF EXISTS update_reminders_updated_at ON reminders;
-                DROP TRIGGER IF EXISTS update_user_settings_updated_at ON user_settings;
-                DROP TRIGGER IF EXISTS update_payments_updated_at ON payments;
-                
-                CREATE TRIGGER update_transactions_updated_at
-                    BEFORE UPDATE ON transactions
-                    FOR EACH ROW
-                    EXECUTE FUNCTION update_updated_at_column();
-                
-                CREATE TRIGGER update_reminders_updated_at
-                    BEFORE UPDATE ON reminders
-                    FOR EACH ROW
-                    EXECUTE FUNCTION update_updated_at_column();
-                
-                CREATE TRIGGER update_user_settings_updated_at
-                    BEFORE UPDATE ON user_settings
-                    FOR EACH ROW
-                    EXECUTE FUNCTION update_updated_at_column();
-                
-                CREATE TRIGGER update_payments_updated_at
-                    BEFORE UPDATE ON payments
-                    FOR EACH ROW
-                    EXECUTE FUNCTION update_updated_at_column();
-            """)
-            
-            # Function to automatically update premium status based on payments (security fixed)
-            await conn.execute("""
-                CREATE OR REPLACE FUNCTION update_premium_status()
-                RETURNS TRIGGER 
-                LANGUAGE plpgsql
-                SECURITY DEFINER
-                SET search_path = public
-                AS $$
-                BEGIN
-                    -- Update user_settings when a payment is successful
-                    IF NEW.status = 'success' AND NEW.valid_until IS NOT NULL THEN
-                        INSERT INTO user_settings (user_id, is_premium, premium_until)
-                        VALUES (NEW.user_id, TRUE, NEW.valid_until)
-                        ON CONFLICT (user_id) DO UPDATE SET
-                            is_premium = TRUE,
-                            premium_until = NEW.valid_until,
-                            updated_at = NOW();
-                    END IF;
-                    
-                    RETURN NEW;
-                END;
-                $$;
-            """)
-            
-            # Trigger to automatically update premium status on payment success
-            await conn.execute("""
-                DROP TRIGGER IF EXISTS payment_success_trigger ON payments;
-                CREATE TRIGGER payment_success_trigger
-                    AFTER INSERT OR UPDATE ON payments
-                    FOR EACH ROW
-                    EXECUTE FUNCTION update_premium_status();
-            """)
-            
-            # Function to check and update expired premium subscriptions (security fixed)
-            await conn.execute("""
-                CREATE OR REPLACE FUNCTION check_expired_premium()
-                RETURNS void 
-                LANGUAGE plpgsql
-                SECURITY DEFINER
-                SET search_path = public
-                AS $$
-                BEGIN
-                    UPDATE user_settings 
-                    SET is_premium = FALSE, updated_at = NOW()
-                    WHERE is_premium = TRUE 
-                    AND premium_until IS NOT NULL 
-                    AND premium_until < NOW();
-                END;
-                $$;
-            """)
-            
-            # Function to reset monthly freemium credits (security fixed)
-            await conn.execute("""
-                CREATE OR REPLACE FUNCTION reset_monthly_credits()
-                RETURNS INTEGER 
-                LANGUAGE plpgsql
-                SECURITY DEFINER
-                SET search_path = public
-                AS $$
-                DECLARE
-                    affected_users INTEGER;
-                BEGIN
-                    -- Reset credits for non-premium users whose reset date has passed
-                    UPDATE user_settings 
-                    SET freemium_credits = 20,
-                        credits_reset_date = CURRENT_DATE + INTERVAL '30 days',
-                        updated_at = NOW()
-                    WHERE is_premium = FALSE
-                    AND credits_reset_date < CURRENT_DATE;
-                    
-                    GET DIAGNOSTICS affected_users = ROW_COUNT;
-                    
-                    RETURN affected_users;
-                END;
-                $$;
-            """)
-            
-            # Simplified function to consume freemium credits (security fixed)
-            await conn.execute("""
-                CREATE OR REPLACE FUNCTION consume_freemium_credits(
-                    p_user_id UUID,
-                    p_operation_type TEXT,
-                    p_credits_needed INTEGER,
-                    p_activity_data JSONB DEFAULT '{}'
-                )
-                RETURNS JSONB 
-                LANGUAGE plpgsql
-                SECURITY DEFINER
-                SET search_path = public
-                AS $$
-                DECLARE
-                    current_credits INTEGER;
-                    is_premium_user BOOLEAN;
-                    credits_after INTEGER;
-                BEGIN
-                    -- Get current user status
-                    SELECT freemium_credits, is_premium 
-                    INTO current_credits, is_premium_user
-                    FROM user_settings 
-                    WHERE user_id = p_user_id;
-                    
-                    -- If user not found, return error
-                    IF NOT FOUND THEN
-                        RETURN jsonb_build_object(
-                            'success', false,
-                            'error', 'user_not_found',
-                            'message', 'User not found'
-                        );
-                    END IF;
-                    
-                    -- Premium users get unlimited usage
-                    IF is_premium_user THEN
-                        RETURN jsonb_build_object(
-                            'success', true,
-                            'is_premium', true,
-                            'credits_used', 0,
-                            'credits_remaining', -1,
-                            'message', 'Premium user - unlimited usage'
-                        );
-                    END IF;
-                    
-                    -- Check if user has enough credits
-                    IF current_credits < p_credits_needed THEN
-                        RETURN jsonb_build_object(
-                            'success', false,
-                            'error', 'insufficient_credits',
-                            'message', 'Not enough credits available',
-                            'credits_available', current_credits,
-                            'credits_needed', p_credits_needed
-                        );
-                    END IF;
-                    
-                    -- Consume credits (only update user_settings)
-                    credits_after := current_credits - p_credits_needed;
-                    
-                    UPDATE user_settings 
-                    SET freemium_credits = credits_after,
-                        updated_at = NOW()
-                    WHERE user_id = p_user_id;
-                    
-                    RETURN jsonb_build_object(
-                        'success', true,
-                        'is_premium', false,
-                        'credits_used', p_credits_needed,
-                        'credits_remaining', credits_after,
-                        'message', 'Credits consumed successfully'
-                    );
-                END;
-                $$;
-            """)
-            
-            # ✅ GRANT PROPER PERMISSIONS TO SUPABASE ROLES
-            await conn.execute("""
-                -- Grant full table access to Supabase roles
-                GRANT ALL PRIVILEGES ON TABLE user_settings TO authenticated;
-                GRANT ALL PRIVILEGES ON TABLE user_settings TO anon;
-                GRANT ALL PRIVILEGES ON TABLE transactions TO authenticated;
-                GRANT ALL PRIVILEGES ON TABLE transactions TO anon;
-                GRANT ALL PRIVILEGES ON TABLE reminders TO authenticated;
-                GRANT ALL PRIVILEGES ON TABLE reminders TO anon;
-                GRANT ALL PRIVILEGES ON TABLE payments TO authenticated;
-                GRANT ALL PRIVILEGES ON TABLE payments TO anon;
-                
-                -- Grant sequence permissions for auto-increment IDs
-                GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO authenticated;
-                GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO anon;
-                
-                -- Grant function execution permissions
-                GRANT EXECUTE ON FUNCTION update_updated_at_column() TO authenticated;
-                GRANT EXECUTE ON FUNCTION update_updated_at_column() TO anon;
-                GRANT EXECUTE ON FUNCTION update_premium_status() TO authenticated;
-                GRANT EXECUTE ON FUNCTION update_premium_status() TO anon;
-                GRANT EXECUTE ON FUNCTION check_expired_premium() TO authenticated;
-                GRANT EXECUTE ON FUNCTION check_expired_premium() TO anon;
-                GRANT EXECUTE ON FUNCTION reset_monthly_credits() TO authenticated;
-                GRANT EXECUTE ON FUNCTION reset_monthly_credits() TO anon;
-                GRANT EXECUTE ON FUNCTION consume_freemium_credits(UUID, TEXT, INTEGER, JSONB) TO authenticated;
-                GRANT EXECUTE ON FUNCTION consume_freemium_credits(UUID, TEXT, INTEGER, JSONB) TO anon;
-                
-                -- Set default privileges for future objects
-                ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO authenticated;
-                ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO anon;
-                ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT USAGE, SELECT ON SEQUENCES TO authenticated;
-                ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT USAGE, SELECT ON SEQUENCES TO anon;
-                ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT EXECUTE ON FUNCTIONS TO authenticated;
-                ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT EXECUTE ON FUNCTIONS TO anon;
-            """)
-            
-            print("✅ Database tables created with RLS policies, security fixes, and proper Supabase permissions")
+    async def migrate(self, dry_run: bool = False) -> List[Migration]:
+        """Apply pending schema migrations from tools/migrations (see tools/migrator.py)"""
+        return await MigrationRunner(self.pool).migrate(dry_run=dry_run)
     
     # ============================================================================
     # TRANSACTION OPERATIONS (Expenses + Income)
     # ============================================================================
     
     async def save_transaction(self, transaction: Transaction) -> Transaction:
-        """Save a transaction to the database"""
+        """
+        Save a transaction to the database.
+        Rows with a fingerprint that already exists are skipped and come back with id None.
+        """
         async with self.pool.acquire() as conn:
             result = await conn.fetchrow("""
                 INSERT INTO transactions (
                     user_id, amount, description, category, transaction_type,
-                    original_message, source_platform, merchant, confidence_score, tags
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                    original_message, source_platform, merchant, confidence_score, tags,
+                    date, fingerprint
+                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, COALESCE($11, NOW()), $12)
+                ON CONFLICT (user_id, fingerprint) WHERE fingerprint IS NOT NULL DO NOTHING
                 RETURNING id, created_at
             """, 
             transaction.user_id, transaction.amount, transaction.description,
             transaction.category, transaction.transaction_type.value,
             transaction.original_message, transaction.source_platform,
             transaction.merchant, transaction.confidence_score, 
-            json.dumps(transaction.tags)
+            transaction.tags, transaction.date, transaction.fingerprint
             )
             
-            transaction.id = result['id']
-            transaction.created_at = result['created_at']
+            if result:
+                transaction.id = result['id']
+                transaction.created_at = result['created_at']
+                self.summary_cache.bump(transaction.user_id)
             return transaction
 
+    async def save_transactions_bulk(self, transactions: List[Transaction],
+                                     import_batch_id: Optional[str] = None,
+                                     dedupe: bool = True) -> ImportResult:
+        """
+        Save many transactions in a single INSERT inside one DB transaction.
+        All rows share an import batch id so the whole import can be reverted.
+        With dedupe, rows get a fingerprint and ones already stored are skipped,
+        so re-importing the same statement is a no-op.
+        """
+        import_batch_id = import_batch_id or str(uuid.uuid4())
+        if not transactions:
+            return ImportResult(import_batch_id=import_batch_id)
+
+        if dedupe:
+            occurrences: Dict[str, int] = {}
+            for transaction in transactions:
+                if transaction.fingerprint:
+                    continue
+                key = transaction_fingerprint(
+                    transaction.user_id, transaction.date, transaction.amount, transaction.description
+                )
+                occurrence = occurrences.get(key, 0)
+                occurrences[key] = occurrence + 1
+                transaction.fingerprint = transaction_fingerprint(
+                    transaction.user_id, transaction.date, transaction.amount,
+                    transaction.description, occurrence
+                )
+
+        # tags go over as JSON text per row: a list inside a jsonb[] parameter would be
+        # encoded as another array dimension and flattened by unnest
+        columns = [[] for _ in range(12)]
+        for transaction in transactions:
+            transaction_type = transaction.transaction_type
+            values = (
+                transaction.user_id, transaction.amount, transaction.description,
+                transaction.category,
+                transaction_type.value if isinstance(transaction_type, TransactionType) else transaction_type,
+                transaction.original_message, transaction.source_platform,
+                transaction.merchant, transaction.confidence_score,
+                json_dumps(transaction.tags), transaction.date, transaction.fingerprint
+            )
+            for column, value in zip(columns, values):
+                column.append(value)
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch("""
+                    INSERT INTO transactions (
+                        user_id, amount, description, category, transaction_type,
+                        original_message, source_platform, merchant, confidence_score, tags,
+                        date, fingerprint, import_batch_id
+                    )
+                    SELECT
+                        t.user_id, t.amount, t.description, t.category, t.transaction_type,
+                        t.original_message, t.source_platform, t.merchant, t.confidence_score, t.tags::jsonb,
+                        COALESCE(t.date, NOW()), t.fingerprint, $13
+                    FROM unnest(
+                        $1::uuid[], $2::numeric[], $3::text[], $4::text[], $5::text[],
+                        $6::text[], $7::text[], $8::text[], $9::numeric[], $10::text[],
+                        $11::timestamp[], $12::text[]
+                    ) AS t(
+                        user_id, amount, description, category, transaction_type,
+                        original_message, source_platform, merchant, confidence_score, tags,
+                        date, fingerprint
+                    )
+                    ON CONFLICT (user_id, fingerprint) WHERE fingerprint IS NOT NULL DO NOTHING
+                    RETURNING id, created_at, fingerprint
+                """, *columns, import_batch_id)
+
+        if rows:
+            for user_id in {transaction.user_id for transaction in transactions}:
+                self.summary_cache.bump(user_id)
+
+        inserted = {row['fingerprint']: row for row in rows if row['fingerprint']}
+        for transaction in transactions:
+            row = inserted.get(transaction.fingerprint)
+            if row:
+                transaction.id = row['id']
+                transaction.created_at = row['created_at']
+                transaction.import_batch_id = import_batch_id
+
+        return ImportResult(
+            import_batch_id=import_batch_id,
+            ids=[row['id'] for row in rows],
+            inserted_count=len(rows),
+            skipped_count=len(transactions) - len(rows)
+        )
+
+    async def delete_import_batch(self, user_id: str, import_batch_id: str) -> int:
+        """Revert a bulk import by deleting every transaction in the batch"""
+        async with self.pool.acquire() as conn:
+            result = await conn.execute("""
+                DELETE FROM transactions
+                WHERE user_id = $1 AND import_batch_id = $2
+            """, user_id, import_batch_id)
+            deleted = int(result.split()[-1])
+            if deleted:
+                self.summary_cache.bump(user_id)
+            return deleted
+
     async def get_user_transactions(self, user_id: str, days: int = 30, 
                           transaction_type: str = None) -> List[Transaction]:
         """Get user transactions for the specified period"""
@@ -548,51 +205,256 @@ class Database:
             """
             
             rows = await conn.fetch(query, *params)
-            
+
             return [self._row_to_transaction(row) for row in rows]
 
+    async def list_transactions(self, user_id: str, limit: int = 50, cursor: Optional[str] = None,
+                                transaction_type: Optional[str] = None, category: Optional[str] = None,
+                                columns: Optional[List[str]] = None) -> TransactionPage:
+        """
+        List a user's transactions newest first, one page at a time.
+        Keyset pagination on (date, id) keeps every page an index range scan no matter
+        how deep the caller pages; only `columns` are selected and returned.
+        Raises ValueError for a malformed cursor or unknown column.
+        """
+        columns = columns or list(TRANSACTION_LIST_DEFAULT_COLUMNS)
+        unknown = [c for c in columns if c not in TRANSACTION_LIST_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        limit = max(1, min(limit, TRANSACTION_LIST_MAX_LIMIT))
+
+        # date and id are always needed to build the next cursor
+        selected = list(dict.fromkeys(["id", "date", *columns]))
+        conditions = ["user_id = $1"]
+        params: List[Any] = [user_id]
+
+        if cursor:
+            cursor_date, cursor_id = decode_transaction_cursor(cursor)
+            params.extend([cursor_date, cursor_id])
+            conditions.append(f"(date, id) < (${len(params) - 1}, ${len(params)})")
+        if transaction_type:
+            params.append(transaction_type)
+            conditions.append(f"transaction_type = ${len(params)}")
+        if category:
+            params.append(category)
+            conditions.append(f"category = ${len(params)}")
+
+        # Fetch one extra row to know whether another page exists
+        params.append(limit + 1)
+        query = f"""
+            SELECT {', '.join(selected)} FROM transactions
+            WHERE {' AND '.join(conditions)}
+            ORDER BY date DESC, id DESC
+            LIMIT ${len(params)}
+        """
+
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *params)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_transaction_cursor(rows[-1]['date'], rows[-1]['id'])
+
+        return TransactionPage(
+            items=[self._project_transaction_row(row, columns) for row in rows],
+            next_cursor=next_cursor
+        )
+
+    async def iter_transactions_for_export(self, user_id: str, columns: List[str],
+                                           days: Optional[int] = None,
+                                           batch_size: int = 1000) -> AsyncIterator[asyncpg.Record]:
+        """
+        Yield all of a user's transactions (oldest first) from a server-side cursor.
+        Rows are fetched `batch_size` at a time and only when the consumer asks for more,
+        so a slow client holds back the query instead of rows piling up in memory.
+        The pooled connection is held until the generator is exhausted or closed.
+        """
+        unknown = [c for c in columns if c not in TRANSACTION_LIST_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+        conditions = ["user_id = $1"]
+        params: List[Any] = [user_id]
+        if days:
+            params.append(datetime.now() - timedelta(days=days))
+            conditions.append("date >= $2")
+
+        query = f"""
+            SELECT {', '.join(columns)} FROM transactions
+            WHERE {' AND '.join(conditions)}
+            ORDER BY date, id
+        """
+
+        async with self.pool.acquire() as conn:
+            # Cursors only live inside a transaction
+            async with conn.transaction(readonly=True):
+                async for row in conn.cursor(query, *params, prefetch=batch_size):
+                    yield row
+
+    def _project_transaction_row(self, row, columns: List[str]) -> Dict[str, Any]:
+        """JSON-ready dict of the requested columns, skipping full Transaction construction"""
+        item = {}
+        for column in columns:
+            value = row[column]
+            if isinstance(value, Decimal):
+                value = float(value)
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, uuid.UUID):
+                value = str(value)
+            item[column] = value
+        return item
+
     async def get_transaction_summary(self, user_id: str, days: int = 30) -> TransactionSummary:
-        """Get transaction summary for the specified period"""
+        """
+        Get transaction summary for the specified period.
+        Whole days come from transaction_daily_rollup; only the partial first day
+        of the window is read from raw transactions. Results are cached until the
+        user's next transaction write.
+        """
+        cached = self.summary_cache.get(user_id, days)
+        if cached is not None:
+            return cached
+        version = self.summary_cache.version(user_id)
+
         async with self.pool.acquire() as conn:
             start_date = datetime.now() - timedelta(days=days)
+            first_full_day = start_date.date() + timedelta(days=1)
             
-            # Get summary data
-            summary_row = await conn.fetchrow("""
-                SELECT 
-                    COALESCE(SUM(CASE WHEN transaction_type = 'income' THEN amount ELSE 0 END), 0) as total_income,
-                    COALESCE(SUM(CASE WHEN transaction_type = 'expense' THEN amount ELSE 0 END), 0) as total_expenses,
-                    COUNT(CASE WHEN transaction_type = 'income' THEN 1 END) as income_count,
-                    COUNT(CASE WHEN transaction_type = 'expense' THEN 1 END) as expense_count,
-                    COUNT(*) as total_transactions
-                FROM transactions 
+            rows = await conn.fetch("""
+                SELECT transaction_type, category, SUM(total) AS total, SUM(tx_count) AS tx_count
+                FROM (
+                    SELECT transaction_type, category, total, tx_count
+                    FROM transaction_daily_rollup
+                    WHERE user_id = $1 AND day >= $3
+                    UNION ALL
+                    SELECT transaction_type, category, amount, 1
+                    FROM transactions
+                    WHERE user_id = $1 AND date >= $2 AND date < $3
+                ) AS window_rows
+                GROUP BY transaction_type, category
+            """, user_id, start_date, first_full_day)
+            
+            summary = self._summary_from_grouped_rows(user_id, days, rows)
+            self.summary_cache.set(user_id, days, version, summary)
+            return summary
+
+    async def get_transaction_columns(self, user_id: str, days: int = 365) -> Dict[str, list]:
+        """
+        Fetch a user's transactions for the period as parallel column lists
+        (epoch day, amount, is_expense, category) for tools/analytics.py.
+        Aggregating into arrays server-side returns one row instead of one Record per
+        transaction; the columns come straight off the (user_id, date, id) covering index.
+        """
+        start_date = datetime.now() - timedelta(days=days)
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT
+                    COALESCE(array_agg(date::date - DATE '1970-01-01'), '{}') AS days,
+                    COALESCE(array_agg(amount::float8), '{}') AS amounts,
+                    COALESCE(array_agg(transaction_type = 'expense'), '{}') AS is_expense,
+                    COALESCE(array_agg(category), '{}') AS categories
+                FROM transactions
                 WHERE user_id = $1 AND date >= $2
             """, user_id, start_date)
-            
-            # Get expense categories
-            category_rows = await conn.fetch("""
-                SELECT category, SUM(amount) as total
-                FROM transactions 
-                WHERE user_id = $1 AND date >= $2 AND transaction_type = 'expense'
-                GROUP BY category
-                ORDER BY total DESC
-                LIMIT 5
-            """, user_id, start_date)
-            
-            expense_categories = [
-                {"category": row['category'], "total": float(row['total'])}
-                for row in category_rows
+
+        return {
+            "days": row['days'],
+            "amounts": row['amounts'],
+            "is_expense": row['is_expense'],
+            "categories": row['categories']
+        }
+
+    def _summary_from_grouped_rows(self, user_id: str, days: int, rows) -> TransactionSummary:
+        """Build a TransactionSummary from (transaction_type, category, total, tx_count) rows"""
+        totals = {'income': 0.0, 'expense': 0.0}
+        counts = {'income': 0, 'expense': 0}
+        expense_categories = []
+        for row in rows:
+            transaction_type = row['transaction_type']
+            totals[transaction_type] = totals.get(transaction_type, 0.0) + float(row['total'])
+            counts[transaction_type] = counts.get(transaction_type, 0) + int(row['tx_count'])
+            if transaction_type == 'expense':
+                expense_categories.append({"category": row['category'], "total": float(row['total'])})
+        
+        expense_categories.sort(key=lambda cat: cat['total'], reverse=True)
+        
+        return TransactionSummary(
+            user_id=user_id,
+            period_days=days,
+            total_income=totals['income'],
+            total_expenses=totals['expense'],
+            income_count=counts['income'],
+            expense_count=counts['expense'],
+            total_transactions=sum(counts.values()),
+            expense_categories=expense_categories[:5]
+        )
+
+    async def backfill_transaction_rollup(self, user_id: Optional[str] = None) -> int:
+        """
+        Rebuild transaction_daily_rollup from transactions, for one user or everyone.
+        Writes to transactions are blocked while it runs. Returns the number of rollup rows written.
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("LOCK TABLE transactions IN SHARE MODE")
+                await conn.execute("""
+                    DELETE FROM transaction_daily_rollup
+                    WHERE $1::uuid IS NULL OR user_id = $1::uuid
+                """, user_id)
+                result = await conn.execute("""
+                    INSERT INTO transaction_daily_rollup (user_id, day, transaction_type, category, total, tx_count)
+                    SELECT user_id, date::date, transaction_type, category, SUM(amount), COUNT(*)
+                    FROM transactions
+                    WHERE $1::uuid IS NULL OR user_id = $1::uuid
+                    GROUP BY 1, 2, 3, 4
+                """, user_id)
+                return int(result.split()[-1])
+
+    async def check_transaction_rollup(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Compare transaction_daily_rollup with a fresh aggregate and return the mismatching groups"""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                WITH actual AS (
+                    SELECT user_id, date::date AS day, transaction_type, category,
+                           SUM(amount) AS total, COUNT(*) AS tx_count
+                    FROM transactions
+                    WHERE $1::uuid IS NULL OR user_id = $1::uuid
+                    GROUP BY 1, 2, 3, 4
+                ), rollup AS (
+                    SELECT user_id, day, transaction_type, category, total, tx_count
+                    FROM transaction_daily_rollup
+                    WHERE $1::uuid IS NULL OR user_id = $1::uuid
+                )
+                SELECT
+                    COALESCE(a.user_id, r.user_id) AS user_id,
+                    COALESCE(a.day, r.day) AS day,
+                    COALESCE(a.transaction_type, r.transaction_type) AS transaction_type,
+                    COALESCE(a.category, r.category) AS category,
+                    a.total AS actual_total, r.total AS rollup_total,
+                    a.tx_count AS actual_count, r.tx_count AS rollup_count
+                FROM actual a
+                FULL OUTER JOIN rollup r
+                    ON a.user_id = r.user_id AND a.day = r.day
+                    AND a.transaction_type = r.transaction_type AND a.category = r.category
+                WHERE a.total IS DISTINCT FROM r.total OR a.tx_count IS DISTINCT FROM r.tx_count
+                ORDER BY 1, 2
+            """, user_id)
+            
+            return [
+                {
+                    'user_id': str(row['user_id']),
+                    'day': row['day'],
+                    'transaction_type': row['transaction_type'],
+                    'category': row['category'],
+                    'actual_total': float(row['actual_total']) if row['actual_total'] is not None else None,
+                    'rollup_total': float(row['rollup_total']) if row['rollup_total'] is not None else None,
+                    'actual_count': row['actual_count'],
+                    'rollup_count': row['rollup_count']
+                }
+                for row in rows
             ]
-            
-            return TransactionSummary(
-                user_id=user_id,
-                period_days=days,
-                total_income=float(summary_row['total_income']),
-                total_expenses=float(summary_row['total_expenses']),
-                income_count=summary_row['income_count'],
-                expense_count=summary_row['expense_count'],
-                total_transactions=summary_row['total_transactions'],
-                expense_categories=expense_categories
-            )
 
     # ============================================================================
     # REMINDER OPERATIONS
@@ -800,7 +662,7 @@ class Database:
             """, user_id, provider, amount, currency, valid_until)
             
             payment_id = str(result['id'])
-            print(f"✅ Created payment record {payment_id} for user {user_id}")
+            logger.info("Payment record created", payment_id=payment_id, user_id=user_id)
             return payment_id
 
     async def update_payment_status(self, payment_id: str, status: str, transaction_id: str = None, subscription_id: str = None, amount = None, currency = None):
@@ -823,7 +685,7 @@ class Database:
                 raise ValueError(f"Payment {payment_id} not found")
             
             user_id = str(result['user_id'])
-            print(f"✅ Updated payment {payment_id} status to {status}")
+            logger.info("Payment status updated", payment_id=payment_id, status=status)
 
     async def get_payment_by_id(self, payment_id: str) -> Optional[Dict[str, Any]]:
         """Get payment details by ID"""
@@ -874,11 +736,13 @@ class Database:
             merchant=row['merchant'],
             date=row['date'],
             receipt_image_url=row['receipt_image_url'],
-            location=json.loads(row['location']) if row['location'] else None,
+            location=row['location'],
             is_recurring=row['is_recurring'],
             recurring_pattern=row['recurring_pattern'],
-            tags=json.loads(row['tags']) if row['tags'] else [],
+            tags=row['tags'] or [],
             confidence_score=row['confidence_score'],
+            import_batch_id=str(row['import_batch_id']) if row.get('import_batch_id') else None,
+            fingerprint=row.get('fingerprint'),
             created_at=row['created_at'],
             updated_at=row['updated_at']
         )
@@ -900,9 +764,9 @@ class Database:
             notification_sent=row['notification_sent'],
             snooze_until=row['snooze_until'],
             tags=row['tags'],
-            location_reminder=json.loads(row['location_reminder']) if row['location_reminder'] else None,
-            attachments=json.loads(row['attachments']) if row['attachments'] else [],
-            assigned_to_platforms=json.loads(row['assigned_to_platforms']) if row['assigned_to_platforms'] else [],
+            location_reminder=row['location_reminder'],
+            attachments=row['attachments'] or [],
+            assigned_to_platforms=row['assigned_to_platforms'] or [],
             created_at=row['created_at'],
             completed_at=row['completed_at'],
             updated_at=row['updated_at']
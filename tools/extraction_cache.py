@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+from typing import Any, Dict, Optional
+
+from cachetools import TTLCache
+
+from .metrics import CACHE_REQUESTS
+
+
+class ExtractionCache:
+    """Content-addressed cache of document extraction results (receipts, bank statements)"""
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: int = 24 * 60 * 60):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        # Extractions running right now, so a re-sent upload waits instead of paying twice
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+
+    @staticmethod
+    def make_key(user_id: str, content: bytes) -> str:
+        """Key an upload by its SHA-256 digest, scoped to the user who sent it"""
+        digest = hashlib.sha256(content).hexdigest()
+        return f"{user_id}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the prior result for an upload (key from make_key), if any. Callers decide
+        on credits from this single lookup: a separate membership check could pass and
+        then see the entry expire before the read.
+        """
+        result = self._cache.get(key)
+        self._count(result)
+        return result
+
+    async def get_or_claim(self, key: str) -> Optional[Any]:
+        """
+        Like get(), but if the same upload is being extracted right now (a Telegram retry,
+        a double tap), wait for that extraction and return its result. None means the
+        caller now owns the extraction and must call release(key) once it ends, success
+        or not. A waiter whose extraction failed (nothing cached) claims it in turn.
+        """
+        while True:
+            result = self._cache.get(key)
+            if result is not None:
+                break
+            running = self._in_flight.get(key)
+            if running is None:
+                self._in_flight[key] = asyncio.get_running_loop().create_future()
+                break
+            self.waits += 1
+            # Shielded: a waiter that gets cancelled must not cancel the owner's future
+            await asyncio.shield(running)
+        self._count(result)
+        return result
+
+    def release(self, key: str) -> None:
+        """End a claim from get_or_claim() and wake its waiters (no-op if not claimed)"""
+        running = self._in_flight.pop(key, None)
+        if running is not None and not running.done():
+            running.set_result(None)
+
+    def set(self, key: str, result: Any) -> None:
+        """Store the result of a successful extraction"""
+        self._cache[key] = result
+
+    def _count(self, result: Optional[Any]) -> None:
+        if result is None:
+            self.misses += 1
+            CACHE_REQUESTS.inc(cache="extraction", result="miss")
+        else:
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache="extraction", result="hit")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Cache size and hit/miss counters"""
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "waits": self.waits,
+            "in_flight": len(self._in_flight),
+        }
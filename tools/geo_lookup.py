@@ -0,0 +1,85 @@
+import os
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from .timezone_resolver import normalize_location
+
+if TYPE_CHECKING:
+    from geopy.geocoders import Nominatim
+    from timezonefinder import TimezoneFinder
+
+# Load the timezone polygons fully into RAM instead of memory-mapping the data files.
+# Memory-mapped (the default) shares pages between workers; in-memory costs more RSS
+# per process but never touches disk after startup.
+TIMEZONE_FINDER_IN_MEMORY = os.getenv("TIMEZONE_FINDER_IN_MEMORY", "false").lower() == "true"
+
+# 4 decimals is ~11 m: nearby geocodes of the same city share one cache entry
+COORDINATE_PRECISION = 4
+GEOCODE_TIMEOUT_SECONDS = 10
+
+_finder: Optional["TimezoneFinder"] = None
+_geolocator: Optional["Nominatim"] = None
+_lock = threading.Lock()
+
+
+def get_timezone_finder() -> "TimezoneFinder":
+    """Process-wide TimezoneFinder, created on first use (opening the data files takes ~1s)"""
+    global _finder
+    if _finder is None:
+        with _lock:
+            if _finder is None:
+                from timezonefinder import TimezoneFinder
+                _finder = TimezoneFinder(in_memory=TIMEZONE_FINDER_IN_MEMORY)
+    return _finder
+
+
+def get_geolocator() -> "Nominatim":
+    """Process-wide Nominatim client"""
+    global _geolocator
+    if _geolocator is None:
+        with _lock:
+            if _geolocator is None:
+                from geopy.geocoders import Nominatim
+                _geolocator = Nominatim(user_agent="okanfit_telegram_bot")
+    return _geolocator
+
+
+@lru_cache(maxsize=4096)
+def _timezone_at_rounded(lat: float, lng: float) -> Optional[str]:
+    return get_timezone_finder().timezone_at(lng=lng, lat=lat)
+
+
+def timezone_at(lat: float, lng: float) -> Optional[str]:
+    """IANA timezone at a coordinate, memoized on the rounded position"""
+    return _timezone_at_rounded(round(lat, COORDINATE_PRECISION), round(lng, COORDINATE_PRECISION))
+
+
+@lru_cache(maxsize=1024)
+def _geocode_normalized(name: str) -> Optional[Tuple[float, float]]:
+    location = get_geolocator().geocode(name, timeout=GEOCODE_TIMEOUT_SECONDS)
+    if location is None:
+        return None
+    return location.latitude, location.longitude
+
+
+def geocode(location_name: str) -> Optional[Tuple[float, float]]:
+    """
+    (lat, lng) for a place name, memoized on the normalized name. "Not found" is cached;
+    geocoder errors propagate and are not, so a timeout is retried on the next call.
+    """
+    return _geocode_normalized(normalize_location(location_name))
+
+
+def warm_up() -> None:
+    """Open the timezone data and run one lookup so the first registration doesn't pay for it"""
+    get_timezone_finder().timezone_at(lng=-46.6333, lat=-23.5505)
+
+
+def get_stats() -> Dict[str, Dict[str, int]]:
+    """LRU hit/miss counters for coordinate and place-name lookups"""
+    stats = {}
+    for name, cached in (("timezone_at", _timezone_at_rounded), ("geocode", _geocode_normalized)):
+        info = cached.cache_info()
+        stats[name] = {"size": info.currsize, "hits": info.hits, "misses": info.misses}
+    return stats
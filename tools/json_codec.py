@@ -0,0 +1,44 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson missing: fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Serialize the non-JSON types that show up in activity data and tags"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def json_dumps(value: Any) -> str:
+        return orjson.dumps(value, default=_default).decode("utf-8")
+
+    json_loads = orjson.loads
+else:
+    def json_dumps(value: Any) -> str:
+        return json.dumps(value, default=_default)
+
+    json_loads = json.loads
+
+
+async def init_json_codecs(conn) -> None:
+    """
+    asyncpg pool `init` hook: json/jsonb columns and parameters become native
+    Python objects, so queries pass lists/dicts directly instead of JSON strings.
+    """
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name,
+            encoder=json_dumps,
+            decoder=json_loads,
+            schema="pg_catalog"
+        )
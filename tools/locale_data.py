@@ -0,0 +1,154 @@
+from datetime import datetime, timezone as dt_timezone, tzinfo
+from typing import Dict, Optional
+
+import pytz
+
+# ============================================================================
+# EMBEDDED DATA
+# ============================================================================
+
+# ISO 3166-1 alpha-2 country -> ISO 4217 currency in everyday use (CLDR region currencies)
+COUNTRY_CURRENCIES: Dict[str, str] = {
+    "AD": "EUR", "AE": "AED", "AF": "AFN", "AG": "XCD", "AI": "XCD", "AL": "ALL", "AM": "AMD",
+    "AO": "AOA", "AQ": "USD", "AR": "ARS", "AS": "USD", "AT": "EUR", "AU": "AUD", "AW": "AWG",
+    "AX": "EUR", "AZ": "AZN", "BA": "BAM", "BB": "BBD", "BD": "BDT", "BE": "EUR", "BF": "XOF",
+    "BG": "BGN", "BH": "BHD", "BI": "BIF", "BJ": "XOF", "BL": "EUR", "BM": "BMD", "BN": "BND",
+    "BO": "BOB", "BQ": "USD", "BR": "BRL", "BS": "BSD", "BT": "BTN", "BW": "BWP", "BY": "BYN",
+    "BZ": "BZD", "CA": "CAD", "CC": "AUD", "CD": "CDF", "CF": "XAF", "CG": "XAF", "CH": "CHF",
+    "CI": "XOF", "CK": "NZD", "CL": "CLP", "CM": "XAF", "CN": "CNY", "CO": "COP", "CR": "CRC",
+    "CU": "CUP", "CV": "CVE", "CW": "ANG", "CX": "AUD", "CY": "EUR", "CZ": "CZK", "DE": "EUR",
+    "DJ": "DJF", "DK": "DKK", "DM": "XCD", "DO": "DOP", "DZ": "DZD", "EC": "USD", "EE": "EUR",
+    "EG": "EGP", "EH": "MAD", "ER": "ERN", "ES": "EUR", "ET": "ETB", "FI": "EUR", "FJ": "FJD",
+    "FK": "FKP", "FM": "USD", "FO": "DKK", "FR": "EUR", "GA": "XAF", "GB": "GBP", "GD": "XCD",
+    "GE": "GEL", "GF": "EUR", "GG": "GBP", "GH": "GHS", "GI": "GIP", "GL": "DKK", "GM": "GMD",
+    "GN": "GNF", "GP": "EUR", "GQ": "XAF", "GR": "EUR", "GS": "GBP", "GT": "GTQ", "GU": "USD",
+    "GW": "XOF", "GY": "GYD", "HK": "HKD", "HN": "HNL", "HR": "EUR", "HT": "HTG", "HU": "HUF",
+    "ID": "IDR", "IE": "EUR", "IL": "ILS", "IM": "GBP", "IN": "INR", "IO": "USD", "IQ": "IQD",
+    "IR": "IRR", "IS": "ISK", "IT": "EUR", "JE": "GBP", "JM": "JMD", "JO": "JOD", "JP": "JPY",
+    "KE": "KES", "KG": "KGS", "KH": "KHR", "KI": "AUD", "KM": "KMF", "KN": "XCD", "KP": "KPW",
+    "KR": "KRW", "KW": "KWD", "KY": "KYD", "KZ": "KZT", "LA": "LAK", "LB": "LBP", "LC": "XCD",
+    "LI": "CHF", "LK": "LKR", "LR": "LRD", "LS": "LSL", "LT": "EUR", "LU": "EUR", "LV": "EUR",
+    "LY": "LYD", "MA": "MAD", "MC": "EUR", "MD": "MDL", "ME": "EUR", "MF": "EUR", "MG": "MGA",
+    "MH": "USD", "MK": "MKD", "ML": "XOF", "MM": "MMK", "MN": "MNT", "MO": "MOP", "MP": "USD",
+    "MQ": "EUR", "MR": "MRU", "MS": "XCD", "MT": "EUR", "MU": "MUR", "MV": "MVR", "MW": "MWK",
+    "MX": "MXN", "MY": "MYR", "MZ": "MZN", "NA": "NAD", "NC": "XPF", "NE": "XOF", "NF": "AUD",
+    "NG": "NGN", "NI": "NIO", "NL": "EUR", "NO": "NOK", "NP": "NPR", "NR": "AUD", "NU": "NZD",
+    "NZ": "NZD", "OM": "OMR", "PA": "PAB", "PE": "PEN", "PF": "XPF", "PG": "PGK", "PH": "PHP",
+    "PK": "PKR", "PL": "PLN", "PM": "EUR", "PN": "NZD", "PR": "USD", "PS": "ILS", "PT": "EUR",
+    "PW": "USD", "PY": "PYG", "QA": "QAR", "RE": "EUR", "RO": "RON", "RS": "RSD", "RU": "RUB",
+    "RW": "RWF", "SA": "SAR", "SB": "SBD", "SC": "SCR", "SD": "SDG", "SE": "SEK", "SG": "SGD",
+    "SH": "SHP", "SI": "EUR", "SJ": "NOK", "SK": "EUR", "SL": "SLE", "SM": "EUR", "SN": "XOF",
+    "SO": "SOS", "SR": "SRD", "SS": "SSP", "ST": "STN", "SV": "USD", "SX": "ANG", "SY": "SYP",
+    "SZ": "SZL", "TC": "USD", "TD": "XAF", "TF": "EUR", "TG": "XOF", "TH": "THB", "TJ": "TJS",
+    "TK": "NZD", "TL": "USD", "TM": "TMT", "TN": "TND", "TO": "TOP", "TR": "TRY", "TT": "TTD",
+    "TV": "AUD", "TW": "TWD", "TZ": "TZS", "UA": "UAH", "UG": "UGX", "UM": "USD", "US": "USD",
+    "UY": "UYU", "UZ": "UZS", "VA": "EUR", "VC": "XCD", "VE": "VES", "VG": "USD", "VI": "USD",
+    "VN": "VND", "VU": "VUV", "WF": "XPF", "WS": "WST", "YE": "YER", "YT": "EUR", "ZA": "ZAR",
+    "ZM": "ZMW", "ZW": "USD",
+}
+
+# Zones outside zone.tab (UTC, Etc/*, legacy aliases) fall back by region, then to USD
+REGION_CURRENCIES: Dict[str, str] = {"Europe": "EUR", "Australia": "AUD"}
+DEFAULT_CURRENCY = "USD"
+
+
+
+def _load_zone_links() -> Dict[str, str]:
+    """Link name -> target zone from the tzdata.zi shipped with pytz ("Japan" -> "Asia/Tokyo")"""
+    try:
+        with pytz.open_resource("tzdata.zi") as f:
+            lines = f.read().decode("utf-8").splitlines()
+    except (OSError, ValueError):
+        return {}
+    links = {}
+    for line in lines:
+        if line.startswith("L "):
+            _, target, link = line.split()
+            links[link] = target
+    return links
+
+
+# Old names whose tzdata.zi target is a merged zone in another country ("Iceland" ->
+# Africa/Abidjan); point them at their own country's zone instead
+RENAMED_ZONES: Dict[str, str] = {
+    "Iceland": "Atlantic/Reykjavik", "Africa/Asmera": "Africa/Asmara", "Africa/Timbuktu": "Africa/Bamako",
+    "America/Virgin": "America/St_Thomas", "Atlantic/Jan_Mayen": "Arctic/Longyearbyen",
+    "Pacific/Ponape": "Pacific/Pohnpei", "Pacific/Truk": "Pacific/Chuuk", "Pacific/Yap": "Pacific/Chuuk",
+}
+
+# Backward-compatible aliases pytz accepts: "Japan", "US/Eastern", "Europe/Belfast"...
+ZONE_LINKS: Dict[str, str] = {**_load_zone_links(), **RENAMED_ZONES}
+
+# Zone -> country, inverted once from pytz's zone.tab (each zone belongs to one country).
+# Links take their target's country unless zone.tab lists them itself (Europe/Oslo is a
+# link to Europe/Berlin but stays Norwegian).
+ZONE_COUNTRIES: Dict[str, str] = {
+    zone: country
+    for country, zones in pytz.country_timezones.items()
+    for zone in zones
+}
+_TABBED_ZONES = frozenset(ZONE_COUNTRIES)
+for _link, _target in ZONE_LINKS.items():
+    if _link not in ZONE_COUNTRIES and _target in ZONE_COUNTRIES:
+        ZONE_COUNTRIES[_link] = ZONE_COUNTRIES[_target]
+
+_tzinfos: Dict[str, tzinfo] = {}
+
+
+def is_valid_timezone(zone: str) -> bool:
+    """True for any IANA name pytz knows, including aliases"""
+    return zone in pytz.all_timezones_set
+
+
+def get_tzinfo(zone: str) -> tzinfo:
+    """Cached tzinfo for a zone; unknown names get UTC"""
+    tz = _tzinfos.get(zone)
+    if tz is None:
+        tz = pytz.timezone(zone) if is_valid_timezone(zone) else pytz.utc
+        _tzinfos[zone] = tz
+    return tz
+
+
+def canonical_timezone(zone: str) -> str:
+    """The zone itself if zone.tab lists it, else its link target ("Eire" -> "Europe/Dublin")"""
+    if zone in _TABBED_ZONES:
+        return zone
+    return ZONE_LINKS.get(zone, zone)
+
+
+def country_for_timezone(zone: str) -> Optional[str]:
+    """ISO country code for a zone, if zone.tab lists it"""
+    return ZONE_COUNTRIES.get(zone)
+
+
+def currency_for_timezone(zone: str) -> str:
+    """Best-guess local currency for a zone (used to default new users' currency)"""
+    country = ZONE_COUNTRIES.get(zone)
+    if country in COUNTRY_CURRENCIES:
+        return COUNTRY_CURRENCIES[country]
+    return REGION_CURRENCIES.get(zone.split("/", 1)[0], DEFAULT_CURRENCY)
+
+
+def _offset_string(moment: datetime) -> str:
+    total_minutes = int(moment.utcoffset().total_seconds() // 60)
+    sign = "+" if total_minutes >= 0 else "-"
+    hours, minutes = divmod(abs(total_minutes), 60)
+    return f"UTC{sign}{hours:02d}:{minutes:02d}"
+
+
+def format_utc_offset(zone: str, at: Optional[datetime] = None) -> Optional[str]:
+    """Current (or `at`) UTC offset as "UTC-03:00"; None for unknown zones"""
+    if not is_valid_timezone(zone):
+        return None
+    moment = at or datetime.now(dt_timezone.utc)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    # Not memoized per hour: transitions such as America/St_Johns' fall off the hour
+    return _offset_string(moment.astimezone(get_tzinfo(zone)))
+
+
+def to_local(moment: datetime, zone: str) -> datetime:
+    """Convert a UTC datetime (naive values are taken as UTC) to the zone's local time"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    return moment.astimezone(get_tzinfo(zone))
@@ -0,0 +1,250 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from tools.json_codec import json_dumps
+from tools.tracing import current_ids
+
+# Structured logging for the API and agents. Callers attach fields as keyword arguments:
+#
+#     logger = get_logger(__name__)
+#     logger.info("Payment processed", payment_id=payment_id, user_id=user_id)
+#     logger.debug("LLM response", agent="reminder", response=text, sample=DEBUG_SAMPLE_RATE)
+#
+# Inside a request, every line also carries its request_id and trace_id (tools/tracing.py).
+# Records go through a QueueHandler, so the request path only copies the fields into a
+# queue; JSON encoding and the stdout write happen on the QueueListener thread.
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "json" (one object per line, for Cloud Logging) or "text" (local development)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Default fraction of high-volume debug lines (per-message payload dumps) that are kept
+DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+
+ROOT_LOGGER = "okanassist"
+
+# ============================================================================
+# REDACTION
+# ============================================================================
+
+REDACTED = "[redacted]"
+
+# Field names whose values never reach the log, at any nesting depth
+SENSITIVE_KEYS = frozenset({
+    "email", "customer_email", "password", "token", "access_token", "refresh_token",
+    "api_key", "secret", "authorization", "phone", "name", "first_name", "last_name",
+    "full_name", "username", "stripe_customer_id",
+})
+
+# Secrets and contact details that can appear inside free text (messages, exceptions, LLM output)
+SENSITIVE_PATTERN = re.compile("|".join((
+    r"[\w.+-]+@[\w-]+\.[\w.-]+",                   # email addresses
+    r"\b\d{6,12}:[A-Za-z0-9_-]{30,}\b",            # Telegram bot tokens
+    r"\b(?:sk|rk|pk)_(?:live|test)_[A-Za-z0-9]+\b", # Stripe keys
+    r"\bwhsec_[A-Za-z0-9]+\b",                      # Stripe webhook secrets
+    r"\beyJ[\w-]+\.[\w-]+\.[\w-]+",                 # JWTs
+    r"\b[Bb]earer\s+[\w.-]+",
+)))
+
+
+def redact_text(text: str) -> str:
+    """Mask emails, tokens and keys inside a string"""
+    return SENSITIVE_PATTERN.sub(REDACTED, text)
+
+
+def mask_keys(value: Any) -> Any:
+    """Copy of a field value with the values of sensitive keys masked (no text scanning)"""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in SENSITIVE_KEYS else mask_keys(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple, set)):
+        return [mask_keys(item) for item in value]
+    return value
+
+
+def redact(value: Any) -> Any:
+    """Copy of a field value with sensitive keys and strings masked"""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in SENSITIVE_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple, set)):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return redact_text(value)
+    return value
+
+
+# ============================================================================
+# FORMATTERS
+# ============================================================================
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and the record's fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": redact_text(record.getMessage()),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(redact(fields))
+        if record.exc_text:
+            entry["exc"] = redact_text(record.exc_text)
+        try:
+            return json_dumps(entry)
+        except TypeError:
+            return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with the fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = redact_text(super().format(record))
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in redact(fields).items())
+        return line
+
+
+# ============================================================================
+# QUEUE HANDLER
+# ============================================================================
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Make the record self-contained before it changes thread. Unlike the stdlib prepare(),
+    the message is not run through a formatter here; only %-args, a key-masked snapshot
+    of the fields (the caller may mutate them later) and traceback text are resolved on
+    the request path. Scanning text for secrets is left to the formatter on the listener
+    thread. The record is updated in place: this is the only handler that sees it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = mask_keys(fields)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """
+    Logger whose keyword arguments become structured fields. debug() also takes
+    `sample`, the fraction of calls that are kept, for lines logged on every message.
+    Records are built directly, skipping the caller lookup (file/line aren't logged).
+    """
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, {})
+
+    def log(self, level: int, msg: Any, *args: Any, exc_info: Any = None, **fields: Any) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        request_id, trace_id = current_ids()
+        if request_id:
+            fields["request_id"] = request_id
+        if trace_id:
+            fields["trace_id"] = trace_id
+        if exc_info and not isinstance(exc_info, (tuple, BaseException)):
+            exc_info = sys.exc_info()
+        elif isinstance(exc_info, BaseException):
+            exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+        record = self.logger.makeRecord(
+            self.logger.name, level, "(unknown file)", 0, msg, args, exc_info or None,
+            extra={"fields": fields} if fields else None
+        )
+        self.logger.handle(record)
+
+    def debug(self, msg: Any, *args: Any, sample: float = 1.0, **fields: Any) -> None:
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if sample < 1.0:
+            if random.random() >= sample:
+                return
+            fields["sample_rate"] = sample
+        self.log(logging.DEBUG, msg, *args, **fields)
+
+
+# ============================================================================
+# SETUP
+# ============================================================================
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None,
+                      stream: Any = None) -> logging.Logger:
+    """
+    Route the okanassist.* loggers through a queue to a stdout listener thread.
+    Runs once on the first get_logger(); calling it again swaps level/format/stream.
+    """
+    with _setup_lock:
+        return _configure(level, fmt, stream)
+
+
+def _configure(level: Optional[str], fmt: Optional[str], stream: Any) -> logging.Logger:
+    global _listener
+    root = logging.getLogger(ROOT_LOGGER)
+    if _listener is not None:
+        _listener.stop()
+        root.handlers.clear()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(TextFormatter() if (fmt or LOG_FORMAT) == "text" else JsonFormatter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level or LOG_LEVEL)
+    # Keep records away from the root logger so uvicorn/Cloud Functions handlers don't print them twice
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return root
+
+
+def flush_logs() -> None:
+    """Write out everything still queued and stop the listener thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+            logging.getLogger(ROOT_LOGGER).handlers.clear()
+
+
+atexit.register(flush_logs)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """Structured logger under the okanassist namespace, e.g. get_logger(__name__)"""
+    if _listener is None:
+        with _setup_lock:
+            if _listener is None:
+                _configure(None, None, None)
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"))
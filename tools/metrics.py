@@ -0,0 +1,192 @@
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from tools.tracing import start_span
+
+# In-process metrics rendered in the Prometheus text exposition format (GET /metrics).
+# Each process keeps its own counts; scrape every instance.
+
+# Seconds. Covers cache hits and DB reads (ms) up to LLM calls and PDF extraction (tens of s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency distribution per label set, in seconds"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the with-block (also when it raises)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, series in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, key, 'le="%g"' % bound)
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                cumulative += series[len(self.buckets)]
+                labels = _format_labels(self.labelnames, key)
+                inf_labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{labels} {series[-1]:.6f}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "okanassist_http_request_duration_seconds", "Request latency per endpoint", ("method", "route", "status"))
+AUTH_SECONDS = Histogram(
+    "okanassist_auth_duration_seconds", "User lookup/authentication latency", ("source",))
+CREDIT_CHECK_SECONDS = Histogram(
+    "okanassist_credit_check_duration_seconds", "Credit check and consumption latency", ("operation",))
+LLM_CALL_SECONDS = Histogram(
+    "okanassist_llm_call_duration_seconds", "LLM agent run latency", ("agent", "model"))
+DB_QUERY_SECONDS = Histogram(
+    "okanassist_db_query_duration_seconds", "Database method latency", ("method",))
+TELEGRAM_SEND_SECONDS = Histogram(
+    "okanassist_telegram_send_duration_seconds", "Telegram Bot API send latency", ("kind",))
+TRANSCODE_SECONDS = Histogram(
+    "okanassist_ffmpeg_transcode_duration_seconds", "ffmpeg audio transcode latency")
+
+CACHE_REQUESTS = Counter(
+    "okanassist_cache_requests_total", "Cache lookups by cache and result", ("cache", "result"))
+SESSION_LOOKUPS = Counter(
+    "okanassist_session_lookups_total", "Session lookups during auth by result", ("result",))
+FALLBACK_PARSES = Counter(
+    "okanassist_fallback_parses_total", "LLM responses that needed the keyword fallback parser", ("agent",))
+
+REGISTRY: List[_Metric] = [
+    HTTP_REQUEST_SECONDS, AUTH_SECONDS, CREDIT_CHECK_SECONDS, LLM_CALL_SECONDS, DB_QUERY_SECONDS,
+    TELEGRAM_SEND_SECONDS, TRANSCODE_SECONDS, CACHE_REQUESTS, SESSION_LOOKUPS, FALLBACK_PARSES,
+]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text format"""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ============================================================================
+# INSTRUMENTATION HELPERS
+# ============================================================================
+
+async def run_agent(agent: Any, *args: Any, **kwargs: Any) -> Any:
+    """agent.run(...) in a worker thread, timed and traced per agent name and model id"""
+    name = getattr(agent, "name", None) or "unknown"
+    model = getattr(getattr(agent, "model", None), "id", None) or "unknown"
+    with start_span("agent.run", **{"agent.name": name, "llm.model": model}):
+        with LLM_CALL_SECONDS.time(agent=name, model=model):
+            return await asyncio.to_thread(agent.run, *args, **kwargs)
+
+
+def instrument_db_methods(cls):
+    """Class decorator: time (DB_QUERY_SECONDS) and trace every public coroutine method"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _timed_method(method, name))
+    return cls
+
+
+def _timed_method(method, name: str):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        with start_span(f"db.{name}", **{"db.system": "postgresql"}):
+            with DB_QUERY_SECONDS.time(method=name):
+                return await method(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,404 @@
+-- Core tables, RLS policies, triggers, credit functions and Supabase grants.
+-- Every statement is idempotent so databases created by the old _create_tables
+-- can adopt the migration runner without changes.
+
+-- Update timestamp function (security fixed)
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER 
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$;
+
+-- ============================================================================
+-- TABLES
+-- ============================================================================
+
+-- User settings table with freemium credits (referenced by every other table)
+CREATE TABLE IF NOT EXISTS user_settings (
+    user_id UUID PRIMARY KEY,
+    name TEXT,
+    currency TEXT DEFAULT 'USD' NOT NULL,
+    language TEXT DEFAULT 'en' NOT NULL,
+    timezone TEXT DEFAULT 'UTC' NOT NULL,
+    is_premium BOOLEAN DEFAULT FALSE NOT NULL,
+    telegram_id TEXT UNIQUE,
+    premium_until TIMESTAMPTZ,
+    freemium_credits INTEGER DEFAULT 50 NOT NULL CHECK (freemium_credits >= 0),
+    credits_reset_date DATE DEFAULT (CURRENT_DATE + INTERVAL '30 days') NOT NULL,
+    last_bot_interaction TIMESTAMP DEFAULT NOW(),
+    created_at TIMESTAMP DEFAULT NOW() NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW() NOT NULL
+);
+
+COMMENT ON TABLE user_settings IS 'User preferences, premium status, and freemium credits';
+COMMENT ON COLUMN user_settings.user_id IS 'User ID from authentication system';
+COMMENT ON COLUMN user_settings.currency IS 'User preferred currency code (e.g., USD, EUR, GBP)';
+COMMENT ON COLUMN user_settings.language IS 'User preferred language code (e.g., en, es, fr)';
+COMMENT ON COLUMN user_settings.timezone IS 'User timezone (e.g., UTC, America/New_York)';
+COMMENT ON COLUMN user_settings.is_premium IS 'Whether user has active premium subscription';
+COMMENT ON COLUMN user_settings.telegram_id IS 'Telegram user ID for bot integration (unique)';
+COMMENT ON COLUMN user_settings.premium_until IS 'Premium subscription expiration date';
+COMMENT ON COLUMN user_settings.freemium_credits IS 'Available freemium credits for AI processing';
+COMMENT ON COLUMN user_settings.credits_reset_date IS 'Date when credits were last reset';
+COMMENT ON COLUMN user_settings.last_bot_interaction IS 'Last time user interacted with Telegram bot';
+
+-- Transactions table (expenses + income)
+CREATE TABLE IF NOT EXISTS transactions (
+    id SERIAL PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES user_settings(user_id) ON DELETE CASCADE,
+    amount DECIMAL(12,2) NOT NULL CHECK (amount > 0),
+    description TEXT NOT NULL,
+    category TEXT NOT NULL,
+    transaction_type TEXT NOT NULL CHECK (transaction_type IN ('expense', 'income')),
+    original_message TEXT NOT NULL,
+    source_platform TEXT DEFAULT 'web_app' CHECK (source_platform IN ('telegram', 'whatsapp', 'mobile_app', 'web_app')),
+    merchant TEXT,
+    date TIMESTAMP DEFAULT NOW() NOT NULL,
+    receipt_image_url TEXT,
+    location JSONB,
+    is_recurring BOOLEAN DEFAULT FALSE NOT NULL,
+    recurring_pattern TEXT,
+    tags JSONB DEFAULT '[]' NOT NULL,
+    confidence_score DECIMAL(3,2) CHECK (confidence_score >= 0.00 AND confidence_score <= 1.00),
+    created_at TIMESTAMP DEFAULT NOW() NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW() NOT NULL
+);
+
+COMMENT ON TABLE transactions IS 'User financial transactions (expenses and income)';
+COMMENT ON COLUMN transactions.user_id IS 'User ID from authentication system';
+COMMENT ON COLUMN transactions.amount IS 'Transaction amount (positive values only)';
+COMMENT ON COLUMN transactions.transaction_type IS 'Type: expense or income';
+COMMENT ON COLUMN transactions.source_platform IS 'Platform where transaction was created';
+COMMENT ON COLUMN transactions.confidence_score IS 'AI parsing confidence (0.00-1.00)';
+
+-- Reminders table
+CREATE TABLE IF NOT EXISTS reminders (
+    id SERIAL PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES user_settings(user_id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    source_platform TEXT DEFAULT 'web_app' CHECK (source_platform IN ('telegram', 'whatsapp', 'mobile_app', 'web_app')),
+    due_datetime TIMESTAMP,
+    reminder_type TEXT DEFAULT 'general' CHECK (reminder_type IN ('task', 'event', 'deadline', 'habit', 'general')),
+    priority TEXT DEFAULT 'medium' CHECK (priority IN ('urgent', 'high', 'medium', 'low')),
+    is_completed BOOLEAN DEFAULT FALSE NOT NULL,
+    is_recurring BOOLEAN DEFAULT FALSE NOT NULL,
+    recurrence_pattern TEXT,
+    notification_sent BOOLEAN DEFAULT FALSE NOT NULL,
+    snooze_until TIMESTAMP,
+    tags TEXT,
+    location_reminder JSONB,
+    attachments JSONB DEFAULT '[]' NOT NULL,
+    assigned_to_platforms JSONB DEFAULT '[]' NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW() NOT NULL,
+    completed_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT NOW() NOT NULL
+);
+
+COMMENT ON TABLE reminders IS 'User reminders and tasks with scheduling and notification features';
+COMMENT ON COLUMN reminders.user_id IS 'User ID from authentication system';
+COMMENT ON COLUMN reminders.reminder_type IS 'Type: task, event, deadline, habit, or general';
+COMMENT ON COLUMN reminders.priority IS 'Priority: urgent, high, medium, or low';
+COMMENT ON COLUMN reminders.source_platform IS 'Platform where reminder was created';
+
+-- Payments table for subscription management
+CREATE TABLE IF NOT EXISTS payments (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES user_settings(user_id) ON DELETE CASCADE,
+    provider TEXT NOT NULL CHECK (provider IN ('paypal', 'mercadopago', 'stripe')),
+    amount NUMERIC NOT NULL CHECK (amount > 0),
+    currency TEXT NOT NULL,
+    status TEXT NOT NULL CHECK (status IN ('pending', 'success', 'failed', 'cancelled')),
+    transaction_id TEXT, -- External payment provider transaction ID
+    subscription_id TEXT, -- Provider subscription ID
+    created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+    valid_until TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
+);
+
+COMMENT ON TABLE payments IS 'Payment records for premium subscriptions';
+COMMENT ON COLUMN payments.user_id IS 'User ID from authentication system';
+COMMENT ON COLUMN payments.provider IS 'Payment provider: paypal or mercadopago';
+COMMENT ON COLUMN payments.amount IS 'Payment amount (positive values only)';
+COMMENT ON COLUMN payments.status IS 'Payment status: pending, success, failed, or cancelled';
+COMMENT ON COLUMN payments.transaction_id IS 'External payment provider transaction ID';
+COMMENT ON COLUMN payments.subscription_id IS 'Provider subscription ID for recurring payments';
+COMMENT ON COLUMN payments.valid_until IS 'Premium access valid until this date';
+
+-- ============================================================================
+-- ENABLE ROW LEVEL SECURITY ON ALL TABLES
+-- ============================================================================
+ALTER TABLE transactions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE reminders ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_settings ENABLE ROW LEVEL SECURITY;
+ALTER TABLE payments ENABLE ROW LEVEL SECURITY;
+
+-- ============================================================================
+-- RLS POLICIES
+-- ============================================================================
+DROP POLICY IF EXISTS "Users can view own transactions" ON transactions;
+DROP POLICY IF EXISTS "Users can insert own transactions" ON transactions;
+DROP POLICY IF EXISTS "Users can update own transactions" ON transactions;
+DROP POLICY IF EXISTS "Users can delete own transactions" ON transactions;
+
+CREATE POLICY "Users can view own transactions" ON transactions
+    FOR SELECT USING ((SELECT auth.uid()) = user_id);
+CREATE POLICY "Users can insert own transactions" ON transactions
+    FOR INSERT WITH CHECK ((SELECT auth.uid()) = user_id);
+CREATE POLICY "Users can update own transactions" ON transactions
+    FOR UPDATE USING ((SELECT auth.uid()) = user_id);
+CREATE POLICY "Users can delete own transactions" ON transactions
+    FOR DELETE USING ((SELECT auth.uid()) = user_id);
+
+DROP POLICY IF EXISTS "Users can view own reminders" ON reminders;
+DROP POLICY IF EXISTS "Users can insert own reminders" ON reminders;
+DROP POLICY IF EXISTS "Users can update own reminders" ON reminders;
+DROP POLICY IF EXISTS "Users can delete own reminders" ON reminders;
+
+CREATE POLICY "Users can view own reminders" ON reminders
+    FOR SELECT USING ((SELECT auth.uid()) = user_id);
+CREATE POLICY "Users can insert own reminders" ON reminders
+    FOR INSERT WITH CHECK ((SELECT auth.uid()) = user_id);
+CREATE POLICY "Users can update own reminders" ON reminders
+    FOR UPDATE USING ((SELECT auth.uid()) = user_id);
+CREATE POLICY "Users can delete own reminders" ON reminders
+    FOR DELETE USING ((SELECT auth.uid()) = user_id);
+
+DROP POLICY IF EXISTS "Users can view own settings" ON user_settings;
+DROP POLICY IF EXISTS "Users can insert own settings" ON user_settings;
+DROP POLICY IF EXISTS "Users can update own settings" ON user_settings;
+DROP POLICY IF EXISTS "Users can delete own settings" ON user_settings;
+
+CREATE POLICY "Users can view own settings" ON user_settings
+    FOR SELECT USING ((SELECT auth.uid()) = user_id);
+CREATE POLICY "Users can insert own settings" ON user_settings
+    FOR INSERT WITH CHECK ((SELECT auth.uid()) = user_id);
+CREATE POLICY "Users can update own settings" ON user_settings
+    FOR UPDATE USING ((SELECT auth.uid()) = user_id);
+CREATE POLICY "Users can delete own settings" ON user_settings
+    FOR DELETE USING ((SELECT auth.uid()) = user_id);
+
+DROP POLICY IF EXISTS "Users can view own payments" ON payments;
+DROP POLICY IF EXISTS "Users can insert own payments" ON payments;
+DROP POLICY IF EXISTS "Users can update own payments" ON payments;
+
+CREATE POLICY "Users can view own payments" ON payments
+    FOR SELECT USING ((SELECT auth.uid()) = user_id);
+CREATE POLICY "Users can insert own payments" ON payments
+    FOR INSERT WITH CHECK ((SELECT auth.uid()) = user_id);
+CREATE POLICY "Users can update own payments" ON payments
+    FOR UPDATE USING ((SELECT auth.uid()) = user_id);
+
+-- ============================================================================
+-- TRIGGERS AND FUNCTIONS
+-- ============================================================================
+
+-- Automatic timestamp triggers
+DROP TRIGGER IF EXISTS update_transactions_updated_at ON transactions;
+DROP TRIGGER IF EXISTS update_reminders_updated_at ON reminders;
+DROP TRIGGER IF EXISTS update_user_settings_updated_at ON user_settings;
+DROP TRIGGER IF EXISTS update_payments_updated_at ON payments;
+
+CREATE TRIGGER update_transactions_updated_at
+    BEFORE UPDATE ON transactions
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_reminders_updated_at
+    BEFORE UPDATE ON reminders
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_user_settings_updated_at
+    BEFORE UPDATE ON user_settings
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_payments_updated_at
+    BEFORE UPDATE ON payments
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Automatically update premium status based on payments (security fixed)
+CREATE OR REPLACE FUNCTION update_premium_status()
+RETURNS TRIGGER 
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    -- Update user_settings when a payment is successful
+    IF NEW.status = 'success' AND NEW.valid_until IS NOT NULL THEN
+        INSERT INTO user_settings (user_id, is_premium, premium_until)
+        VALUES (NEW.user_id, TRUE, NEW.valid_until)
+        ON CONFLICT (user_id) DO UPDATE SET
+            is_premium = TRUE,
+            premium_until = NEW.valid_until,
+            updated_at = NOW();
+    END IF;
+    
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS payment_success_trigger ON payments;
+CREATE TRIGGER payment_success_trigger
+    AFTER INSERT OR UPDATE ON payments
+    FOR EACH ROW
+    EXECUTE FUNCTION update_premium_status();
+
+-- Check and update expired premium subscriptions (security fixed)
+CREATE OR REPLACE FUNCTION check_expired_premium()
+RETURNS void 
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    UPDATE user_settings 
+    SET is_premium = FALSE, updated_at = NOW()
+    WHERE is_premium = TRUE 
+    AND premium_until IS NOT NULL 
+    AND premium_until < NOW();
+END;
+$$;
+
+-- Reset monthly freemium credits (security fixed)
+CREATE OR REPLACE FUNCTION reset_monthly_credits()
+RETURNS INTEGER 
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    affected_users INTEGER;
+BEGIN
+    -- Reset credits for non-premium users whose reset date has passed
+    UPDATE user_settings 
+    SET freemium_credits = 20,
+        credits_reset_date = CURRENT_DATE + INTERVAL '30 days',
+        updated_at = NOW()
+    WHERE is_premium = FALSE
+    AND credits_reset_date < CURRENT_DATE;
+    
+    GET DIAGNOSTICS affected_users = ROW_COUNT;
+    
+    RETURN affected_users;
+END;
+$$;
+
+-- Consume freemium credits (security fixed)
+CREATE OR REPLACE FUNCTION consume_freemium_credits(
+    p_user_id UUID,
+    p_operation_type TEXT,
+    p_credits_needed INTEGER,
+    p_activity_data JSONB DEFAULT '{}'
+)
+RETURNS JSONB 
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    current_credits INTEGER;
+    is_premium_user BOOLEAN;
+    credits_after INTEGER;
+BEGIN
+    -- Get current user status
+    SELECT freemium_credits, is_premium 
+    INTO current_credits, is_premium_user
+    FROM user_settings 
+    WHERE user_id = p_user_id;
+    
+    -- If user not found, return error
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object(
+            'success', false,
+            'error', 'user_not_found',
+            'message', 'User not found'
+        );
+    END IF;
+    
+    -- Premium users get unlimited usage
+    IF is_premium_user THEN
+        RETURN jsonb_build_object(
+            'success', true,
+            'is_premium', true,
+            'credits_used', 0,
+            'credits_remaining', -1,
+            'message', 'Premium user - unlimited usage'
+        );
+    END IF;
+    
+    -- Check if user has enough credits
+    IF current_credits < p_credits_needed THEN
+        RETURN jsonb_build_object(
+            'success', false,
+            'error', 'insufficient_credits',
+            'message', 'Not enough credits available',
+            'credits_available', current_credits,
+            'credits_needed', p_credits_needed
+        );
+    END IF;
+    
+    -- Consume credits (only update user_settings)
+    credits_after := current_credits - p_credits_needed;
+    
+    UPDATE user_settings 
+    SET freemium_credits = credits_after,
+        updated_at = NOW()
+    WHERE user_id = p_user_id;
+    
+    RETURN jsonb_build_object(
+        'success', true,
+        'is_premium', false,
+        'credits_used', p_credits_needed,
+        'credits_remaining', credits_after,
+        'message', 'Credits consumed successfully'
+    );
+END;
+$$;
+
+-- ============================================================================
+-- SUPABASE ROLE PERMISSIONS
+-- ============================================================================
+
+-- Grant full table access to Supabase roles
+GRANT ALL PRIVILEGES ON TABLE user_settings TO authenticated;
+GRANT ALL PRIVILEGES ON TABLE user_settings TO anon;
+GRANT ALL PRIVILEGES ON TABLE transactions TO authenticated;
+GRANT ALL PRIVILEGES ON TABLE transactions TO anon;
+GRANT ALL PRIVILEGES ON TABLE reminders TO authenticated;
+GRANT ALL PRIVILEGES ON TABLE reminders TO anon;
+GRANT ALL PRIVILEGES ON TABLE payments TO authenticated;
+GRANT ALL PRIVILEGES ON TABLE payments TO anon;
+
+-- Grant sequence permissions for auto-increment IDs
+GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO authenticated;
+GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO anon;
+
+-- Grant function execution permissions
+GRANT EXECUTE ON FUNCTION update_updated_at_column() TO authenticated;
+GRANT EXECUTE ON FUNCTION update_updated_at_column() TO anon;
+GRANT EXECUTE ON FUNCTION update_premium_status() TO authenticated;
+GRANT EXECUTE ON FUNCTION update_premium_status() TO anon;
+GRANT EXECUTE ON FUNCTION check_expired_premium() TO authenticated;
+GRANT EXECUTE ON FUNCTION check_expired_premium() TO anon;
+GRANT EXECUTE ON FUNCTION reset_monthly_credits() TO authenticated;
+GRANT EXECUTE ON FUNCTION reset_monthly_credits() TO anon;
+GRANT EXECUTE ON FUNCTION consume_freemium_credits(UUID, TEXT, INTEGER, JSONB) TO authenticated;
+GRANT EXECUTE ON FUNCTION consume_freemium_credits(UUID, TEXT, INTEGER, JSONB) TO anon;
+
+-- Set default privileges for future objects
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO authenticated;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO anon;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT USAGE, SELECT ON SEQUENCES TO authenticated;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT USAGE, SELECT ON SEQUENCES TO anon;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT EXECUTE ON FUNCTIONS TO authenticated;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT EXECUTE ON FUNCTIONS TO anon;
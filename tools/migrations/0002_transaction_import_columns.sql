@@ -0,0 +1,7 @@
+-- Bulk statement imports: batch id for undo, fingerprint for duplicate detection.
+-- Nullable columns without defaults are a catalog-only change, no table rewrite.
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS import_batch_id UUID;
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS fingerprint TEXT;
+
+COMMENT ON COLUMN transactions.import_batch_id IS 'Groups rows saved by one bulk import (e.g. a bank statement)';
+COMMENT ON COLUMN transactions.fingerprint IS 'Hash of (user, day, amount, normalized description) used to skip duplicate imports';
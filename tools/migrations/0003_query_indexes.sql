@@ -0,0 +1,53 @@
+-- migrate:no-transaction
+-- One index per query shape, checked by tools/check_query_plans.py.
+-- Built CONCURRENTLY so writes keep flowing; a failed build leaves an INVALID
+-- index behind that must be dropped before re-running (see MigrationRunner).
+
+-- get_transaction_summary / get_user_transactions: a user's date window, index-only for summary columns
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_date_covering ON transactions(user_id, date) INCLUDE (transaction_type, amount, category);
+-- delete_import_batch
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_import_batch ON transactions(import_batch_id) WHERE import_batch_id IS NOT NULL;
+-- ON CONFLICT target for duplicate imports
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_fingerprint ON transactions(user_id, fingerprint) WHERE fingerprint IS NOT NULL;
+
+-- get_user_reminders / get_due_reminders: a user's pending reminders in due order
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reminders_user_pending_due ON reminders(user_id, due_datetime, created_at DESC) WHERE NOT is_completed;
+-- get_user_reminders(include_completed=True)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reminders_user_due ON reminders(user_id, due_datetime);
+-- Reminder notifier: unsent reminders by due date
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reminders_notification ON reminders(notification_sent, due_datetime);
+
+-- check_expired_premium() (telegram_id lookups use the UNIQUE constraint's index)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_settings_premium_expiry ON user_settings(premium_until) WHERE is_premium;
+-- reset_monthly_credits()
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_settings_credits_reset ON user_settings(credits_reset_date) WHERE NOT is_premium;
+
+-- get_customer_id_from_payments: a user's latest payment
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_payments_user_created ON payments(user_id, created_at DESC);
+-- get_telegram_id_from_customer
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_payments_transaction_id ON payments(transaction_id);
+
+-- Single-column indexes from the old schema that no query uses, each one slowing every insert
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_user;
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_date;
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_category;
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_type;
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_platform;
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_amount;
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_user_date;
+DROP INDEX CONCURRENTLY IF EXISTS idx_reminders_user;
+DROP INDEX CONCURRENTLY IF EXISTS idx_reminders_due;
+DROP INDEX CONCURRENTLY IF EXISTS idx_reminders_platform;
+DROP INDEX CONCURRENTLY IF EXISTS idx_reminders_completed;
+DROP INDEX CONCURRENTLY IF EXISTS idx_reminders_priority;
+DROP INDEX CONCURRENTLY IF EXISTS idx_reminders_type;
+DROP INDEX CONCURRENTLY IF EXISTS idx_user_settings_telegram_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_user_settings_is_premium;
+DROP INDEX CONCURRENTLY IF EXISTS idx_user_settings_premium_until;
+DROP INDEX CONCURRENTLY IF EXISTS idx_user_settings_credits;
+DROP INDEX CONCURRENTLY IF EXISTS idx_user_settings_reset_date;
+DROP INDEX CONCURRENTLY IF EXISTS idx_payments_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_payments_status;
+DROP INDEX CONCURRENTLY IF EXISTS idx_payments_provider;
+DROP INDEX CONCURRENTLY IF EXISTS idx_payments_created_at;
+DROP INDEX CONCURRENTLY IF EXISTS idx_payments_valid_until;
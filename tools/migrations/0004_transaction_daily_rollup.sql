@@ -0,0 +1,103 @@
+-- Per-user daily rollup of transactions, kept current by statement-level triggers.
+
+CREATE TABLE IF NOT EXISTS transaction_daily_rollup (
+    user_id UUID NOT NULL REFERENCES user_settings(user_id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    transaction_type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    total DECIMAL(14,2) NOT NULL DEFAULT 0,
+    tx_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, transaction_type, category)
+);
+
+COMMENT ON TABLE transaction_daily_rollup IS 'Per-user daily sums of transactions by type and category, maintained by triggers';
+COMMENT ON COLUMN transaction_daily_rollup.day IS 'Calendar day of transactions.date';
+COMMENT ON COLUMN transaction_daily_rollup.total IS 'Sum of amount for the day/type/category';
+COMMENT ON COLUMN transaction_daily_rollup.tx_count IS 'Number of transactions for the day/type/category';
+
+-- Rollup maintenance: transition tables let a bulk import update the rollup in one statement
+CREATE OR REPLACE FUNCTION apply_transaction_daily_rollup()
+RETURNS TRIGGER 
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        WITH removed AS (
+            SELECT user_id, date::date AS day, transaction_type, category,
+                   SUM(amount) AS total, COUNT(*) AS tx_count
+            FROM old_rows
+            GROUP BY 1, 2, 3, 4
+        )
+        UPDATE transaction_daily_rollup r
+        SET total = r.total - removed.total,
+            tx_count = r.tx_count - removed.tx_count
+        FROM removed
+        WHERE r.user_id = removed.user_id
+        AND r.day = removed.day
+        AND r.transaction_type = removed.transaction_type
+        AND r.category = removed.category;
+        
+        DELETE FROM transaction_daily_rollup
+        WHERE user_id IN (SELECT DISTINCT user_id FROM old_rows)
+        AND tx_count <= 0;
+    END IF;
+    
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO transaction_daily_rollup (user_id, day, transaction_type, category, total, tx_count)
+        SELECT user_id, date::date, transaction_type, category, SUM(amount), COUNT(*)
+        FROM new_rows
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (user_id, day, transaction_type, category) DO UPDATE SET
+            total = transaction_daily_rollup.total + EXCLUDED.total,
+            tx_count = transaction_daily_rollup.tx_count + EXCLUDED.tx_count;
+    END IF;
+    
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS transactions_rollup_insert ON transactions;
+DROP TRIGGER IF EXISTS transactions_rollup_update ON transactions;
+DROP TRIGGER IF EXISTS transactions_rollup_delete ON transactions;
+
+CREATE TRIGGER transactions_rollup_insert
+    AFTER INSERT ON transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_transaction_daily_rollup();
+
+CREATE TRIGGER transactions_rollup_update
+    AFTER UPDATE ON transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_transaction_daily_rollup();
+
+CREATE TRIGGER transactions_rollup_delete
+    AFTER DELETE ON transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_transaction_daily_rollup();
+
+-- Seed the rollup from existing rows. CREATE TRIGGER holds a lock that blocks writes to
+-- transactions until this migration commits, so no row is counted twice or missed.
+-- Skipped when the rollup already has data (databases set up before the migration runner).
+INSERT INTO transaction_daily_rollup (user_id, day, transaction_type, category, total, tx_count)
+SELECT user_id, date::date, transaction_type, category, SUM(amount), COUNT(*)
+FROM transactions
+WHERE NOT EXISTS (SELECT 1 FROM transaction_daily_rollup)
+GROUP BY 1, 2, 3, 4;
+
+-- Read-only for users, written by triggers
+ALTER TABLE transaction_daily_rollup ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own rollup" ON transaction_daily_rollup;
+
+CREATE POLICY "Users can view own rollup" ON transaction_daily_rollup
+    FOR SELECT USING ((SELECT auth.uid()) = user_id);
+
+GRANT SELECT ON TABLE transaction_daily_rollup TO authenticated;
+GRANT SELECT ON TABLE transaction_daily_rollup TO anon;
+GRANT EXECUTE ON FUNCTION apply_transaction_daily_rollup() TO authenticated;
+GRANT EXECUTE ON FUNCTION apply_transaction_daily_rollup() TO anon;
@@ -0,0 +1,8 @@
+-- migrate:no-transaction
+-- list_transactions pages with ORDER BY date DESC, id DESC and a (date, id) < cursor
+-- predicate; adding id to the key lets that be a single backward index range scan
+-- instead of a sort over every row sharing the boundary date. The new index still
+-- serves the summary queries (index-only on its INCLUDE columns), so it replaces
+-- idx_transactions_user_date_covering.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_date_id ON transactions(user_id, date, id) INCLUDE (transaction_type, amount, category);
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_user_date_covering;
@@ -0,0 +1,222 @@
+"""
+Versioned schema migrations.
+
+Migrations are SQL files in tools/migrations named NNNN_description.sql and applied in
+version order. Each applied migration is recorded in schema_migrations with a checksum
+of its file, so an edited migration is caught instead of silently diverging.
+
+A migration runs inside a single transaction unless its first line is
+`-- migrate:no-transaction`, which is required for CREATE/DROP INDEX CONCURRENTLY.
+Those migrations run one statement at a time and must be idempotent (IF NOT EXISTS),
+since a failure part-way cannot be rolled back.
+"""
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+NO_TRANSACTION_DIRECTIVE = "-- migrate:no-transaction"
+MIGRATION_FILENAME = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+# pg_advisory_lock key so two deploys never migrate at the same time
+MIGRATION_LOCK_KEY = 815_204_117
+
+
+class MigrationError(Exception):
+    """Raised when migrations on disk and in the database disagree, or one fails"""
+
+
+@dataclass
+class Migration:
+    """A single SQL migration file"""
+    version: int
+    name: str
+    sql: str
+    checksum: str
+    transactional: bool = True
+
+    @property
+    def label(self) -> str:
+        return f"{self.version:04d}_{self.name}"
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """Read all migration files from a directory, ordered by version"""
+    migrations: Dict[int, Migration] = {}
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_FILENAME.match(filename)
+        if not match:
+            continue
+
+        with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+            sql = f.read().replace("\r\n", "\n")
+
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Duplicate migration version {version}: {filename}")
+
+        migrations[version] = Migration(
+            version=version,
+            name=match.group(2),
+            sql=sql,
+            checksum=hashlib.sha256(sql.encode("utf-8")).hexdigest(),
+            transactional=not sql.lstrip().startswith(NO_TRANSACTION_DIRECTIVE),
+        )
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split a migration into individual statements on line-ending semicolons.
+    Semicolons inside $$-quoted function bodies are left alone.
+    """
+    statements = []
+    current: List[str] = []
+    in_dollar_quote = False
+    for line in sql.split("\n"):
+        stripped = line.strip()
+        if not current and (not stripped or stripped.startswith("--")):
+            continue
+        current.append(line)
+        if line.count("$$") % 2 == 1:
+            in_dollar_quote = not in_dollar_quote
+        if not in_dollar_quote and stripped.endswith(";"):
+            statements.append("\n".join(current).strip())
+            current = []
+    if current and "\n".join(current).strip():
+        statements.append("\n".join(current).strip())
+    return statements
+
+
+class MigrationRunner:
+    """Applies pending migrations and records them in schema_migrations"""
+
+    def __init__(self, pool, migrations_dir: str = MIGRATIONS_DIR):
+        self.pool = pool
+        self.migrations_dir = migrations_dir
+
+    async def _ensure_tracking_table(self, conn):
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                checksum TEXT NOT NULL,
+                applied_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+                execution_ms INTEGER NOT NULL
+            );
+        """)
+
+    async def _applied(self, conn) -> Dict[int, Any]:
+        """Applied migrations by version; empty if the tracking table doesn't exist yet"""
+        exists = await conn.fetchval("SELECT to_regclass('schema_migrations') IS NOT NULL")
+        if not exists:
+            return {}
+        rows = await conn.fetch("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+        return {row["version"]: row for row in rows}
+
+    def _verify_checksums(self, migrations: List[Migration], applied: Dict[int, Any]):
+        """Refuse to run if an applied migration's file was edited or deleted"""
+        on_disk = {migration.version: migration for migration in migrations}
+        for version, row in applied.items():
+            migration = on_disk.get(version)
+            if migration is None:
+                raise MigrationError(f"Migration {version:04d}_{row['name']} is applied but missing from {self.migrations_dir}")
+            if migration.checksum != row["checksum"]:
+                raise MigrationError(
+                    f"Checksum mismatch for {migration.label}: the file changed after it was applied. "
+                    f"Add a new migration instead of editing an applied one."
+                )
+
+    async def status(self) -> List[Dict[str, Any]]:
+        """Every known migration with whether (and when) it was applied"""
+        migrations = load_migrations(self.migrations_dir)
+        async with self.pool.acquire() as conn:
+            applied = await self._applied(conn)
+
+        result = []
+        for migration in migrations:
+            row = applied.get(migration.version)
+            result.append({
+                "version": migration.version,
+                "name": migration.name,
+                "applied_at": row["applied_at"] if row else None,
+                "checksum_ok": row is None or row["checksum"] == migration.checksum,
+                "transactional": migration.transactional,
+            })
+        return result
+
+    async def migrate(self, dry_run: bool = False, target: Optional[int] = None) -> List[Migration]:
+        """
+        Apply pending migrations up to `target` (all by default).
+        With dry_run, print the SQL that would run and change nothing.
+        Returns the migrations that were (or would be) applied.
+        """
+        migrations = load_migrations(self.migrations_dir)
+
+        async with self.pool.acquire() as conn:
+            if dry_run:
+                applied = await self._applied(conn)
+            else:
+                await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_KEY)
+
+            try:
+                if not dry_run:
+                    await self._ensure_tracking_table(conn)
+                    applied = await self._applied(conn)
+
+                self._verify_checksums(migrations, applied)
+                pending = [
+                    m for m in migrations
+                    if m.version not in applied and (target is None or m.version <= target)
+                ]
+
+                if not pending:
+                    print("✅ Schema is up to date")
+                    return []
+
+                for migration in pending:
+                    if dry_run:
+                        mode = "transaction" if migration.transactional else "no transaction"
+                        print(f"-- ==== {migration.label} ({mode}) ====")
+                        print(migration.sql.strip())
+                        print()
+                    else:
+                        await self._apply(conn, migration)
+                return pending
+            finally:
+                if not dry_run:
+                    await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_KEY)
+
+    async def _apply(self, conn, migration: Migration):
+        """Run one migration and record it"""
+        print(f"📊 Applying {migration.label}...")
+        started = time.perf_counter()
+        try:
+            if migration.transactional:
+                async with conn.transaction():
+                    await conn.execute(migration.sql)
+                    await self._record(conn, migration, started)
+            else:
+                # CONCURRENTLY can't run in a transaction block, nor in a multi-statement string
+                for statement in split_statements(migration.sql):
+                    await conn.execute(statement)
+                await self._record(conn, migration, started)
+        except Exception as e:
+            if not migration.transactional:
+                print(
+                    f"⚠️  {migration.label} ran without a transaction and may be partially applied. "
+                    f"Drop any INVALID index it left (pg_index.indisvalid = false) before retrying."
+                )
+            raise MigrationError(f"Migration {migration.label} failed: {e}") from e
+
+        print(f"✅ Applied {migration.label} in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    async def _record(self, conn, migration: Migration, started: float):
+        await conn.execute("""
+            INSERT INTO schema_migrations (version, name, checksum, execution_ms)
+            VALUES ($1, $2, $3, $4)
+        """, migration.version, migration.name, migration.checksum,
+            int((time.perf_counter() - started) * 1000))
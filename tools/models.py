@@ -4,6 +4,10 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from decimal import Decimal
 from enum import Enum
+import base64
+import hashlib
+import re
+import unicodedata
 
 class ReminderType(Enum):
     """Reminder type enumeration"""
@@ -32,9 +36,9 @@ class TransactionType(Enum):
     EXPENSE = "expense"
     INCOME = "income"
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
-    """Transaction model - handles both expenses and income"""
+    """Transaction model - handles both expenses and income (slotted: one instance per fetched row)"""
     user_id: str  # Supabase auth.users.id (UUID)
     amount: Decimal
     description: str
@@ -55,6 +59,8 @@ class Transaction:
     recurring_pattern: Optional[str] = None
     tags: List[str] = field(default_factory=list)
     confidence_score: Optional[float] = None  # For ML-parsed transactions
+    import_batch_id: Optional[str] = None  # Set for rows saved by a bulk import
+    fingerprint: Optional[str] = None  # Dedupe key for imported rows, see transaction_fingerprint()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for easy serialization"""
@@ -75,6 +81,8 @@ class Transaction:
             'recurring_pattern': self.recurring_pattern,
             'tags': self.tags,
             'confidence_score': self.confidence_score,
+            'import_batch_id': self.import_batch_id,
+            'fingerprint': self.fingerprint,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -87,9 +95,9 @@ class Transaction:
         """Check if this is income"""
         return self.transaction_type == TransactionType.INCOME.value
 
-@dataclass
+@dataclass(slots=True)
 class Reminder:
-    """Reminder model - updated for Supabase"""
+    """Reminder model - updated for Supabase (slotted: one instance per fetched row)"""
     user_id: str  # Supabase auth.users.id (UUID)
     title: str
     description: str
@@ -192,7 +200,64 @@ class TransactionSummary:
             "expense_categories": self.expense_categories
         }
 
-@dataclass 
+@dataclass
+class ImportResult:
+    """Outcome of a bulk transaction import"""
+    import_batch_id: str
+    ids: List[int] = field(default_factory=list)
+    inserted_count: int = 0
+    skipped_count: int = 0  # Rows already present (same fingerprint)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "import_batch_id": self.import_batch_id,
+            "ids": self.ids,
+            "inserted_count": self.inserted_count,
+            "skipped_count": self.skipped_count
+        }
+
+@dataclass
+class TransactionPage:
+    """One page of a keyset-paginated transaction listing"""
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    next_cursor: Optional[str] = None  # None on the last page
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "next_cursor": self.next_cursor,
+            "has_more": self.next_cursor is not None
+        }
+
+@dataclass
+class FinancialReport:
+    """Multi-period analytics over a user's transactions (see tools/analytics.py)"""
+    user_id: str
+    period_days: int
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    totals: Dict[str, Any] = field(default_factory=dict)
+    daily: List[Dict[str, Any]] = field(default_factory=list)  # expenses/income plus moving averages
+    weekly: List[Dict[str, Any]] = field(default_factory=list)
+    monthly: List[Dict[str, Any]] = field(default_factory=list)  # with month-over-month deltas
+    category_trends: List[Dict[str, Any]] = field(default_factory=list)
+    expense_percentiles: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "period_days": self.period_days,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "totals": self.totals,
+            "daily": self.daily,
+            "weekly": self.weekly,
+            "monthly": self.monthly,
+            "category_trends": self.category_trends,
+            "expense_percentiles": self.expense_percentiles
+        }
+
+@dataclass
 class ReminderSummary:
     """Summary of user reminders"""
     total_count: int
@@ -421,4 +486,37 @@ def get_all_categories(transaction_type: str) -> List[str]:
     """Get list of all available categories for a transaction type"""
     if transaction_type in TRANSACTION_CATEGORIES:
         return list(TRANSACTION_CATEGORIES[transaction_type].keys())
-    return ["Other"]
\ No newline at end of file
+    return ["Other"]
+
+def normalize_description(description: str) -> str:
+    """Lowercase, strip accents/punctuation and collapse whitespace for duplicate matching"""
+    text = unicodedata.normalize("NFKD", description or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+def transaction_fingerprint(user_id: str, date: Optional[datetime], amount: Any,
+                            description: str, occurrence: int = 0) -> str:
+    """
+    Stable dedupe key for (user, day, amount, normalized description).
+    `occurrence` separates genuinely repeated rows inside one import (two identical
+    coffees on the same day) so a re-import maps each of them onto itself.
+    """
+    day = (date or datetime.now()).date().isoformat()
+    key = f"{user_id}|{day}|{Decimal(str(amount)).quantize(Decimal('0.01'))}|{normalize_description(description)}|{occurrence}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def encode_transaction_cursor(date: datetime, transaction_id: int) -> str:
+    """Opaque cursor pointing just past the (date, id) of the last row on a page"""
+    raw = f"{date.isoformat()}|{transaction_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_transaction_cursor(cursor: str) -> tuple:
+    """Inverse of encode_transaction_cursor; raises ValueError on a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        date_part, id_part = raw.split("|")
+        return datetime.fromisoformat(date_part), int(id_part)
+    except Exception:
+        raise ValueError("Invalid cursor")
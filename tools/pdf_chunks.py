@@ -0,0 +1,74 @@
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # pypdf missing: statements are sent as a single chunk
+    PdfReader = PdfWriter = None
+
+
+PageRange = Tuple[int, Optional[int]]
+
+
+def split_pdf_pages(pdf_path: str, pages_per_chunk: int = 2) -> Tuple[List[str], List[PageRange], bool]:
+    """
+    Split a PDF into chunk files of `pages_per_chunk` pages each.
+    Returns (chunk_paths, page_ranges, created) - page_ranges holds each chunk's 1-based
+    (first, last) page, last being None when the page count is unknown. When created is
+    False the original file is the only chunk and must not be deleted by the caller.
+    """
+    if PdfReader is None:
+        return [pdf_path], [(1, None)], False
+
+    reader = PdfReader(pdf_path)
+    page_count = len(reader.pages)
+    if page_count <= pages_per_chunk:
+        return [pdf_path], [(1, page_count)], False
+
+    chunk_paths = []
+    page_ranges = []
+    try:
+        for start in range(0, page_count, pages_per_chunk):
+            end = min(start + pages_per_chunk, page_count)
+            writer = PdfWriter()
+            for page_index in range(start, end):
+                writer.add_page(reader.pages[page_index])
+            with tempfile.NamedTemporaryFile(delete=False, suffix=f"_p{start + 1}.pdf") as chunk_file:
+                writer.write(chunk_file)
+                chunk_paths.append(chunk_file.name)
+            page_ranges.append((start + 1, end))
+    except Exception:
+        remove_chunks(chunk_paths)
+        raise
+    return chunk_paths, page_ranges, True
+
+
+def format_page_ranges(page_ranges: List[PageRange]) -> str:
+    """"3-4, 7" for the given chunks, merging adjacent ranges"""
+    merged: List[List[int]] = []
+    for first, last in sorted(page_ranges):
+        last = last or first
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return ", ".join(str(first) if first == last else f"{first}-{last}" for first, last in merged)
+
+
+def remove_chunks(chunk_paths: List[str]) -> None:
+    """Delete temporary chunk files"""
+    for path in chunk_paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def merge_chunk_transactions(chunk_results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Merge per-chunk extractions in page order. Chunks cover disjoint pages, so nothing is
+    dropped here: identical rows are separate transactions, and re-imported rows are
+    caught by the fingerprint index when the batch is saved.
+    """
+    return [transaction for transactions in chunk_results for transaction in transactions]
@@ -1,6 +1,9 @@
 import asyncio
 from typing import Dict, Optional, Any
 from datetime import datetime, timedelta
+from .log import get_logger
+
+logger = get_logger(__name__)
 
 class SessionManager:
     """In-memory session manager for user authentication"""
@@ -8,9 +11,22 @@ class SessionManager:
     def __init__(self, session_timeout_minutes: int = 30):
         self.sessions: Dict[str, Dict[str, Any]] = {}
         self.session_timeout = timedelta(minutes=session_timeout_minutes)
-        
-        # Start cleanup task
-        asyncio.create_task(self._cleanup_expired_sessions())
+        self._cleanup_task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start the periodic cleanup task (needs a running event loop)"""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_expired_sessions())
+    
+    async def stop(self) -> None:
+        """Cancel the cleanup task"""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
     
     def create_session(self, telegram_id: str, user_data: Dict[str, Any]) -> None:
         """Create or update user session"""
@@ -58,10 +74,10 @@ class SessionManager:
                     self.sessions.pop(telegram_id, None)
                 
                 if expired_sessions:
-                    print(f"🧹 Cleaned up {len(expired_sessions)} expired sessions")
+                    logger.info("Expired sessions cleaned up", count=len(expired_sessions))
                 
                 # Run cleanup every 5 minutes
                 await asyncio.sleep(300)
-            except Exception as e:
-                print(f"❌ Error in session cleanup: {e}")
+            except Exception:
+                logger.exception("Error in session cleanup")
                 await asyncio.sleep(300)
\ No newline at end of file
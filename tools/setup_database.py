@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Simple script to connect to the database and create all tables
+Simple script to connect to the database and apply schema migrations
 Run this script to set up your database schema with freemium credits support
 """
 import asyncio
@@ -13,9 +13,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Now import with absolute path
 from tools.database import Database
+from tools.migrator import MigrationError, MigrationRunner
 
-async def setup_database():
-    """Set up the database by creating all tables"""
+async def setup_database(dry_run: bool = False):
+    """Set up the database by applying all pending migrations"""
     try:
         # Load environment variables
         load_dotenv()
@@ -33,20 +34,56 @@ async def setup_database():
         db = Database(database_url)
         await db.connect()
         
-        print("📊 Creating tables and functions...")
+        if dry_run:
+            print("📝 Dry run - pending migration SQL:\n")
+        else:
+            print("📊 Applying migrations...")
         
-        # Create all tables, triggers, and functions
-        await db._create_tables()
+        try:
+            await db.migrate(dry_run=dry_run)
+        finally:
+            # Close connection
+            await db.close()
         
-        print("Tables created")
+        return True
         
-        # Close connection
+    except MigrationError as e:
+        print(f"❌ {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Error setting up database: {e}")
+        return False
+
+async def migration_status():
+    """List migrations and whether they have been applied"""
+    try:
+        load_dotenv()
+        
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            print("❌ DATABASE_URL environment variable not found!")
+            return False
+        
+        db = Database(database_url)
+        await db.connect()
+        
+        migrations = await MigrationRunner(db.pool).status()
         await db.close()
         
-        return True
+        all_ok = True
+        for migration in migrations:
+            label = f"{migration['version']:04d}_{migration['name']}"
+            if not migration["checksum_ok"]:
+                all_ok = False
+                print(f"  ❌ {label} - file changed after it was applied")
+            elif migration["applied_at"]:
+                print(f"  ✅ {label} - applied {migration['applied_at']:%Y-%m-%d %H:%M}")
+            else:
+                print(f"  ⏳ {label} - pending")
+        return all_ok
         
     except Exception as e:
-        print(f"❌ Error setting up database: {e}")
+        print(f"❌ Error reading migration status: {e}")
         return False
 
 async def test_connection():
@@ -135,10 +172,12 @@ async def reset_database():
             await conn.execute("DROP TRIGGER IF EXISTS payment_success_trigger ON payments;")
             
             # Drop all tables
+            await conn.execute("DROP TABLE IF EXISTS transaction_daily_rollup CASCADE;")
             await conn.execute("DROP TABLE IF EXISTS transactions CASCADE;")
             await conn.execute("DROP TABLE IF EXISTS reminders CASCADE;")
             await conn.execute("DROP TABLE IF EXISTS payments CASCADE;")
             await conn.execute("DROP TABLE IF EXISTS user_settings CASCADE;")
+            await conn.execute("DROP TABLE IF EXISTS schema_migrations;")
             
             # Drop all functions
             await conn.execute("DROP FUNCTION IF EXISTS update_updated_at_column() CASCADE;")
@@ -146,11 +185,12 @@ async def reset_database():
             await conn.execute("DROP FUNCTION IF EXISTS check_expired_premium() CASCADE;")
             await conn.execute("DROP FUNCTION IF EXISTS reset_monthly_credits() CASCADE;")
             await conn.execute("DROP FUNCTION IF EXISTS consume_freemium_credits(UUID, TEXT, INTEGER, JSONB) CASCADE;")
+            await conn.execute("DROP FUNCTION IF EXISTS apply_transaction_daily_rollup() CASCADE;")
         
-        print("📊 Creating new tables...")
+        print("📊 Applying migrations...")
         
-        # Create all tables, triggers, and functions
-        await db._create_tables()
+        # Recreate the schema from the first migration
+        await db.migrate()
         
         print("✅ Database reset completed successfully!")
         
@@ -163,19 +203,86 @@ async def reset_database():
         print(f"❌ Error resetting database: {e}")
         return False
 
+async def backfill_rollup(user_id: str = None):
+    """Rebuild the transaction daily rollup from the transactions table"""
+    try:
+        load_dotenv()
+        
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            print("❌ DATABASE_URL environment variable not found!")
+            return False
+        
+        db = Database(database_url)
+        await db.connect()
+        
+        scope = f"user {user_id}" if user_id else "all users"
+        print(f"📊 Backfilling transaction_daily_rollup for {scope}...")
+        rows_written = await db.backfill_transaction_rollup(user_id)
+        print(f"✅ Rollup rebuilt: {rows_written} rows written")
+        
+        await db.close()
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error backfilling rollup: {e}")
+        return False
+
+async def check_rollup(user_id: str = None):
+    """Verify the transaction daily rollup matches the transactions table"""
+    try:
+        load_dotenv()
+        
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            print("❌ DATABASE_URL environment variable not found!")
+            return False
+        
+        db = Database(database_url)
+        await db.connect()
+        
+        print("🔍 Checking transaction_daily_rollup consistency...")
+        mismatches = await db.check_transaction_rollup(user_id)
+        
+        await db.close()
+        
+        if not mismatches:
+            print("✅ Rollup is consistent with transactions")
+            return True
+        
+        print(f"❌ Found {len(mismatches)} mismatching rollup groups:")
+        for mismatch in mismatches[:50]:
+            print(
+                f"  {mismatch['user_id']} {mismatch['day']} {mismatch['transaction_type']}/{mismatch['category']}: "
+                f"actual={mismatch['actual_total']} ({mismatch['actual_count']}) "
+                f"rollup={mismatch['rollup_total']} ({mismatch['rollup_count']})"
+            )
+        print("Run 'python setup_database.py backfill-rollup' to rebuild it.")
+        return False
+        
+    except Exception as e:
+        print(f"❌ Error checking rollup: {e}")
+        return False
+
 def print_help():
     """Print help information"""
     print("\n🔧 Database Setup Script")
     print("=" * 50)
     print("Available commands:")
-    print("  setup    - Create all tables and functions")
+    print("  setup    - Apply pending migrations (creates all tables and functions)")
+    print("  migrate [--dry-run]       - Same as setup; --dry-run prints the SQL instead")
+    print("  migrations               - Show applied and pending migrations")
     print("  test     - Test database connection")
     print("  reset    - Reset database (WARNING: deletes all data)")
+    print("  backfill-rollup [user_id] - Rebuild the transaction daily rollup")
+    print("  check-rollup [user_id]    - Verify the rollup matches transactions")
     print("  help     - Show this help message")
     print("\nExamples:")
     print("  python setup_database.py setup")
+    print("  python setup_database.py migrate --dry-run")
     print("  python setup_database.py test")
     print("  python setup_database.py reset")
+    print("  python setup_database.py check-rollup")
     print("\nMake sure to set DATABASE_URL in your .env file first!")
 
 async def main():
@@ -188,8 +295,12 @@ async def main():
     
     command = sys.argv[1].lower()
     
-    if command == "setup":
-        success = await setup_database()
+    if command in ["setup", "migrate"]:
+        success = await setup_database(dry_run="--dry-run" in sys.argv[2:])
+        exit(0 if success else 1)
+    
+    elif command == "migrations":
+        success = await migration_status()
         exit(0 if success else 1)
     
     elif command == "test":
@@ -200,6 +311,14 @@ async def main():
         success = await reset_database()
         exit(0 if success else 1)
     
+    elif command == "backfill-rollup":
+        success = await backfill_rollup(sys.argv[2] if len(sys.argv) > 2 else None)
+        exit(0 if success else 1)
+    
+    elif command == "check-rollup":
+        success = await check_rollup(sys.argv[2] if len(sys.argv) > 2 else None)
+        exit(0 if success else 1)
+    
     elif command in ["help", "-h", "--help"]:
         print_help()
     
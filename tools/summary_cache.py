@@ -0,0 +1,71 @@
+from itertools import count
+from typing import Any, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+
+from .metrics import CACHE_REQUESTS
+
+
+class SummaryCache:
+    """
+    Transaction summaries keyed by (user, days), invalidated by a per-user data version.
+    Every write to a user's transactions bumps their version, so entries computed before
+    the write can never be served again. The TTL bounds how far the rolling "last N days"
+    window drifts, and how stale an entry can get if another instance did the write.
+
+    Versions come from one process-wide counter and live in a cache bounded like the
+    entries. A user whose version was evicted gets a fresh, never-used number, so their
+    older entries just stop being reachable.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl_seconds: int = 300):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self._versions: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self._next_version = count(1)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def version(self, user_id: str) -> int:
+        """Current data version for a user; read it before running the query"""
+        version = self._versions.get(user_id)
+        if version is None:
+            version = self._versions[user_id] = next(self._next_version)
+        return version
+
+    def bump(self, user_id: str) -> None:
+        """Record a write to the user's transactions"""
+        self._versions[user_id] = next(self._next_version)
+        self.invalidations += 1
+
+    def _key(self, user_id: str, days: int, version: int) -> Tuple[str, int, int]:
+        return (user_id, days, version)
+
+    def get(self, user_id: str, days: int) -> Optional[Any]:
+        """Summary for the user's current data version, if cached"""
+        result = self._cache.get(self._key(user_id, days, self.version(user_id)))
+        if result is None:
+            self.misses += 1
+            CACHE_REQUESTS.inc(cache="summary", result="miss")
+        else:
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache="summary", result="hit")
+        return result
+
+    def set(self, user_id: str, days: int, version: int, summary: Any) -> None:
+        """
+        Store a summary computed at `version`. If a write landed while it was computed,
+        the key is already outdated and the entry is simply never hit.
+        """
+        self._cache[self._key(user_id, days, version)] = summary
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache size, hit/miss counters and hit ratio"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
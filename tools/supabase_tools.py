@@ -6,8 +6,10 @@ import os
 from supabase import create_client, Client
 from supabase.lib.client_options import ClientOptions
 from gotrue.errors import AuthApiError
-import json
 import stripe
+from .log import get_logger
+
+logger = get_logger(__name__)
 
 class SupabaseClient:
     """Supabase client for direct database operations"""
@@ -18,6 +20,9 @@ class SupabaseClient:
         self.supabase: Client = create_client(supabase_url, supabase_key)
 
         stripe.api_key = os.getenv("STRIPE_API_KEY")
+        # Local Stripe stand-in for load tests (benchmarks/loadtest)
+        if os.getenv("STRIPE_API_BASE"):
+            stripe.api_base = os.getenv("STRIPE_API_BASE")
 
         # Get database URL from environment
         database_url = os.getenv('DATABASE_URL')
@@ -32,14 +37,14 @@ class SupabaseClient:
         if not self.connected:
             await self.database.connect()
             self.connected = True
-            print("✅ Database connected successfully")
+            logger.info("Database connected")
     
     async def disconnect(self):
         """Disconnect from the database"""
         if self.connected:
             await self.database.close()
             self.connected = False
-            print("✅ Database disconnected")
+            logger.info("Database disconnected")
 
     async def ensure_user_exists(self, telegram_id: str, user_data: dict):
         """
@@ -127,8 +132,8 @@ class SupabaseClient:
                             "payment_id": payment_id,
                             "paypal_url": paypal_url
                         }
-        except Exception as e:
-            print(f"❌ Error ensuring user exists: {e}")
+        except Exception:
+            logger.exception("Error ensuring user exists")
             return {"success": False, "message": "❌ Internal error. Please try again later."}
 
     #adjust this function to also get the user name and insert it into the database
@@ -137,7 +142,7 @@ class SupabaseClient:
         try:
             if not self.connected:
                 await self.connect()
-            print(f"Linking Telegram {telegram_id} to Supabase {supabase_user_id}")
+            logger.info("Linking Telegram user", telegram_id=telegram_id, supabase_user_id=supabase_user_id)
 
             async with self.database.pool.acquire() as conn:
                 await conn.execute("""
@@ -149,8 +154,8 @@ class SupabaseClient:
                         updated_at = NOW()
                 """, supabase_user_id, telegram_id)
             return {"success": True, "message": f"✅ Linked Telegram user {telegram_id} to Supabase user {supabase_user_id}"}
-        except Exception as e:
-            print(f"❌ Error linking Telegram user: {e}")
+        except Exception:
+            logger.exception("Error linking Telegram user")
             raise
     
     async def get_user_by_telegram_id(self, telegram_id: str) -> str:
@@ -166,8 +171,8 @@ class SupabaseClient:
                 
                 return str(result['user_id']) if result else None
                 
-        except Exception as e:
-            print(f"❌ Error getting user by telegram ID: {e}")
+        except Exception:
+            logger.exception("Error getting user by telegram ID")
             return None
     
     async def check_premium_status(self, user_id: str) -> bool:
@@ -195,8 +200,8 @@ class SupabaseClient:
                 
                 return False
                 
-        except Exception as e:
-            print(f"❌ Error checking premium status: {e}")
+        except Exception:
+            logger.exception("Error checking premium status")
             return False
 
     # Payment-related methods
@@ -214,7 +219,7 @@ class SupabaseClient:
         
         # Update payment status
         await self.database.update_payment_status(payment_id, "success", transaction_id, subscription_id, amount, currency)
-        print(f"✅ Payment {payment_id} processed successfully")
+        logger.info("Payment processed", payment_id=payment_id)
 
     async def update_user_premium_status(self, telegram_id: str, is_premium: bool, premium_days: int = 30, extend: bool = False):
         """Update user's premium status"""
@@ -230,7 +235,7 @@ class SupabaseClient:
                         SET premium_until = COALESCE(premium_until, NOW()) + INTERVAL '%s days', updated_at = NOW()
                         WHERE telegram_id = $1 AND is_premium = TRUE
                     """, premium_days, telegram_id)
-                    print(f"✅ Extended premium for user {telegram_id} by {premium_days} days")
+                    logger.info("Premium extended", telegram_id=telegram_id, premium_days=premium_days)
                 else:
                     # Set new premium_until to now + premium_days (for initial subscriptions)
                     new_premium_until = datetime.now() + timedelta(days=premium_days)
@@ -239,7 +244,7 @@ class SupabaseClient:
                         SET is_premium = TRUE, premium_until = $1, updated_at = NOW()
                         WHERE telegram_id = $2
                     """, new_premium_until, telegram_id)
-                    print(f"✅ Set premium for user {telegram_id} until {new_premium_until}")
+                    logger.info("Premium set", telegram_id=telegram_id, premium_until=new_premium_until)
             else:
                 # Revoke premium
                 await conn.execute("""
@@ -247,7 +252,7 @@ class SupabaseClient:
                     SET is_premium = FALSE, premium_until = NULL, updated_at = NOW()
                     WHERE telegram_id = $1
                 """, telegram_id)
-                print(f"✅ Premium revoked for user {telegram_id}")
+                logger.info("Premium revoked", telegram_id=telegram_id)
 
     async def process_payment_failure(self, payment_id: str, reason: str = "failed"):
         """Process failed payment"""
@@ -255,7 +260,7 @@ class SupabaseClient:
             await self.connect()
         
         await self.database.update_payment_status(payment_id, reason)
-        print(f"❌ Payment {payment_id} failed: {reason}")
+        logger.warning("Payment failed", payment_id=payment_id, reason=reason)
 
     async def get_user_payment_history(self, user_id: str) -> List[Dict[str, Any]]:
         """Get user payment history"""
@@ -285,7 +290,6 @@ class SupabaseClient:
             # 2. Create a Stripe Checkout Session
             price_id = os.getenv("STRIPE_PRICE_ID")
             bot_username = os.getenv("TELEGRAM_BOT_USERNAME", "")
-            #print("bot_username", bot_username)
             success_url = f"https://t.me/{bot_username}?start=payment_success"
             cancel_url = f"https://t.me/{bot_username}?start=payment_cancelled"
 
@@ -305,7 +309,7 @@ class SupabaseClient:
                 "stripe_url": checkout_session.url # Return the Stripe URL
             }
         except Exception as e:
-            print(f"❌ Error creating Stripe upgrade link: {e}")
+            logger.exception("Error creating Stripe upgrade link")
             return {"success": False, "message": str(e)}
 
 
@@ -334,7 +338,6 @@ class SupabaseClient:
                 "currency": event_data.get('currency',None),
                 "metadata": event_data.get('metadata', {})
             }
-            #print("Stripe webhook event info:", event_info)
             # Debug print
         except ValueError as e:
             result["message"] = f"❌ Invalid webhook payload: {e}"
@@ -362,7 +365,6 @@ class SupabaseClient:
             if not payment_id :
                 result["message"] = "❌ Webhook received without a client_reference_id (payment_id)."
                 return result
-            #print(f"✅ checkout.session.completed for payment_id: {payment_id}")
             # Update our database
             await self.process_payment_success(payment_id, customer_id, subscription_id,amount_paid, currency) #update the paymment record data
             await self.update_user_premium_status(telegram_id, True, premium_days=30) # update user premium status and premium_until
@@ -383,22 +385,22 @@ class SupabaseClient:
         elif event['type'] == 'invoice.paid':
             if customer_id and telegram_id:
                 if subscription_id:
-                    print(f"✅ Subscription renewal for customer {customer_id}")
+                    logger.info("Subscription renewal", customer_id=customer_id, subscription_id=subscription_id)
                     # Extract and log amount/currency
                     amount_paid = event_data.get('amount_paid')
                     currency = event_data.get('currency')
                     if amount_paid and currency:
                         amount_readable = amount_paid / 100  # Convert cents to dollars
-                        print(f"💰 Renewal amount: {amount_readable} {currency.upper()}")
+                        logger.info("Renewal amount", amount=amount_readable, currency=currency.upper())
                     # Extend premium instead of resetting
                     await self.update_user_premium_status(telegram_id, True, premium_days=30, extend=True)
                     result["success"] = True
                     result["message"] = "🎉 Subscription renewed successfully!"
                 else:
-                    print(f"ℹ️ Invoice paid for customer {customer_id} - acknowledging")
+                    logger.info("Invoice paid without subscription, acknowledging", customer_id=customer_id)
                     result["success"] = True
             else:
-                print(f"⚠️ Invoice paid but no customer/telegram_id - acknowledging")
+                logger.warning("Invoice paid without customer or telegram_id, acknowledging")
                 result["success"] = True        
         #user canceled subscription event
        
@@ -409,7 +411,7 @@ class SupabaseClient:
                 result["message"] = "⚠️ Your subscription has been canceled and will end at the current billing period."
             else:
                 # Not a cancellation, acknowledge as non-critical
-                print(f"ℹ️ Received non-critical subscription update: {event['type']} - acknowledging without action")
+                logger.info("Non-critical subscription update acknowledged", event_type=event['type'])
                 result["success"] = True
                 result["message"] = None
         
@@ -444,7 +446,7 @@ class SupabaseClient:
             result["message"] = "⚠️ A refund request has been initiated. Check your email for updates."
         else:
             # For non-critical events, acknowledge successfully to avoid retries
-            print(f"ℹ️ Received non-critical event: {event['type']} - acknowledging without action")
+            logger.info("Non-critical event acknowledged", event_type=event['type'])
             result["success"] = True
             result["message"] = None
 
@@ -487,8 +489,8 @@ class SupabaseClient:
                 "success": True,
                 "portal_url": portal_session.url
             }
-        except Exception as e:
-            print(f"❌ Error creating portal link for customer {customer_id}: {e}")
+        except Exception:
+            logger.exception("Error creating portal link", customer_id=customer_id)
             return {
                 "success": False,
                 "message": "Unable to generate portal link. Please try again later."
@@ -556,8 +558,8 @@ class SupabaseClient:
             
             return None
             
-        except Exception as e:
-            print(f"❌ Error getting user by email: {e}")
+        except Exception:
+            logger.exception("Error getting user by email")
             return None
 
     async def link_telegram_to_auth_user(self, auth_user_id: str, telegram_id: str, telegram_data: Dict[str, Any]) -> bool:
@@ -577,8 +579,8 @@ class SupabaseClient:
             
             return True
             
-        except Exception as e:
-            print(f"❌ Error linking Telegram to auth user: {e}")
+        except Exception:
+            logger.exception("Error linking Telegram to auth user")
             return False
 
     async def get_user_by_telegram_id_auth(self, telegram_id: str) -> Optional[Dict[str, Any]]:
@@ -597,11 +599,9 @@ class SupabaseClient:
                 
                 # Get auth user data
                 auth_user_id = str(user_row['user_id'])
-                #print("#####User Row debug:", user_row)  # Debug print
                 try:
                     # Get user from Supabase Auth
                     auth_response = self.supabase.auth.admin.get_user_by_id(auth_user_id)
-                    #print("###Auth response in get_user_by_telegram_id_auth:", auth_response)  # Debug print
                     if auth_response.user:
                         user_data = auth_response.user.user_metadata
                         return {
@@ -618,7 +618,7 @@ class SupabaseClient:
                             'authenticated': True
                         }
                 except Exception as auth_error:
-                    print(f"❌ Error getting auth user: {auth_error}")
+                    logger.error("Error getting auth user", user_id=auth_user_id, error=str(auth_error))
                     # Fallback: return basic data from user_settings
                     return {
                         'user_id': auth_user_id,
@@ -636,8 +636,8 @@ class SupabaseClient:
                 
                 return None
                 
-        except Exception as e:
-            print(f"❌ Error getting user by telegram ID: {e}")
+        except Exception:
+            logger.exception("Error getting user by telegram ID")
             return None
 
     async def create_new_user_settings(self, auth_user_id: str, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -652,8 +652,8 @@ class SupabaseClient:
         try:
            await self.database.save_user_settings(new_user_data)
            return {'success': True, 'user_data': new_user_data}
-        except Exception as e:
-            print(f"❌ Error creating new user settings: {e}")
+        except Exception:
+            logger.exception("Error creating new user settings")
             raise
 
     async def get_telegram_id_by_email(self, email: str) -> Optional[str]:
@@ -677,8 +677,8 @@ class SupabaseClient:
                 
                 return result['telegram_id'] if result else None
                 
-        except Exception as e:
-            print(f"❌ Error getting telegram ID by email: {e}")
+        except Exception:
+            logger.exception("Error getting telegram ID by email")
             return None
 
     # Update ensure_user_exists method to work with auth
@@ -762,8 +762,8 @@ class SupabaseClient:
                     "paypal_url": paypal_url
                 }
                 
-        except Exception as e:
-            print(f"❌ Error ensuring user exists: {e}")
+        except Exception:
+            logger.exception("Error ensuring user exists")
             return {"success": False, "message": "❌ Internal error. Please try again later."}
 
 
@@ -780,8 +780,8 @@ class SupabaseClient:
             else:
                 return False
             
-        except Exception as e:
-            print(f"❌ Error checking user by base ID: {e}")
+        except Exception:
+            logger.exception("Error checking user by base ID")
             return False
 
     async def consume_credits(self, user_id: str, operation_type: str, credits_needed: int, activity_data: dict = None) -> dict:
@@ -789,9 +789,9 @@ class SupabaseClient:
         async with self.database.pool.acquire() as conn:
             result = await conn.fetchrow("""
                 SELECT consume_freemium_credits($1, $2, $3, $4) as result
-            """, user_id, operation_type, credits_needed, json.dumps(activity_data or {}))
+            """, user_id, operation_type, credits_needed, activity_data or {})
             
-            return json.loads(result['result'])
+            return result['result']
     
     async def get_user_credits(self, user_id: str) -> dict:
         """Get user's current credit status"""
@@ -851,6 +851,6 @@ class SupabaseClient:
                 user_data.get("timezone", "UTC") if user_data else "UTC"
                 )
                 
-                print(f"✅ Created user settings for user ID: {user_id}")
+                logger.info("Created user settings", user_id=user_id)
             else:
-                print(f"✅ User {user_id} already exists")
\ No newline at end of file
+                logger.debug("User already exists", user_id=user_id)
\ No newline at end of file
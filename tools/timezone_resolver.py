@@ -0,0 +1,360 @@
+import difflib
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+
+from .locale_data import canonical_timezone, country_for_timezone
+
+# ============================================================================
+# EMBEDDED DATA
+# ============================================================================
+
+# Zone -> place names users type, in English, Spanish and Portuguese (accents are stripped on lookup)
+CITY_TIMEZONES: Dict[str, Tuple[str, ...]] = {
+    # Brazil
+    "America/Sao_Paulo": (
+        "sao paulo", "sampa", "rio de janeiro", "rio", "belo horizonte", "bh", "brasilia", "curitiba",
+        "porto alegre", "florianopolis", "floripa", "goiania", "campinas", "santos", "vitoria",
+        "uberlandia", "londrina", "joinville", "niteroi", "ribeirao preto", "sorocaba",
+        "brazil", "brasil", "horario de brasilia", "hora de brasilia", "brasilia time",
+    ),
+    "America/Bahia": ("salvador", "bahia", "feira de santana"),
+    "America/Fortaleza": ("fortaleza", "natal", "joao pessoa", "teresina", "sao luis", "ceara"),
+    "America/Recife": ("recife", "olinda", "pernambuco"),
+    "America/Maceio": ("maceio", "aracaju", "alagoas", "sergipe"),
+    "America/Belem": ("belem", "macapa"),
+    "America/Manaus": ("manaus", "amazonas", "boa vista", "porto velho"),
+    "America/Cuiaba": ("cuiaba", "mato grosso"),
+    "America/Campo_Grande": ("campo grande", "mato grosso do sul"),
+    "America/Rio_Branco": ("rio branco", "acre"),
+    "America/Noronha": ("fernando de noronha", "noronha"),
+    # Spanish-speaking Americas
+    "America/Argentina/Buenos_Aires": (
+        "buenos aires", "cordoba", "rosario", "mendoza", "la plata", "mar del plata", "argentina",
+    ),
+    "America/Mexico_City": (
+        "mexico city", "ciudad de mexico", "cidade do mexico", "cdmx", "mexico", "guadalajara",
+        "monterrey", "puebla", "queretaro", "leon", "nuevo leon", "merida", "oaxaca",
+    ),
+    "America/Cancun": ("cancun", "playa del carmen", "tulum"),
+    "America/Tijuana": ("tijuana", "mexicali", "ensenada"),
+    "America/Santiago": ("santiago de chile", "santiago", "valparaiso", "concepcion", "chile"),
+    "America/Bogota": ("bogota", "medellin", "cali", "barranquilla", "cartagena", "colombia"),
+    "America/Lima": ("lima", "arequipa", "cusco", "cuzco", "peru"),
+    "America/Caracas": ("caracas", "maracaibo", "valencia venezuela", "venezuela"),
+    "America/Montevideo": ("montevideo", "punta del este", "uruguay"),
+    "America/Asuncion": ("asuncion", "paraguay"),
+    "America/La_Paz": ("la paz", "santa cruz de la sierra", "cochabamba", "bolivia"),
+    "America/Guayaquil": ("quito", "guayaquil", "cuenca", "ecuador"),
+    "America/Panama": ("panama", "ciudad de panama", "cidade do panama"),
+    "America/Costa_Rica": ("san jose costa rica", "costa rica"),
+    "America/Guatemala": ("guatemala", "ciudad de guatemala"),
+    "America/El_Salvador": ("san salvador", "el salvador"),
+    "America/Tegucigalpa": ("tegucigalpa", "honduras"),
+    "America/Managua": ("managua", "nicaragua"),
+    "America/Havana": ("havana", "la habana", "havana cuba", "cuba"),
+    "America/Santo_Domingo": ("santo domingo", "republica dominicana", "dominican republic"),
+    "America/Puerto_Rico": ("san juan", "puerto rico", "porto rico"),
+    # North America
+    "America/New_York": (
+        "new york", "nueva york", "nova york", "nova iorque", "nyc", "boston", "miami", "atlanta",
+        "philadelphia", "filadelfia", "washington", "washington dc", "orlando", "detroit",
+        "florida", "new jersey", "nueva jersey", "nova jersey", "massachusetts", "pennsylvania",
+        "pensilvania", "virginia", "north carolina", "carolina del norte", "carolina do norte",
+        "ohio", "michigan", "eastern time", "hora del este", "horario do leste",
+    ),
+    "America/Chicago": (
+        "chicago", "houston", "dallas", "austin", "san antonio", "new orleans", "nueva orleans",
+        "minneapolis", "texas", "illinois", "minnesota", "louisiana", "luisiana",
+        "central time", "hora central",
+    ),
+    "America/Denver": ("denver", "salt lake city", "colorado", "utah", "mountain time", "hora de la montana"),
+    "America/Phoenix": ("phoenix", "arizona"),
+    "America/Los_Angeles": (
+        "los angeles", "san francisco", "sao francisco", "seattle",
+        "san diego", "las vegas", "portland", "silicon valley", "california", "oregon",
+        "washington state", "nevada", "pacific time", "hora del pacifico", "horario do pacifico", "pacifico",
+    ),
+    "America/Toronto": ("toronto", "montreal", "ottawa", "ontario", "quebec"),
+    "America/Vancouver": ("vancouver", "british columbia", "colombia britanica", "columbia britanica"),
+    "America/Edmonton": ("calgary", "edmonton", "alberta"),
+    "America/Winnipeg": ("winnipeg", "manitoba"),
+    "America/Anchorage": ("anchorage", "alaska"),
+    "Pacific/Honolulu": ("honolulu", "hawaii", "havai"),
+    # Europe
+    "Europe/London": (
+        "london", "londres", "manchester", "edinburgh", "edimburgo", "uk", "england", "inglaterra", "reino unido",
+        "scotland", "escocia", "wales", "pais de gales", "northern ireland", "irlanda del norte", "irlanda do norte",
+    ),
+    "Europe/Dublin": ("dublin", "ireland", "irlanda"),
+    "Europe/Lisbon": ("lisbon", "lisboa", "porto", "oporto", "coimbra", "braga", "faro", "portugal"),
+    "Atlantic/Madeira": ("madeira", "funchal"),
+    "Atlantic/Azores": ("azores", "acores", "azores portugal", "ponta delgada"),
+    "Europe/Madrid": (
+        "madrid", "barcelona", "valencia", "sevilla", "seville", "malaga", "bilbao", "zaragoza",
+        "spain", "espana", "espanha",
+    ),
+    "Atlantic/Canary": ("canary islands", "islas canarias", "canarias", "tenerife", "las palmas"),
+    "Europe/Paris": ("paris", "lyon", "marseille", "marsella", "marselha", "nice", "niza", "france", "francia", "franca"),
+    "Europe/Berlin": (
+        "berlin", "munich", "munique", "hamburg", "hamburgo", "frankfurt", "cologne", "colonia",
+        "germany", "alemania", "alemanha", "central european time",
+    ),
+    "Europe/Rome": ("rome", "roma", "milan", "milano", "milao", "naples", "napoles", "florence", "florencia", "venice", "venecia", "veneza", "italy", "italia"),
+    "Europe/Amsterdam": ("amsterdam", "amsterda", "rotterdam", "netherlands", "holanda", "paises bajos", "paises baixos"),
+    "Europe/Brussels": ("brussels", "bruselas", "bruxelas", "belgium", "belgica"),
+    "Europe/Zurich": ("zurich", "geneva", "ginebra", "genebra", "switzerland", "suiza", "suica"),
+    "Europe/Vienna": ("vienna", "viena", "austria"),
+    "Europe/Prague": ("prague", "praga", "czech republic", "republica checa", "republica tcheca"),
+    "Europe/Warsaw": ("warsaw", "varsovia", "krakow", "cracovia", "poland", "polonia"),
+    "Europe/Stockholm": ("stockholm", "estocolmo", "sweden", "suecia"),
+    "Europe/Oslo": ("oslo", "norway", "noruega"),
+    "Europe/Copenhagen": ("copenhagen", "copenhague", "denmark", "dinamarca"),
+    "Europe/Helsinki": ("helsinki", "finland", "finlandia"),
+    "Europe/Athens": ("athens", "atenas", "greece", "grecia"),
+    "Europe/Istanbul": ("istanbul", "estambul", "istambul", "ankara", "turkey", "turquia"),
+    "Europe/Moscow": ("moscow", "moscu", "moscou", "saint petersburg", "san petersburgo", "sao petersburgo"),
+    "Europe/Kyiv": ("kyiv", "kiev", "ukraine", "ucrania"),
+    "Europe/Bucharest": ("bucharest", "bucarest", "bucareste", "romania", "rumania", "romenia"),
+    "Europe/Budapest": ("budapest", "budapeste", "hungary", "hungria"),
+    # Africa
+    "Africa/Luanda": ("luanda", "angola"),
+    "Africa/Maputo": ("maputo", "mozambique", "mocambique"),
+    "Atlantic/Cape_Verde": ("praia", "cape verde", "cabo verde"),
+    "Africa/Bissau": ("bissau", "guinea bissau", "guine bissau"),
+    "Africa/Sao_Tome": ("sao tome", "sao tome e principe"),
+    "Africa/Malabo": ("malabo", "equatorial guinea", "guinea ecuatorial"),
+    "Africa/Casablanca": ("casablanca", "rabat", "marrakech", "marrakesh", "morocco", "marruecos", "marrocos"),
+    "Africa/Cairo": ("cairo", "el cairo", "egypt", "egipto", "egito"),
+    "Africa/Lagos": ("lagos", "abuja", "nigeria"),
+    "Africa/Johannesburg": ("johannesburg", "johannesburgo", "cape town", "ciudad del cabo", "cidade do cabo", "south africa", "sudafrica", "africa do sul"),
+    "Africa/Nairobi": ("nairobi", "kenya", "kenia", "quenia"),
+    # Asia / Oceania
+    "Asia/Dubai": ("dubai", "abu dhabi", "uae", "emiratos arabes", "emirados arabes"),
+    "Asia/Kolkata": ("mumbai", "bombay", "delhi", "new delhi", "nueva delhi", "nova deli", "bangalore", "bengaluru", "india"),
+    "Asia/Shanghai": ("shanghai", "xangai", "beijing", "pekin", "pequim", "shenzhen", "guangzhou", "china"),
+    "Asia/Hong_Kong": ("hong kong",),
+    "Asia/Macau": ("macau", "macao"),
+    "Asia/Taipei": ("taipei", "taiwan"),
+    "Asia/Tokyo": ("tokyo", "tokio", "toquio", "osaka", "kyoto", "japan", "japon", "japao"),
+    "Asia/Seoul": ("seoul", "seul", "busan", "south korea", "corea del sur", "coreia do sul"),
+    "Asia/Singapore": ("singapore", "singapur", "singapura"),
+    "Asia/Bangkok": ("bangkok", "bangkoc", "thailand", "tailandia"),
+    "Asia/Jakarta": ("jakarta", "yakarta", "jacarta"),
+    "Asia/Manila": ("manila", "philippines", "filipinas"),
+    "Asia/Jerusalem": ("jerusalem", "jerusalen", "tel aviv", "israel"),
+    "Asia/Dili": ("dili", "timor leste", "east timor", "timor oriental"),
+    "Australia/Sydney": ("sydney", "sidney", "melbourne", "canberra"),
+    "Australia/Brisbane": ("brisbane",),
+    "Australia/Perth": ("perth",),
+    "Pacific/Auckland": ("auckland", "wellington", "new zealand", "nueva zelanda", "nova zelandia"),
+}
+
+# Common abbreviations -> representative zone
+TIMEZONE_ABBREVIATIONS: Dict[str, str] = {
+    "utc": "UTC", "gmt": "UTC", "z": "UTC", "zulu": "UTC",
+    "brt": "America/Sao_Paulo", "brst": "America/Sao_Paulo",
+    "amt": "America/Manaus", "fnt": "America/Noronha", "act": "America/Rio_Branco",
+    "art": "America/Argentina/Buenos_Aires", "clt": "America/Santiago", "clst": "America/Santiago",
+    "cot": "America/Bogota", "pet": "America/Lima", "vet": "America/Caracas", "uyt": "America/Montevideo",
+    "pyt": "America/Asuncion", "bot": "America/La_Paz", "ect": "America/Guayaquil",
+    "est": "America/New_York", "edt": "America/New_York", "et": "America/New_York",
+    "cst": "America/Chicago", "cdt": "America/Chicago", "ct": "America/Chicago",
+    "mst": "America/Denver", "mdt": "America/Denver", "mt": "America/Denver",
+    "pst": "America/Los_Angeles", "pdt": "America/Los_Angeles", "pt": "America/Los_Angeles",
+    "akst": "America/Anchorage", "akdt": "America/Anchorage", "hst": "Pacific/Honolulu",
+    "wet": "Europe/Lisbon", "west": "Europe/Lisbon", "bst": "Europe/London",
+    "cet": "Europe/Berlin", "cest": "Europe/Berlin", "eet": "Europe/Athens", "eest": "Europe/Athens",
+    "msk": "Europe/Moscow", "wat": "Africa/Lagos", "cat": "Africa/Maputo", "eat": "Africa/Nairobi",
+    "sast": "Africa/Johannesburg", "gst": "Asia/Dubai", "ist": "Asia/Kolkata",
+    "hkt": "Asia/Hong_Kong", "sgt": "Asia/Singapore", "jst": "Asia/Tokyo", "kst": "Asia/Seoul",
+    "aest": "Australia/Sydney", "aedt": "Australia/Sydney", "awst": "Australia/Perth",
+    "nzst": "Pacific/Auckland", "nzdt": "Pacific/Auckland",
+}
+
+# "UTC-3", "GMT+05:00", "utc -4"
+UTC_OFFSET_PATTERN = re.compile(r"^(?:utc|gmt)\s*([+-])\s*(\d{1,2})(?::?(\d{2}))?$")
+
+# Longest place name in the gazetteer, in words; bounds the n-gram scan
+MAX_NAME_WORDS = 5
+
+# Place names that are also everyday words or surnames ("nice", "praia" = beach, "natal" =
+# Christmas, "easter"): trusted only when they are the whole input, never inside a sentence
+COMMON_WORD_PLACES = frozenset((
+    "rio", "santos", "vitoria", "natal", "porto", "praia", "lima", "nice", "leon", "cali", "faro",
+    "cuenca", "merida", "concepcion", "colonia", "santiago", "cordoba", "la paz", "washington", "pacifico",
+    "oral", "center", "easter", "christmas", "wake", "midway", "davis", "casey", "palmer", "troll",
+    "stanley", "reunion", "resolute", "cayenne", "jersey", "chatham", "norfolk", "knox", "vevay",
+    "marengo", "petersburg", "monticello", "beulah", "winamac", "regina", "darwin", "nome", "dawson",
+    "mendoza", "salta", "madeira", "canary", "cocos", "curacao", "dominica",
+))
+
+# Words that start a longer place name; "new jersey" or "san marcos" must not match the
+# one-word place after them when the full name isn't known
+NAME_PREFIXES = frozenset((
+    "new", "nueva", "nuevo", "nova", "novo", "san", "santa", "sao", "st", "saint", "fort", "port",
+    "north", "south", "east", "west", "little", "great",
+))
+
+# Minimum difflib ratio for a fuzzy match; tolerates a single typo in a longer city name
+FUZZY_CUTOFF = 0.88
+FUZZY_MIN_LENGTH = 6
+
+# Regions whose zone names end in a real place ("Europe/Lisbon"), unlike aliases such as "US/Pacific"
+PLACE_REGIONS = ("Africa", "America", "Antarctica", "Asia", "Atlantic", "Australia", "Europe", "Indian", "Pacific")
+
+
+def _fold(text: str) -> str:
+    """Strip accents and punctuation and collapse whitespace, keeping case"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    cleaned = re.sub(r"[^A-Za-z0-9+:/\-]+", " ", stripped.replace("_", " "))
+    return " ".join(cleaned.split())
+
+
+def normalize_location(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    return _fold(text).lower()
+
+
+class TimezoneResolver:
+    """
+    Offline timezone lookup for free-text registration input. Tries, in order: an
+    abbreviation, a place name, an IANA name, a UTC offset, known place names anywhere in
+    the text, and a fuzzy match on the place name. Returns None when unsure (or when the
+    text names places in different countries) so the caller can fall back to the
+    LLM/geocoder path.
+    """
+
+    def __init__(self):
+        # Case-insensitive IANA names, links resolved to the zone.tab zone ("Japan" -> Asia/Tokyo)
+        self._zones: Dict[str, str] = {
+            normalize_location(zone): canonical_timezone(zone) for zone in pytz.all_timezones
+        }
+
+        # City component of canonical zones ("sao paulo", "new york"), then the gazetteer on top
+        self._places: Dict[str, str] = {}
+        for zone in pytz.common_timezones:
+            if zone.split("/", 1)[0] in PLACE_REGIONS:
+                self._places.setdefault(normalize_location(zone.rsplit("/", 1)[-1]), canonical_timezone(zone))
+        for zone, names in CITY_TIMEZONES.items():
+            for name in names:
+                self._places[normalize_location(name)] = zone
+
+        # Names trusted inside a sentence, and fuzzy candidates bucketed by first letter
+        # (typos rarely hit the first character)
+        self._scan_places: Dict[str, str] = {
+            name: zone for name, zone in self._places.items() if name not in COMMON_WORD_PLACES
+        }
+        self._fuzzy_buckets: Dict[str, List[str]] = {}
+        for name in self._scan_places:
+            if len(name) >= FUZZY_MIN_LENGTH:
+                self._fuzzy_buckets.setdefault(name[0], []).append(name)
+
+        self.hits = 0
+        self.misses = 0
+
+    def _offset_zone(self, text: str) -> Optional[str]:
+        """Etc/GMT zone for a whole-hour UTC offset (note the inverted POSIX sign)"""
+        match = UTC_OFFSET_PATTERN.match(text)
+        if not match:
+            return None
+        sign, hours, minutes = match.group(1), int(match.group(2)), int(match.group(3) or 0)
+        if minutes or hours > 14:
+            return None
+        if hours == 0:
+            return "UTC"
+        zone = f"Etc/GMT{'-' if sign == '+' else '+'}{hours}"
+        return zone if zone in pytz.all_timezones_set else None
+
+    def _scan(self, words: List[str], upper_words: List[bool]) -> Tuple[bool, Optional[str]]:
+        """
+        (found, zone) for the place names in the text, longest names first. Found but no
+        zone means the text is contradictory ("Paris Texas", "london ontario") or names an
+        unknown place ("New Hampshire"), so neither the scan nor the fuzzy match should guess.
+        """
+        taken = [False] * len(words)
+        matches: List[Tuple[int, str]] = []
+        for size in range(min(MAX_NAME_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                if any(taken[start:start + size]):
+                    continue
+                zone = self._scan_places.get(" ".join(words[start:start + size]))
+                if not zone:
+                    continue
+                if size == 1 and start and words[start - 1] in NAME_PREFIXES:
+                    return True, None
+                taken[start:start + size] = [True] * size
+                matches.append((start, zone))
+
+        if matches:
+            matches.sort()
+            zone = matches[0][1]
+            country = country_for_timezone(zone)
+            for _, other in matches[1:]:
+                if other != zone and (country is None or country_for_timezone(other) != country):
+                    return True, None
+            return True, zone
+
+        # Inside a sentence only trust abbreviations written in capitals ("ART", not "art")
+        for word, is_upper in zip(words, upper_words):
+            if is_upper and word in TIMEZONE_ABBREVIATIONS:
+                return True, TIMEZONE_ABBREVIATIONS[word]
+        return False, None
+
+    def _fuzzy(self, words: List[str]) -> Optional[str]:
+        """Closest place name for the whole text or its trailing words ("moro em sao paolo")"""
+        candidates = [" ".join(words[-size:]) for size in range(min(3, len(words)), 0, -1)]
+        if len(words) > 3:
+            candidates.insert(0, " ".join(words))
+        for candidate in candidates:
+            if len(candidate) < FUZZY_MIN_LENGTH:
+                continue
+            matches = difflib.get_close_matches(
+                candidate, self._fuzzy_buckets.get(candidate[0], []), n=1, cutoff=FUZZY_CUTOFF
+            )
+            if matches:
+                return self._scan_places[matches[0]]
+        return None
+
+    def resolve(self, text: str) -> Optional[str]:
+        """IANA timezone for the user's text, or None if it can't be resolved locally"""
+        zone = self._resolve(text)
+        if zone:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return zone
+
+    def _resolve(self, text: str) -> Optional[str]:
+        folded = _fold(text or "")
+        normalized = folded.lower()
+        if not normalized:
+            return None
+
+        # Abbreviations first: pytz also has legacy fixed-offset zones named "CET" and "EST".
+        # Places before zones, so "Japan" is the gazetteer's Asia/Tokyo rather than a link.
+        exact = (
+            TIMEZONE_ABBREVIATIONS.get(normalized)
+            or self._places.get(normalized)
+            or self._zones.get(normalized)
+            or self._offset_zone(normalized)
+        )
+        if exact:
+            return exact
+
+        words = normalized.split()
+        upper_words = [word.isupper() for word in folded.split()]
+        found, zone = self._scan(words, upper_words)
+        return zone if found else self._fuzzy(words)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Local hit/miss counters (a miss means the LLM fallback ran)"""
+        return {
+            "places": len(self._places),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
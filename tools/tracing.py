@@ -0,0 +1,241 @@
+import atexit
+import functools
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import secrets
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from tools.json_codec import json_dumps
+
+# Request-scoped tracing. Spans carry W3C trace context ids (an incoming `traceparent`
+# header continues the caller's trace) and are exported in the JSON layout of the
+# OpenTelemetry SDK's ConsoleSpanExporter, so the opentelemetry SDK can replace this
+# module without changing what the spans look like.
+#
+#     with start_span("transcode", format="ogg") as span:
+#         ...
+#         span.set_attribute("bytes", size)
+#
+#     @traced("get_user_data")
+#     async def get_user_data(...): ...
+#
+# Export happens on a listener thread, never on the event loop.
+
+# "none" (spans are built for ids and logs but not exported), "console" (stdout) or "file"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "okanassist-ai")
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def _iso(unix_ns: int) -> str:
+    return datetime.fromtimestamp(unix_ns / 1e9, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class Span:
+    """One timed operation in a trace"""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "attributes",
+                 "start_ns", "end_ns", "status", "status_message", "events")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: str = "INTERNAL",
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "UNSET"
+        self.status_message: Optional[str] = None
+        self.events: list = []
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = f"{type(exc).__name__}: {exc}"
+        self.events.append({
+            "name": "exception",
+            "timestamp": _iso(time.time_ns()),
+            "attributes": {"exception.type": type(exc).__name__, "exception.message": str(exc)},
+        })
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        if self.status == "UNSET":
+            self.status = "OK"
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ConsoleSpanExporter layout"""
+        status = {"status_code": self.status}
+        if self.status_message:
+            status["description"] = self.status_message
+        return {
+            "name": self.name,
+            "context": {"trace_id": f"0x{self.trace_id}", "span_id": f"0x{self.span_id}", "trace_state": "[]"},
+            "kind": f"SpanKind.{self.kind}",
+            "parent_id": f"0x{self.parent_id}" if self.parent_id else None,
+            "start_time": _iso(self.start_ns),
+            "end_time": _iso(self.end_ns) if self.end_ns else None,
+            "status": status,
+            "attributes": {**self.attributes, "duration_ms": round(self.duration_ms, 3)},
+            "events": self.events,
+            "links": [],
+            "resource": {"attributes": {"service.name": SERVICE_NAME}, "schema_url": ""},
+        }
+
+
+# ============================================================================
+# EXPORTERS
+# ============================================================================
+
+class NoopExporter:
+    """Drops finished spans (the default)"""
+
+    def export(self, span: Span) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class _SpanFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json_dumps(record.span.to_dict())
+
+
+class JsonLinesExporter:
+    """One JSON span per line, written by a listener thread (console or file)"""
+
+    def __init__(self, handler: logging.Handler):
+        handler.setFormatter(_SpanFormatter())
+        self._queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def export(self, span: Span) -> None:
+        self._queue.put(logging.makeLogRecord({"span": span}))
+
+    def shutdown(self) -> None:
+        self._listener.stop()
+
+
+def build_exporter(kind: str = TRACE_EXPORTER, path: str = TRACE_FILE):
+    if kind == "console":
+        return JsonLinesExporter(logging.StreamHandler(sys.stdout))
+    if kind == "file":
+        return JsonLinesExporter(logging.FileHandler(path, encoding="utf-8"))
+    if kind != "none":
+        raise ValueError(f"Unknown TRACE_EXPORTER '{kind}' (expected none, console or file)")
+    return NoopExporter()
+
+
+_exporter = build_exporter()
+atexit.register(lambda: _exporter.shutdown())
+
+
+def set_exporter(exporter) -> None:
+    """Swap the exporter (benchmarks, local debugging); the previous one is flushed"""
+    global _exporter
+    previous, _exporter = _exporter, exporter
+    previous.shutdown()
+
+
+# ============================================================================
+# SPANS AND REQUEST CONTEXT
+# ============================================================================
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def new_request_id() -> str:
+    return secrets.token_hex(8)
+
+
+def current_ids() -> Tuple[Optional[str], Optional[str]]:
+    """(request_id, trace_id) of the running request, for log records"""
+    span = _current_span.get()
+    return _request_id.get(), span.trace_id if span else None
+
+
+@contextmanager
+def start_span(name: str, kind: str = "INTERNAL", **attributes: Any) -> Iterator[Span]:
+    """Child of the current span (or a new trace); ended and exported on exit"""
+    parent = _current_span.get()
+    span = Span(
+        name,
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        parent_id=parent.span_id if parent else None,
+        kind=kind,
+        attributes=attributes,
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+        _exporter.export(span)
+
+
+@contextmanager
+def request_span(name: str, request_id: str, traceparent: Optional[str] = None,
+                 **attributes: Any) -> Iterator[Span]:
+    """Root SERVER span for one HTTP request; sets the request id seen by logs"""
+    trace_id = parent_id = None
+    match = TRACEPARENT_PATTERN.match(traceparent or "")
+    if match:
+        trace_id, parent_id = match.groups()
+    span = Span(name, trace_id=trace_id or secrets.token_hex(16), parent_id=parent_id,
+                kind="SERVER", attributes={"request.id": request_id, **attributes})
+    span_token = _current_span.set(span)
+    request_token = _request_id.set(request_id)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _request_id.reset(request_token)
+        _current_span.reset(span_token)
+        span.end()
+        _exporter.export(span)
+
+
+def traced(name: str):
+    """Decorator: run a coroutine function inside a span"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with start_span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
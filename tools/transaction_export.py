@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List
+
+from .json_codec import json_dumps
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_COLUMNS = (
+    "id", "date", "amount", "transaction_type", "category", "description", "merchant",
+    "source_platform", "tags", "is_recurring", "confidence_score", "import_batch_id", "created_at"
+)
+
+# Rows formatted per yielded chunk: big enough to amortize send() overhead, small enough to keep memory flat
+EXPORT_ROWS_PER_CHUNK = 500
+
+
+def _export_value(value: Any) -> Any:
+    """Convert a database value to something csv/json can write"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    """CSV cell for a value; JSONB lists/dicts are written as JSON text"""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return _export_value(value)
+
+
+async def stream_csv(rows: AsyncIterable[Any], columns: List[str] = EXPORT_COLUMNS) -> AsyncIterator[bytes]:
+    """Format rows as CSV, yielding one encoded chunk per EXPORT_ROWS_PER_CHUNK rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+
+    async for row in rows:
+        writer.writerow([_csv_value(row[column]) for column in columns])
+        pending += 1
+        if pending >= EXPORT_ROWS_PER_CHUNK:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def stream_ndjson(rows: AsyncIterable[Any], columns: List[str] = EXPORT_COLUMNS) -> AsyncIterator[bytes]:
+    """Format rows as newline-delimited JSON, one object per line"""
+    lines: List[str] = []
+
+    async for row in rows:
+        record: Dict[str, Any] = {column: _export_value(row[column]) for column in columns}
+        lines.append(json_dumps(record))
+        if len(lines) >= EXPORT_ROWS_PER_CHUNK:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def stream_export(rows: AsyncIterable[Any], export_format: str, columns: List[str] = EXPORT_COLUMNS) -> AsyncIterator[bytes]:
+    """Pick the formatter for an export format (see EXPORT_FORMATS)"""
+    if export_format == "csv":
+        return stream_csv(rows, columns)
+    if export_format == "ndjson":
+        return stream_ndjson(rows, columns)
+    raise ValueError(f"Unsupported export format: {export_format}")